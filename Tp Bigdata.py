@@ -51,51 +51,130 @@
 
 # COMMAND ----------
 
-from pyspark.sql import SparkSession
+from delta.tables import DeltaTable
 from pyspark.sql.functions import col, to_date
 
-# Initialiser Spark
+from lakehouse import config, transforms
+from lakehouse.bucketing import clustered, read_silver, write_bucketed
+from lakehouse.cache import CacheManager
+from lakehouse.changes import TABLE_KEYS, enable_change_feed
+from lakehouse.delta_log import table_version
+from lakehouse.layout import LAYOUTS, write_table
+from lakehouse.metrics import RunRecorder
+from lakehouse.result_cache import ResultCache
+from lakehouse.schemas import ingest_bronze
+from lakehouse.session import get_spark
+
+# Initialiser Spark : profil local-small par défaut (LAKEHOUSE_SPARK_PROFILE=local-large
+# ou cluster pour changer), jars Delta pris dans le cache local, session existante réutilisée
+spark = get_spark(app_name="VaccinationDataPipeline")
+
+# Cache des DataFrames partagés entre plusieurs cellules (df_clean, fact_table)
+cache = CacheManager(spark)
+
+# Cache disque des résultats des graphiques, invalidé lorsque les données des tables Delta changent
+# (un OPTIMIZE ne l'invalide pas)
+results = ResultCache(spark)
+
+# Mesure de chaque étape (durée, jobs Spark, volumes, shuffle, mémoire) pour le rapport d'exécution
+recorder = RunRecorder(spark)
+
+# Change Data Feed sur les tables existantes, et versions au début de l'exécution :
+# le rapport final liste les clés réellement modifiées par cette exécution
+enable_change_feed(spark)
+versions_before = {path: table_version(spark, path) for path in TABLE_KEYS if DeltaTable.isDeltaTable(spark, path)}
+
+# Chargement complet au premier passage, puis mode incrémental (voir « Mode incrémental ») :
+# les cellules de chargement complet Bronze, Silver et Gold sont alors sautées.
+# Mettre INCREMENTAL_MODE = False pour forcer un rechargement complet
+INCREMENTAL_MODE = all(DeltaTable.isDeltaTable(spark, path) for path in (
+    config.SILVER_VACCINATION, config.SILVER_WHO_DEATHS, config.GOLD_FACT, config.GOLD_FACT_ENRICHED,
+))
+
+if not INCREMENTAL_MODE:
+    # 1. Zone Bronze : Chargement des données
+    try:
+        with recorder.stage("bronze_vaccination"):
+            # Schéma déclaré (lakehouse/schemas.py) : une seule lecture du CSV,
+            # les lignes mal formées partent en quarantaine
+            df_bronze = ingest_bronze(spark, "vaccination", config.BRONZE_VACCINATION)
+
+            print("Zone Bronze :")
+            df_bronze.printSchema()
+    except Exception as e:
+        print(f"Erreur Zone Bronze : {e}")
+
+    # 2. Zone Silver : Nettoyage
+    try:
+        with recorder.stage("silver_vaccination"):
+            # Suppression des colonnes inutiles, valeurs manquantes, conversion des dates
+            # df_clean alimente la table Fait et les deux dimensions : mis en cache jusqu'à la dernière,
+            # regroupé par pays une fois pour que les opérations par pays ne le redistribuent plus
+            df_clean = cache.pin("df_clean", clustered(transforms.clean_vaccination(df_bronze)))
+
+            print("Zone Silver :")
+            df_clean.printSchema()
+
+            # Table Delta triée par pays et date, plus une copie bucketée par pays (table externe du catalogue)
+            write_table(df_clean, config.SILVER_VACCINATION, LAYOUTS[config.SILVER_VACCINATION])
+            write_bucketed(spark, config.SILVER_VACCINATION)
+    except Exception as e:
+        print(f"Erreur Zone Silver : {e}")
 
-spark = SparkSession.builder \
-    .appName("VaccinationDataPipeline") \
-    .config("spark.jars.packages", "io.delta:delta-core_2.12:2.3.0") \
-    .config("spark.sql.extensions", "io.delta.sql.DeltaSparkSessionExtension") \
-    .config("spark.sql.catalog.spark_catalog", "org.apache.spark.sql.delta.catalog.DeltaCatalog") \
-    .getOrCreate()
+# COMMAND ----------
 
+# MAGIC %md
+# MAGIC # Mode incrémental
+# MAGIC
+# MAGIC Pour un rafraîchissement quotidien, inutile de réécrire tout l'historique : `lakehouse/incremental.py`
+# MAGIC fusionne (Delta MERGE) uniquement les lignes nouvelles ou modifiées, clé (ISO3, DATE_UPDATED),
+# MAGIC à partir du dernier *high-water mark* de chaque source, puis propage les clés touchées vers Silver et Gold.
+# MAGIC Ce mode remplace les cellules de chargement complet (`INCREMENTAL_MODE`, première cellule) : il est actif
+# MAGIC dès que les tables Silver et Gold existent. Les cellules Gold suivantes ne traitent alors que les changesets.
 
-# 1. Zone Bronze : Chargement des données
-try:
-    file_location = "data/vaccination-data.csv"
+# COMMAND ----------
 
-    df_bronze = spark.read.format("csv") \
-        .option("header", "true") \
-        .option("inferSchema", "true") \
-        .load(file_location)
+from lakehouse.incremental import refresh_vaccination, refresh_who_daily
 
-    print("Zone Bronze :")
-    df_bronze.printSchema()
+if INCREMENTAL_MODE:
+    with recorder.stage("incremental_refresh"):
+        refresh_vaccination(spark)
+        refresh_who_daily(spark)
 
-    # Sauvegarde en Delta
-    df_bronze.write.format("delta").mode("overwrite").save("delta/bronze/vaccination_data")
-except Exception as e:
-    print(f"Erreur Zone Bronze : {e}")
+# COMMAND ----------
 
-# 2. Zone Silver : Nettoyage
-try:
-    df_clean = df_bronze.drop("VACCINES_USED", "NUMBER_VACCINES_TYPES_USED", "DATA_SOURCE") \
-        .filter(col("TOTAL_VACCINATIONS").isNotNull()) \
-        .fillna({"WHO_REGION": "Unknown"})
+# MAGIC %md
+# MAGIC # Exécution en DAG
+# MAGIC
+# MAGIC `lakehouse/stages.py` déclare chaque étape avec ses entrées et sorties. Les tables Gold ne dépendent
+# MAGIC que de la zone Silver : l'ordonnanceur les lance en parallèle (pools FAIR), et `targets` permet de ne
+# MAGIC relancer qu'une étape et celles qui en dépendent.
 
-    df_clean = df_clean.withColumn("DATE_UPDATED", to_date("DATE_UPDATED", "yyyy-MM-dd"))
+# COMMAND ----------
 
-    print("Zone Silver :")
-    df_clean.printSchema()
+from lakehouse.stages import build_pipeline
 
-    df_clean.write.format("delta").mode("overwrite").save("delta/silver/vaccination_data_cleaned")
-except Exception as e:
-    print(f"Erreur Zone Silver : {e}")
+RUN_AS_DAG = False
 
+if RUN_AS_DAG:
+    build_pipeline().run(spark, recorder=recorder)
+
+# COMMAND ----------
+
+# MAGIC %md
+# MAGIC # Ingestion en continu des données journalières OMS
+# MAGIC
+# MAGIC Les fichiers CSV déposés dans `landing/who_daily` sont traités par Structured Streaming : ajout en Bronze,
+# MAGIC nettoyage et MERGE en Silver à chaque micro-batch, sans relire l'historique (checkpoint).
+
+# COMMAND ----------
+
+from lakehouse.streaming import start_who_daily_stream
+
+STREAMING_MODE = False
+
+if STREAMING_MODE:
+    who_daily_stream = start_who_daily_stream(spark, trigger_seconds=5)
 
 
 
@@ -115,54 +194,57 @@ except Exception as e:
 # COMMAND ----------
 
 # MAGIC %md
-# MAGIC # Bloc : Création de la Table Fait (Fact Table)
+# MAGIC # Bloc : Création de la Dimension Géographique
 
 # COMMAND ----------
 
-# Bloc Table Fait corrigé
-try:
-    # Création de la table Fait à partir des données nettoyées
-    fact_table = df_clean.select(
-        "COUNTRY",
-        "WHO_REGION",
-        "DATE_UPDATED",
-        "TOTAL_VACCINATIONS",
-        "PERSONS_VACCINATED_1PLUS_DOSE", 
-        "PERSONS_LAST_DOSE",
-        "PERSONS_BOOSTER_ADD_DOSE"
-    )
-
-    # Vérification des types de données
-    fact_table.printSchema()
-
-    # Sauvegarde de la table Fait dans la zone Gold avec Delta
-    fact_table.write.format("delta").mode("overwrite").save("delta/gold/fact_covid_vaccinations")
-    print("Table Fait créée et sauvegardée avec succès dans la zone Gold avec Delta.")
-except Exception as e:
-    print(f"Erreur lors de la création de la Table Fait : {e}")
+from lakehouse import star
+
+# En mode incrémental, la dimension et la table Fait ont déjà reçu les seules lignes modifiées
+if not INCREMENTAL_MODE:
+    try:
+        with recorder.stage("gold_dimension_country"):
+            # Création de la dimension géographique. Chaque pays reçoit un identifiant
+            # entier (country_id) stable : les identifiants déjà attribués sont relus
+            dimension_country = star.build_dimension_country(spark, df_clean)
 
+            # Vérification des types de données
+            dimension_country.printSchema()
+
+            # Sauvegarde de la dimension géographique dans la zone Gold (table recréée si une
+            # version antérieure n'a pas encore la colonne country_id)
+            write_table(dimension_country, config.GOLD_DIM_COUNTRY, LAYOUTS[config.GOLD_DIM_COUNTRY])
+            dimension_country = spark.read.format("delta").load(config.GOLD_DIM_COUNTRY)
+
+            print("Dimension Géographique créée et sauvegardée avec succès dans la zone Gold.")
+    except Exception as e:
+        print(f"Erreur lors de la création de la Dimension Géographique : {e}")
 
 
 # COMMAND ----------
 
 # MAGIC %md
-# MAGIC # Bloc : Création de la Dimension Géographique
+# MAGIC # Bloc : Création de la Table Fait (Fact Table)
 
 # COMMAND ----------
 
-try:
-    # Création de la dimension géographique
-    dimension_country = df_clean.select("COUNTRY", "ISO3", "WHO_REGION").distinct()
+# Bloc Table Fait corrigé
+if not INCREMENTAL_MODE:
+    try:
+        with recorder.stage("gold_fact"):
+            # Création de la table Fait à partir des données nettoyées : clés entières
+            # (country_id, date_id au format yyyymmdd) et mesures uniquement
+            fact_table = star.build_fact(df_clean, dimension_country)
 
-    # Vérification des types de données
-    dimension_country.printSchema()
+            # Vérification des types de données
+            fact_table.printSchema()
 
-    # Sauvegarde de la dimension géographique dans la zone Gold
-    dimension_country.write.format("delta").mode("overwrite").save("delta/gold/dimension_country")
+            # Sauvegarde de la table Fait dans la zone Gold avec Delta, triée sur ses clés
+            write_table(fact_table, config.GOLD_FACT, LAYOUTS[config.GOLD_FACT])
+            print("Table Fait créée et sauvegardée avec succès dans la zone Gold avec Delta.")
+    except Exception as e:
+        print(f"Erreur lors de la création de la Table Fait : {e}")
 
-    print("Dimension Géographique créée et sauvegardée avec succès dans la zone Gold.")
-except Exception as e:
-    print(f"Erreur lors de la création de la Dimension Géographique : {e}")
 
 
 # COMMAND ----------
@@ -172,25 +254,26 @@ except Exception as e:
 
 # COMMAND ----------
 
-from pyspark.sql.functions import year, month, dayofmonth
+from lakehouse.calendar_dimension import extend_calendar
 
 try:
-    # Création de la dimension temporelle
-    dimension_date = df_clean.select("DATE_UPDATED").distinct() \
-        .withColumn("year", year("DATE_UPDATED")) \
-        .withColumn("month", month("DATE_UPDATED")) \
-        .withColumn("day", dayofmonth("DATE_UPDATED"))
+    with recorder.stage("gold_dimension_date"):
+        # Création de la dimension temporelle : calendrier continu du 1er janvier 2020
+        # à aujourd'hui (année, mois, jour, trimestre, semaines ISO et épidémiologique),
+        # généré sans parcourir les données. Seules les dates manquantes sont ajoutées
+        added_dates = extend_calendar(spark, config.GOLD_DIM_DATE)
+        dimension_date = spark.read.format("delta").load(config.GOLD_DIM_DATE)
 
-    # Vérification des types de données
-    dimension_date.printSchema()
+        # Vérification des types de données
+        dimension_date.printSchema()
 
-    # Sauvegarde de la dimension temporelle dans la zone Gold
-    dimension_date.write.format("delta").mode("overwrite").save("delta/gold/dimension_date")
-
-    print("Dimension Temporelle créée et sauvegardée avec succès dans la zone Gold.")
+        print(f"Dimension Temporelle à jour dans la zone Gold ({added_dates} date(s) ajoutée(s)).")
 except Exception as e:
     print(f"Erreur lors de la création de la Dimension Temporelle : {e}")
 
+# Dernière utilisation de df_clean (table Fait)
+cache.unpin("df_clean")
+
 
 # COMMAND ----------
 
@@ -199,48 +282,77 @@ except Exception as e:
 
 # COMMAND ----------
 
-# Création et enrichissement de la table Fait
-from pyspark.sql.functions import col, lag
-from pyspark.sql.window import Window
-
-from pyspark.sql.functions import col, lag, when
-from pyspark.sql.window import Window
+from lakehouse.incremental import refresh_enriched_fact
 
+# Création et enrichissement de la table Fait
 try:
-    # Rechargement de fact_table
-    fact_table = spark.read.format("delta").load("delta/gold/fact_covid_vaccinations")
-
-    # Ajout de la progression des vaccinations
-    window_spec = Window.partitionBy("COUNTRY").orderBy("DATE_UPDATED")
-    fact_table = fact_table.withColumn("progression_vaccinations", 
-                                       col("TOTAL_VACCINATIONS") - lag("TOTAL_VACCINATIONS").over(window_spec))
-
-    # Ajout du ratio (remplacer par la bonne colonne si disponible)
-    fact_table = fact_table.withColumn(
-        "vaccination_ratio",
-        when(col("PERSONS_VACCINATED_1PLUS_DOSE") > 0, 
-             col("TOTAL_VACCINATIONS") / col("PERSONS_VACCINATED_1PLUS_DOSE"))
-        .otherwise(None)
-    )
-
-    # Sauvegarde finale
-    fact_table.write.format("delta").mode("overwrite").save("delta/gold/fact_covid_vaccinations_enriched")
-    print("Table Fait enrichie et sauvegardée avec succès.")
+    with recorder.stage("gold_fact_enriched"):
+        # Rechargement de fact_table aux clés naturelles (dimension pays diffusée)
+        fact_table = star.read_fact(spark)
+
+        # Progression (lag par pays), variations glissantes sur 7 et 28 jours et ratio :
+        # seules les dates modifiées depuis le dernier enrichissement sont recalculées
+        # (avec l'historique nécessaire aux fenêtres) puis fusionnées dans la table enrichie
+        enriched_rows = refresh_enriched_fact(spark, fact_table)
+
+        # La table enrichie sert aux agrégats, aux exports et aux visualisations : mise en cache
+        fact_table = cache.pin(
+            "fact_table", spark.read.format("delta").load(config.GOLD_FACT_ENRICHED).drop("year")
+        )
+        print(f"Table Fait enrichie et sauvegardée avec succès ({enriched_rows} ligne(s) mise(s) à jour).")
 except Exception as e:
     print(f"Erreur lors de l'enrichissement de la Table Fait : {e}")
 
-# Export des résultats localement
-export_path = "exports/fact_covid_vaccinations_enriched"
-fact_table.coalesce(1).write.csv(export_path, mode="overwrite", header=True)
-print(f"Données exportées avec succès dans : {export_path}")
+# COMMAND ----------
 
+# MAGIC %md
+# MAGIC # Optimisation du stockage de la zone Gold
+# MAGIC
+# MAGIC La table Fait enrichie est partitionnée par `WHO_REGION` et année. OPTIMIZE compacte les petits fichiers et
+# MAGIC applique un Z-ORDER sur `COUNTRY` et `DATE_UPDATED` (sur `country_id` et `date_id` pour la table Fait à clés) ;
+# MAGIC le rapport indique combien de fichiers une requête filtrée par région et période évite de lire.
+# MAGIC Seules les tables (et, pour la table enrichie, les partitions) écrites depuis leur dernier OPTIMIZE sont
+# MAGIC réécrites : une exécution sans nouvelles données ne crée pas de version. `optimize_all(spark, force=True)`
+# MAGIC réoptimise tout (maintenance).
 
+# COMMAND ----------
+
+from lakehouse.layout import optimize_all, pruning_report
+
+try:
+    with recorder.stage("gold_optimize"):
+        optimize_all(spark)
+        pruning_report(
+            spark, config.GOLD_FACT_ENRICHED,
+            "WHO_REGION = 'EURO' AND DATE_UPDATED BETWEEN '2023-01-01' AND '2023-12-31'"
+        )
+except Exception as e:
+    print(f"Erreur lors de l'optimisation de la zone Gold : {e}")
 
 
 # COMMAND ----------
 
 # MAGIC %md
 # MAGIC # Ajout des tables agrégées
+# MAGIC
+# MAGIC Un cube WHO_REGION × COUNTRY × année × mois (somme, moyenne, nombre, min, max) est calculé en une seule
+# MAGIC passe sur la table Fait. Les tables agrégées et les graphiques sont ensuite lus dans le cube.
+
+# COMMAND ----------
+
+from lakehouse.collect import to_pandas
+from lakehouse.cube import VaccinationCube, build_cube, daily_avg_from_cube, region_aggregation_from_cube
+
+with recorder.stage("gold_vaccination_cube"):
+    # En mode incrémental, le cube est reconstruit par refresh_vaccination quand des lignes changent
+    if not INCREMENTAL_MODE:
+        build_cube(fact_table).write.format("delta").mode("overwrite").save(config.GOLD_CUBE)
+    cube_df = spark.read.format("delta").load(config.GOLD_CUBE)
+
+    # Chargé une fois en mémoire : les graphiques interrogent ce cube sans job Spark
+    vaccination_cube = VaccinationCube(results.get_or_compute(
+        "vaccination_cube", [config.GOLD_CUBE], lambda: to_pandas(cube_df, "vaccination_cube")
+    ))
 
 # COMMAND ----------
 
@@ -249,12 +361,14 @@ print(f"Données exportées avec succès dans : {export_path}")
 
 # COMMAND ----------
 
-from pyspark.sql.functions import col
+from lakehouse.changes import refresh_from_changes
 
-region_aggregation = fact_table.groupBy("WHO_REGION").agg({"total_vaccinations": "sum"}) \
-    .withColumnRenamed("sum(total_vaccinations)", "total_vaccinations_sum")
+with recorder.stage("gold_region_aggregation"):
+    region_aggregation = region_aggregation_from_cube(cube_df)
 
-region_aggregation.write.format("delta").mode("overwrite").save("delta/gold/region_aggregation")
+    # Seules les régions touchées dans la table enrichie depuis la dernière mise à jour sont réécrites
+    refresh_from_changes(spark, region_aggregation, config.GOLD_REGION_AGG,
+                         config.GOLD_FACT_ENRICHED, "WHO_REGION")
 
 
 
@@ -265,14 +379,12 @@ region_aggregation.write.format("delta").mode("overwrite").save("delta/gold/regi
 
 # COMMAND ----------
 
-from pyspark.sql.functions import col
-
-# Agrégation pour calculer la moyenne quotidienne des vaccinations par pays
-daily_avg = fact_table.groupBy("COUNTRY").agg({"total_vaccinations": "avg"}) \
-    .withColumnRenamed("avg(total_vaccinations)", "avg_total_vaccinations")
+with recorder.stage("gold_daily_avg"):
+    # Agrégation pour calculer la moyenne quotidienne des vaccinations par pays
+    daily_avg = daily_avg_from_cube(cube_df)
 
-# Sauvegarde des résultats dans la zone Gold
-daily_avg.write.format("delta").mode("overwrite").save("delta/gold/daily_avg_vaccinations")
+    # Sauvegarde dans la zone Gold des seuls pays modifiés depuis la dernière mise à jour
+    refresh_from_changes(spark, daily_avg, config.GOLD_DAILY_AVG, config.GOLD_FACT_ENRICHED, "COUNTRY")
 
 
 
@@ -288,28 +400,11 @@ daily_avg.write.format("delta").mode("overwrite").save("delta/gold/daily_avg_vac
 
 # COMMAND ----------
 
-from pyspark.sql.functions import when, dayofweek
-
-# Ajout de la colonne `day_of_week`
-dimension_date = dimension_date.withColumn("day_of_week", dayofweek(col("DATE_UPDATED")))
-
-# Ajout de la colonne `season`
-dimension_date = dimension_date.withColumn(
-    "season",
-    when((col("month") >= 3) & (col("month") <= 5), "Spring")
-    .when((col("month") >= 6) & (col("month") <= 8), "Summer")
-    .when((col("month") >= 9) & (col("month") <= 11), "Fall")
-    .otherwise("Winter")
-)
-
-# Ajout de la colonne `is_weekend`
-dimension_date = dimension_date.withColumn(
-    "is_weekend",
-    when((col("day_of_week") == 7) | (col("day_of_week") == 1), True).otherwise(False)
-)
-
-# Sauvegarde des données dans la zone Gold
-dimension_date.write.format("delta").mode("overwrite").save("delta/gold/enriched_dimension_date")
+with recorder.stage("gold_dimension_date_enriched"):
+    # Ajout des colonnes `day_of_week`, `season` et `is_weekend` aux seules dates
+    # absentes de la table enrichie, puis sauvegarde dans la zone Gold
+    extend_calendar(spark, config.GOLD_DIM_DATE_ENRICHED, transform=transforms.enrich_dimension_date)
+    dimension_date = spark.read.format("delta").load(config.GOLD_DIM_DATE_ENRICHED)
 
 
 
@@ -327,33 +422,26 @@ dimension_date.write.format("delta").mode("overwrite").save("delta/gold/enriched
 # COMMAND ----------
 
 import os
-import shutil
-
-# Création d'un répertoire local pour les exports
-export_dir = "exports"
-os.makedirs(export_dir, exist_ok=True)
-print(f"Répertoire '{export_dir}' créé avec succès.")
-
-os.makedirs(export_dir, exist_ok=True)
 
-import os
-import shutil
+from lakehouse.export import Exporter
 
-# Création d'un répertoire local pour les exports
+# Répertoire local pour les exports. Chaque table est rapatriée partition par partition
+# en lots Arrow (mémoire du driver bornée, pas de coalesce(1)). Le premier export est
+# complet ; les suivants ne contiennent que les lignes insérées, modifiées ou supprimées
+# depuis la version déjà exportée (fichiers <table>.changes-v<début>-v<fin>.csv).
 export_dir = "exports"
-os.makedirs(export_dir, exist_ok=True)
-print(f"Répertoire '{export_dir}' créé avec succès.")
+exporter = Exporter(export_dir)
 
-# Export des fichiers
 try:
-    # Export des données de la table Fait enrichie
-    fact_table.toPandas().to_csv(f"{export_dir}/fact_covid_vaccinations_enriched.csv", index=False)
+    with recorder.stage("export"):
+        # Export des données de la table Fait enrichie
+        exporter.export_changes(spark, config.GOLD_FACT_ENRICHED, "fact_covid_vaccinations_enriched")
 
-    # Export des dimensions
-    dimension_country.toPandas().to_csv(f"{export_dir}/dimension_country.csv", index=False)
-    dimension_date.toPandas().to_csv(f"{export_dir}/dimension_date.csv", index=False)
+        # Export des dimensions
+        exporter.export_changes(spark, config.GOLD_DIM_COUNTRY, "dimension_country")
+        exporter.export_changes(spark, config.GOLD_DIM_DATE_ENRICHED, "dimension_date")
 
-    print(f"Fichiers exportés avec succès dans le répertoire '{export_dir}'")
+        print(f"Fichiers exportés avec succès dans le répertoire '{export_dir}'")
 except Exception as e:
     print(f"Erreur lors de l'export des fichiers : {e}")
 
@@ -362,166 +450,123 @@ print("Contenu du répertoire d'exports :")
 print(os.listdir(export_dir))
 
 
-import shutil
-
-# Export des données dans un répertoire local
-# Après coalescence, vous obtenez un fichier type : exports/fact_covid_vaccinations_enriched/part-00000-tid-xxxx.csv
-# Vous pouvez le renommer ou le copier explicitement :
-import glob
-files = glob.glob("exports/fact_covid_vaccinations_enriched/*.csv")
-if files:
-    shutil.copy(files[0], f"{export_dir}/fact_covid_vaccinations_enriched.csv")
-
-print(f"Fichier exporté dans : {export_dir}/fact_covid_vaccinations_enriched.csv")
-
-
-# Vérification de la version de Pandas
-import os
-import shutil
-import pandas as pd  # Ajout de l'import manquant
-
-# Vérification de la version de Pandas
-assert pd.__version__ >= "1.0.5", "Pandas >= 1.0.5 must be installed. Run `pip install pandas --upgrade`."
-
-# Répertoire d'export
-export_dir = "exports"
-os.makedirs(export_dir, exist_ok=True)
-print(f"Répertoire '{export_dir}' créé avec succès.")
-
-# Export des données fact_table
-if 'fact_table' in locals():
-    fact_table.toPandas().to_csv(f"{export_dir}/fact_covid_vaccinations_enriched.csv", index=False)
-else:
-    print("Erreur : La table `fact_table` n'est pas définie.")
+# Validation des données : tous les contrôles d'une table en une seule agrégation
+# (nulls, bornes "pour 100", doublons, TOTAL_VACCINATIONS croissant par pays, intégrité
+# référentielle), résultats ajoutés à la table de qualité ; échec si un seuil est dépassé
+from lakehouse.quality import validate
 
-# Export des dimensions
-if 'dimension_country' in locals():
-    dimension_country.toPandas().to_csv(f"{export_dir}/dimension_country.csv", index=False)
-else:
-    print("Erreur : La table `dimension_country` n'est pas définie.")
-
-if 'dimension_date' in locals():
-    dimension_date.toPandas().to_csv(f"{export_dir}/dimension_date.csv", index=False)
-else:
-    print("Erreur : La table `dimension_date` n'est pas définie.")
-
-print("Fichiers exportés avec succès dans le répertoire local.")
-
-# Vérification du contenu du répertoire
-print("Contenu du répertoire d'exports :")
-print(os.listdir(export_dir))
-
-
-# Validation des données
 try:
-    fact_data = spark.read.format("delta").load("delta/gold/fact_covid_vaccinations")
-    dimension_country = spark.read.format("delta").load("delta/gold/dimension_country")
-    dimension_date = spark.read.format("delta").load("delta/gold/dimension_date")
-
-    fact_data.show(5)
-    dimension_country.show(5)
-    dimension_date.show(5)
-    print("Validation des données terminée avec succès.")
+    with recorder.stage("validation"):
+        quality_results = validate(spark, run_id=recorder.run_id)
+        print("Validation des données terminée avec succès.")
 except Exception as e:
     print(f"Erreur lors de la validation : {e}")
 
 # --- Ajout d'une seconde source de données : Données journalières COVID-19 (cas et décès) ---
 
-# 1. Zone Bronze : Chargement des données journalières de cas et décès
-try:
-    file_location_cases = "data/WHO-COVID-19-global-daily-data.csv"  # Chemin exact vers le fichier
-    df_bronze_cases = spark.read.format("csv") \
-        .option("header", "true") \
-        .option("inferSchema", "true") \
-        .load(file_location_cases)
-
-    df_bronze_cases.printSchema()
-
-    # Sauvegarde en Delta (Bronze)
-    df_bronze_cases.write.format("delta").mode("overwrite").save("delta/bronze/who_covid_daily_cases")
-    print("Bronze : Données des cas et décès COVID-19 journaliers chargées avec succès.")
-except Exception as e:
-    print(f"Erreur lors de l'ingestion des données journalières COVID-19 : {e}")
+# En mode incrémental, refresh_who_daily a déjà fusionné les nouvelles lignes en Bronze et Silver
+if not INCREMENTAL_MODE:
+    # 1. Zone Bronze : Chargement des données journalières de cas et décès
+    try:
+        with recorder.stage("bronze_who_daily"):
+            # Lecture avec le schéma déclaré et sauvegarde en Delta (Bronze)
+            df_bronze_cases = ingest_bronze(spark, "who_daily", config.BRONZE_WHO_DAILY)
+
+            df_bronze_cases.printSchema()
+
+            print("Bronze : Données des cas et décès COVID-19 journaliers chargées avec succès.")
+    except Exception as e:
+        print(f"Erreur lors de l'ingestion des données journalières COVID-19 : {e}")
+
+    # 2. Zone Silver : Nettoyage des données journalières
+    try:
+        with recorder.stage("silver_who_deaths"):
+            # Colonnes du dataset :
+            # Date_reported, Country_code, Country, WHO_region, New_cases, Cumulative_cases, New_deaths, Cumulative_deaths
+            # Nous allons sélectionner ce qui nous intéresse :
+            # - DATE_UPDATED : converti depuis Date_reported (lignes sans date filtrées)
+            # - COUNTRY, WHO_REGION
+            # - NEW_DEATHS : pour comparaison
+            df_silver_cases = transforms.clean_who_daily(
+                spark.read.format("delta").load(config.BRONZE_WHO_DAILY)
+            )
+
+            # Sauvegarde en Delta (Silver) et copie bucketée par pays : les agrégations
+            # par pays n'ont plus d'Exchange
+            write_table(df_silver_cases, config.SILVER_WHO_DEATHS, LAYOUTS[config.SILVER_WHO_DEATHS])
+            write_bucketed(spark, config.SILVER_WHO_DEATHS)
+            print("Silver : Données journalières des décès COVID-19 nettoyées et sauvegardées avec succès.")
+    except Exception as e:
+        print(f"Erreur lors du nettoyage des données journalières COVID-19 : {e}")
+
+# Table Silver relue pour la suite, dans sa copie bucketée si elle est à jour
+df_silver_cases = read_silver(spark, config.SILVER_WHO_DEATHS)
+
+# Données des graphiques du rapport, rendus ensemble (lakehouse.charts)
+report_frames = {}
 
-# 2. Zone Silver : Nettoyage des données journalières
 try:
-    # Colonnes du dataset :
-    # Date_reported, Country_code, Country, WHO_region, New_cases, Cumulative_cases, New_deaths, Cumulative_deaths
-    # Nous allons sélectionner ce qui nous intéresse :
-    # - DATE_UPDATED : converti depuis Date_reported
-    # - COUNTRY, WHO_REGION
-    # - NEW_DEATHS : pour comparaison
-    from pyspark.sql.functions import to_date
-
-    df_silver_cases = spark.read.format("delta").load("delta/bronze/who_covid_daily_cases") \
-        .select(
-            col("Country").alias("COUNTRY"),
-            col("WHO_region").alias("WHO_REGION"),
-            col("New_deaths").alias("NEW_DEATHS"),
-            to_date(col("Date_reported"), "yyyy-MM-dd").alias("DATE_UPDATED")
-        )
+    with recorder.stage("chart_monthly_deaths"):
+        # On part du principe que df_silver_cases est déjà créé et contient les colonnes :
+        # COUNTRY, WHO_REGION, NEW_DEATHS, DATE_UPDATED
 
-    # Filtrer éventuellement les lignes sans date
-    df_silver_cases = df_silver_cases.filter(col("DATE_UPDATED").isNotNull())
+        from lakehouse.periods import monthly_deaths, period_labels
 
-    # Sauvegarde en Delta (Silver)
-    df_silver_cases.write.format("delta").mode("overwrite").save("delta/silver/who_covid_daily_deaths_cleaned")
-    print("Silver : Données journalières des décès COVID-19 nettoyées et sauvegardées avec succès.")
-except Exception as e:
-    print(f"Erreur lors du nettoyage des données journalières COVID-19 : {e}")
+        # Périodes (année, mois) à conserver : liste ou plages {"start", "end", "step"}.
+        # Ici un mois sur deux de juillet 2022 à janvier 2024.
+        target_periods = [{"start": "2022-07", "end": "2024-01", "step": 2}]
 
-try:
-    # On part du principe que df_silver_cases est déjà créé et contient les colonnes :
-    # COUNTRY, WHO_REGION, NEW_DEATHS, DATE_UPDATED
+        # Agrégation mensuelle des décès : le filtre sur les périodes est appliqué dans Spark
+        # avant l'agrégation, seuls les mois retenus arrivent sur le driver
+        deaths_by_month = monthly_deaths(df_silver_cases, target_periods)
 
-    from pyspark.sql.functions import sum as _sum, col, year, month
+        # Conversion en Pandas DataFrame
+        # (relu depuis le cache de résultats si la table Silver n'a pas changé)
+        filtered_deaths_df = results.get_or_compute(
+            "deaths_by_month", [config.SILVER_WHO_DEATHS], lambda: to_pandas(deaths_by_month, "deaths_by_month"), params=target_periods
+        )
 
-    # Agrégation mensuelle des décès
-    deaths_by_month = df_silver_cases.groupBy(
-        year("DATE_UPDATED").alias("year"),
-        month("DATE_UPDATED").alias("month")
-    ).agg(_sum("NEW_DEATHS").alias("monthly_new_deaths"))
+        # Créer une colonne "Year-Month" pour l'affichage
+        filtered_deaths_df["Year-Month"] = period_labels(filtered_deaths_df)
 
-    # Liste des dates que vous souhaitez conserver
-    target_dates = ["2022-07", "2022-09", "2022-11", "2023-01", "2023-03", "2023-05", "2023-07", "2023-09", "2023-11", "2024-01"]
+        # Tri par année et mois
+        filtered_deaths_df = filtered_deaths_df.sort_values(by=["year", "month"])
 
-    # Convertir ces dates en paires (year, month)
-    target_year_month = []
-    for d in target_dates:
-        y, m = d.split("-")
-        target_year_month.append((int(y), int(m)))
+        # Données du graphique : le rendu est fait avec les autres en fin de notebook
+        report_frames["deaths_by_month"] = filtered_deaths_df[["Year-Month", "monthly_new_deaths"]]
 
-    # Convertir deaths_by_month en Pandas DataFrame
-    deaths_df = deaths_by_month.toPandas()
+except Exception as e:
+    print(f"Erreur lors de l'affichage des données : {e}")
 
-    # Filtrer uniquement les lignes qui correspondent aux (year, month) désirés
-    filtered_deaths_df = deaths_df[deaths_df.apply(lambda row: (row['year'], row['month']) in target_year_month, axis=1)]
 
-    # Créer une colonne "Year-Month" pour l'affichage
-    filtered_deaths_df["Year-Month"] = filtered_deaths_df["year"].astype(str) + "-" + filtered_deaths_df["month"].astype(str).str.zfill(2)
 
-    # Tri par année et mois si nécessaire
-    filtered_deaths_df = filtered_deaths_df.sort_values(by=["year", "month"])
+# COMMAND ----------
 
-    # Visualisation
-    import matplotlib.pyplot as plt
+# MAGIC %md
+# MAGIC # Table Fait croisée : vaccinations et décès
+# MAGIC
+# MAGIC Chaque relevé de vaccination est complété par les décès déclarés dans les 7 et 28 jours qui le précèdent
+# MAGIC et qui le suivent, ainsi que par le cumul des décès connu à la date du relevé. Les deux sources sont
+# MAGIC triées ensemble par pays et par jour : les fenêtres sont calculées sans jointure sur intervalle.
 
-    plt.figure(figsize=(10,6))
-    # On trace uniquement la courbe des décès mensuels
-    plt.plot(filtered_deaths_df["Year-Month"], filtered_deaths_df["monthly_new_deaths"], label="Monthly New Deaths", marker='x', color='red')
+# COMMAND ----------
 
-    plt.xlabel("Year-Month")
-    plt.ylabel("Monthly New Deaths")
-    plt.title("Monthly New Deaths for Selected Months")
-    plt.xticks(rotation=45)
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
+from lakehouse.alignment import align_deaths
 
+try:
+    with recorder.stage("gold_vaccination_deaths"):
+        # En mode incrémental, seuls les pays modifiés ont été recalculés par refresh_vaccination
+        # et refresh_who_daily
+        if not INCREMENTAL_MODE:
+            vaccination_deaths = align_deaths(fact_table, df_silver_cases)
+            vaccination_deaths.write.format("delta").mode("overwrite").save(config.GOLD_VACCINATION_DEATHS)
+
+        spark.read.format("delta").load(config.GOLD_VACCINATION_DEATHS) \
+            .select("COUNTRY", "DATE_UPDATED", "TOTAL_VACCINATIONS", "deaths_before_28d", "deaths_after_28d") \
+            .show(5)
+        print("Table Fait croisée vaccinations × décès sauvegardée avec succès dans la zone Gold.")
 except Exception as e:
-    print(f"Erreur lors de l'affichage des données : {e}")
-
+    print(f"Erreur lors de la création de la table croisée : {e}")
 
 
 # COMMAND ----------
@@ -539,155 +584,138 @@ except Exception as e:
 
 # COMMAND ----------
 
-from pyspark.sql.functions import col
-import matplotlib.pyplot as plt
+from pyspark.sql.functions import col, min as _min
 import pandas as pd
 
-# Agrégation des données par pays et date
-vaccination_progress = fact_table.groupBy("COUNTRY", "DATE_UPDATED") \
-    .agg({"total_vaccinations": "sum"}) \
-    .withColumnRenamed("sum(total_vaccinations)", "total_vaccinations_sum")
+from lakehouse.collect import to_pandas
+from lakehouse.timeseries import country_progression
+
+with recorder.stage("chart_country_progress"):
+    # Agrégation des données par pays et date
+    vaccination_progress = fact_table.groupBy("COUNTRY", "DATE_UPDATED") \
+        .agg({"total_vaccinations": "sum"}) \
+        .withColumnRenamed("sum(total_vaccinations)", "total_vaccinations_sum")
+
+    def progression_to_plot():
+        # Pays affichés : les 5 premiers à apparaître dans les relevés triés par date
+        # (la normalisation porte sur tous les pays)
+        first_reports = vaccination_progress \
+            .filter(col("DATE_UPDATED").isNotNull() & col("total_vaccinations_sum").isNotNull()) \
+            .groupBy("COUNTRY").agg(_min("DATE_UPDATED").alias("first_report"))
+        countries_to_plot = [row["COUNTRY"] for row in
+                             first_reports.orderBy("first_report", "COUNTRY").limit(5).collect()]
 
-# Conversion des données en Pandas DataFrame
-vaccination_df = vaccination_progress.toPandas()
+        # Normalisation des dates, interpolation et cumul par pays sur les exécuteurs (pandas UDF
+        # groupée, échanges en Arrow) : seuls les pays affichés sont collectés sur le driver
+        progression = country_progression(vaccination_progress, "total_vaccinations_sum")
+        return to_pandas(progression.filter(col("COUNTRY").isin(countries_to_plot)), "vaccination_progress")
 
-# Nettoyage des données
-vaccination_df = vaccination_df.dropna(subset=["DATE_UPDATED", "total_vaccinations_sum"])
-vaccination_df["DATE_UPDATED"] = pd.to_datetime(vaccination_df["DATE_UPDATED"])
-vaccination_df = vaccination_df.sort_values(by="DATE_UPDATED")
+    # Choix des pays et calcul dans le cache de résultats : sans modification des données de
+    # la table enrichie, le graphique est relu sans lancer de job Spark
+    plot_df = results.get_or_compute("vaccination_progress", [config.GOLD_FACT_ENRICHED], progression_to_plot)
+    plot_df["DATE_UPDATED"] = pd.to_datetime(plot_df["DATE_UPDATED"])
 
-# Vérification des valeurs pour chaque pays (Debugging Step)
-print("Vérification des données avant normalisation :")
-for country in vaccination_df["COUNTRY"].unique()[:5]:
-    country_data = vaccination_df[vaccination_df["COUNTRY"] == country]
-    print(f"Progression des vaccinations pour {country}:")
-    print(country_data[["DATE_UPDATED", "total_vaccinations_sum"]].head(10))
-    print("\n")
+    # Données du graphique de progression cumulative
+    report_frames["country_progress"] = plot_df[["COUNTRY", "DATE_UPDATED", "cumulative_vaccinations"]]
 
-# Normalisation des dates pour chaque pays
-all_dates = pd.date_range(start=vaccination_df["DATE_UPDATED"].min(), 
-                          end=vaccination_df["DATE_UPDATED"].max())
 
-# Création d'une nouvelle table avec des dates uniformisées et interpolation
-normalized_data = []
+# COMMAND ----------
 
-for country in vaccination_df["COUNTRY"].unique()[:5]:  # Sélection des 5 premiers pays
-    country_data = vaccination_df[vaccination_df["COUNTRY"] == country]
-    country_data = country_data.set_index("DATE_UPDATED").reindex(all_dates)
-    country_data["total_vaccinations_sum"] = country_data["total_vaccinations_sum"].interpolate()
-    country_data["COUNTRY"] = country  # Réajoute la colonne pays
-    normalized_data.append(country_data)
+# MAGIC %md
+# MAGIC #  Comparaison des vaccinations par région OMS
+# MAGIC Description : Ce graphique en barres présente le nombre total de vaccinations agrégées par région OMS. Cela permet de comparer rapidement les performances de chaque région en matière de couverture vaccinale.
 
-# Fusion des données normalisées
-normalized_df = pd.concat(normalized_data).reset_index()
-normalized_df.rename(columns={"index": "DATE_UPDATED"}, inplace=True)
+# COMMAND ----------
 
-# Ajout de progression cumulée pour visualisation plus dynamique
-normalized_df["cumulative_vaccinations"] = normalized_df.groupby("COUNTRY")["total_vaccinations_sum"].cumsum()
+with recorder.stage("chart_region"):
+    # Total des vaccinations par région OMS, lu dans le cube
+    region_df = vaccination_cube.region_totals()
 
-# Visualisation de la progression cumulative
-plt.figure(figsize=(12, 6))
-for country in normalized_df["COUNTRY"].unique():
-    country_data = normalized_df[normalized_df["COUNTRY"] == country]
-    plt.plot(country_data["DATE_UPDATED"], country_data["cumulative_vaccinations"], label=country)
+    # Trier par ordre décroissant
+    region_df = region_df.sort_values(by="total_vaccinations_sum", ascending=False)
 
-plt.xlabel("Date")
-plt.ylabel("Cumulative Vaccinations")
-plt.title("Progression cumulée des vaccinations par pays (avec dates normalisées)")
-plt.legend()
-plt.grid(True)
-plt.show()
+    # Graphique barre annoté (couleurs viridis), rendu avec les autres en fin de notebook
+    report_frames["region_totals"] = region_df
 
 
 # COMMAND ----------
 
 # MAGIC %md
-# MAGIC #  Comparaison des vaccinations par région OMS
-# MAGIC Description : Ce graphique en barres présente le nombre total de vaccinations agrégées par région OMS. Cela permet de comparer rapidement les performances de chaque région en matière de couverture vaccinale.
+# MAGIC # Analyse temporelle des vaccinations
+# MAGIC Description : Ce graphique linéaire illustre la progression des vaccinations cumulées par année. L'axe des abscisses représente les années, tandis que l'axe des ordonnées montre le total des vaccinations.
 
 # COMMAND ----------
 
-from pyspark.sql.functions import col
-import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
 
-# Agrégation des vaccinations par région OMS
-region_aggregation = fact_table.groupBy("WHO_REGION") \
-    .agg({"total_vaccinations": "sum"}) \
-    .withColumnRenamed("sum(total_vaccinations)", "total_vaccinations_sum")
+with recorder.stage("chart_yearly"):
+    # Total des vaccinations par année, lu dans le cube
+    yearly_df = vaccination_cube.yearly_totals()
 
-# Conversion en Pandas DataFrame
-region_df = region_aggregation.toPandas()
+    # Nettoyage des valeurs NaN ou inf
+    yearly_df = yearly_df.dropna(subset=["year", "total_vaccinations_sum"])
+    yearly_df = yearly_df.replace([np.inf, -np.inf], np.nan).dropna()
 
-# Trier par ordre décroissant
-region_df = region_df.sort_values(by="total_vaccinations_sum", ascending=False)
+    # Courbe annotée par année, rendue avec les autres en fin de notebook
+    report_frames["yearly_totals"] = yearly_df
 
-# Affichage sous forme de graphique barre avec annotations et couleurs personnalisées
-plt.figure(figsize=(10, 6))
-colors = plt.cm.viridis(range(len(region_df)))  # Palette de couleurs dynamique
+# Fin des traitements sur fact_table : libération du cache
+print(f"Cache : {cache.report()}")
+print(f"Cache des résultats : {results.report()}")
+cache.unpin("fact_table")
 
-bars = plt.bar(region_df["WHO_REGION"], region_df["total_vaccinations_sum"], color=colors)
 
-# Ajouter des annotations pour chaque barre
-for bar in bars:
-    yval = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2, yval + yval*0.01, f'{int(yval):,}', 
-             ha='center', va='bottom', fontsize=10, rotation=45)
+# COMMAND ----------
 
-# Configuration du graphique
-plt.title("Comparaison des vaccinations par région OMS (Tri décroissant)")
-plt.ylabel("Total Vaccinations")
-plt.xlabel("Région OMS")
-plt.xticks(rotation=45)
-plt.grid(axis='y', linestyle='--', alpha=0.7)
+# MAGIC %md
+# MAGIC # Rendu des graphiques du rapport
+# MAGIC
+# MAGIC Les quatre graphiques sont rendus sans affichage (backend Agg) dans un pool de processus, en PNG et SVG
+# MAGIC sous `reports/charts`. Les fichiers sont nommés d'après une empreinte des données : un graphique dont les
+# MAGIC données n'ont pas changé n'est pas redessiné. Les données sont aussi enregistrées pour la tâche de nuit
+# MAGIC (`python -m lakehouse.charts`).
 
-# Afficher le graphique
-plt.show()
+# COMMAND ----------
 
+try:
+    from IPython.display import Image, display
+except ImportError:
+    # Notebook exécuté comme script : les chemins des images sont seulement affichés
+    display = None
+
+from lakehouse.charts import ReportRenderer, save_frames
+
+with recorder.stage("chart_render"):
+    save_frames(report_frames)
+    chart_paths = ReportRenderer().render_all(report_frames)
+    for name, paths in chart_paths.items():
+        png = next(p for p in paths if p.endswith(".png"))
+        if display is None:
+            print(f"Graphique {name} : {png}")
+        else:
+            display(Image(filename=png))
 
 # COMMAND ----------
 
 # MAGIC %md
-# MAGIC # Analyse temporelle des vaccinations
-# MAGIC Description : Ce graphique linéaire illustre la progression des vaccinations cumulées par année. L'axe des abscisses représente les années, tandis que l'axe des ordonnées montre le total des vaccinations.
+# MAGIC # Modifications de l'exécution
+# MAGIC
+# MAGIC Pour chaque table, clés insérées, modifiées et supprimées depuis la version du début de l'exécution
+# MAGIC (Change Data Feed, ou comparaison des deux versions par time travel). Le même appel répond à
+# MAGIC « qu'est-ce qui a changé depuis la version N » : `what_changed(spark, {table: N})`.
 
 # COMMAND ----------
 
-from pyspark.sql.functions import year
-import matplotlib.pyplot as plt
-import numpy as np
+from lakehouse.changes import what_changed
+
+try:
+    with recorder.stage("changesets"):
+        run_changes = what_changed(spark, versions_before)
+except Exception as e:
+    print(f"Erreur lors du calcul des modifications : {e}")
 
-# Agrégation des données par année
-yearly_vaccinations = fact_table.withColumn("year", year("DATE_UPDATED")) \
-    .groupBy("year").agg({"total_vaccinations": "sum"}) \
-    .withColumnRenamed("sum(total_vaccinations)", "total_vaccinations_sum")
-
-# Conversion en Pandas DataFrame
-yearly_df = yearly_vaccinations.toPandas()
-
-# Nettoyage des valeurs NaN ou inf
-yearly_df = yearly_df.dropna(subset=["year", "total_vaccinations_sum"])
-yearly_df = yearly_df.replace([np.inf, -np.inf], np.nan).dropna()
-
-# Affichage des résultats avec améliorations
-plt.figure(figsize=(10, 6))
-plt.plot(yearly_df["year"], yearly_df["total_vaccinations_sum"], 
-         marker='o', linestyle='-', color='tab:blue', label='Total Vaccinations')
-
-# Annotations des points
-for x, y in zip(yearly_df["year"], yearly_df["total_vaccinations_sum"]):
-    plt.text(x, y, f'{y:,.0f}', ha='center', va='bottom', fontsize=10)
-
-# Configuration des axes et du titre
-plt.title("Analyse temporelle des vaccinations (par année)", fontsize=14)
-plt.xlabel("Année", fontsize=12)
-plt.ylabel("Total Vaccinations", fontsize=12)
-plt.grid(True, linestyle='--', alpha=0.7)
-plt.xticks(yearly_df["year"].astype(int))  # Format des années en entier
-plt.legend()
-
-# Affichage du graphique
-plt.show()
+# Rapport d'exécution : JSON dans reports/runs et table Delta des métriques
+run_report = recorder.finish()
 
 
 # COMMAND ----------
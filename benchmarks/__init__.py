@@ -0,0 +1 @@
+"""Benchmarks du pipeline, à lancer depuis la racine du dépôt (``python -m benchmarks.<nom>``)."""
@@ -0,0 +1,66 @@
+"""Utilitaires partagés par les benchmarks."""
+
+import datetime
+import json
+import os
+import platform
+import statistics
+import time
+
+from lakehouse.session import PROFILE_ENV, get_spark
+
+# Profil des benchmarks : tous les cœurs, sauf LAKEHOUSE_SPARK_PROFILE explicite
+BENCHMARK_PROFILE = "local-large"
+
+
+def spark_session(app_name="VaccinationBenchmark", master=None, profile=None):
+    profile = profile or os.environ.get(PROFILE_ENV, BENCHMARK_PROFILE)
+    return get_spark(profile, app_name=app_name, master=master)
+
+
+def timed(fn, repeat=3):
+    """Exécute ``fn`` ``repeat`` fois et retourne les durées en secondes."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def report(label, durations):
+    print(f"{label:<40} médiane {statistics.median(durations):8.3f}s "
+          f"min {min(durations):8.3f}s  ({len(durations)} essais)")
+
+
+def summarize(durations, rows=None):
+    """Latences (médiane, min, max) et débit en lignes par seconde sur la médiane."""
+    median = statistics.median(durations)
+    summary = {"median_seconds": median, "min_seconds": min(durations),
+               "max_seconds": max(durations), "runs": len(durations)}
+    if rows is not None:
+        summary["rows"] = rows
+        summary["rows_per_second"] = rows / median if median else None
+    return summary
+
+
+def save_results(name, results, output_dir="reports/benchmarks"):
+    """Écrit les résultats d'un benchmark en JSON, avec le contexte d'exécution."""
+    os.makedirs(output_dir, exist_ok=True)
+    payload = {
+        "benchmark": name,
+        "created_at": datetime.datetime.now().isoformat(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    path = os.path.join(output_dir, f"{name}-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=str)
+    print(f"Résultats : {path}")
+    return path
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
@@ -0,0 +1,108 @@
+"""Shuffle des opérations par pays : Silver Delta, copie bucketée, DataFrame regroupé.
+
+Pour chaque facteur d'échelle, la table Silver de vaccination synthétique
+est écrite en Delta puis copiée en table bucketée par ``COUNTRY``
+(``lakehouse.bucketing``). Les opérations par pays du pipeline
+(progression par fenêtre, moyenne par pays, progression par pays et
+date, dimension géographique) sont exécutées sur chaque variante ; on
+relève le nombre d'Exchange du plan, les octets de shuffle écrits
+(``RunRecorder``) et la durée.
+
+    python -m benchmarks.bench_bucketing --scales 100 1000 --days 365
+"""
+
+import argparse
+import os
+import shutil
+
+from benchmarks import synthetic
+from benchmarks._common import save_results, spark_session
+from lakehouse import transforms
+from lakehouse.bucketing import DEFAULT_BUCKETS, clustered, exchange_count, write_bucketed
+from lakehouse.metrics import RunRecorder
+
+DEFAULT_WORK_DIR = ".cache/benchmarks/bucketing"
+BUCKETED_TABLE = "bench_silver_vaccination_bucketed"
+
+
+def _drain(df):
+    df.write.format("noop").mode("overwrite").save()
+
+
+WORKLOADS = {
+    "progression": lambda silver: transforms.enrich_fact(silver.select(*transforms.FACT_COLUMNS)),
+    "daily_avg": transforms.build_daily_avg,
+    "country_date_progress": lambda silver: silver.groupBy("COUNTRY", "DATE_UPDATED")
+        .sum("TOTAL_VACCINATIONS"),
+    "dimension_country": lambda silver: silver.select("COUNTRY", "ISO3", "WHO_REGION").distinct(),
+}
+
+
+def run_variant(spark, recorder, variant, silver):
+    results = {}
+    for name, workload in WORKLOADS.items():
+        df = workload(silver)
+        with recorder.stage(f"{variant}:{name}") as record:
+            _drain(df)
+        results[name] = {
+            "exchanges": exchange_count(df),
+            "shuffle_write_bytes": record.get("shuffle_write_bytes"),
+            "wall_seconds": record["wall_seconds"],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--buckets", type=int, default=DEFAULT_BUCKETS)
+    parser.add_argument("--seed", type=int, default=synthetic.DEFAULT_SEED)
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR)
+    args = parser.parse_args()
+
+    spark = spark_session()
+    # Les lectures de table bucketée doivent garder un partitionnement par bucket
+    spark.conf.set("spark.sql.sources.bucketing.enabled", "true")
+    recorder = RunRecorder(spark, report_dir=os.path.join(args.work_dir, "runs"))
+
+    results = {}
+    for scale in args.scales:
+        path = os.path.join(args.work_dir, f"silver-{scale}x")
+        shutil.rmtree(path, ignore_errors=True)
+        silver = transforms.clean_vaccination(synthetic.vaccination(spark, scale, args.days, args.seed))
+        silver.write.format("delta").mode("overwrite").save(path)
+        write_bucketed(spark, path, BUCKETED_TABLE, buckets=args.buckets,
+                       location=os.path.join(args.work_dir, f"bucketed-{scale}x"))
+
+        delta = spark.read.format("delta").load(path)
+        grouped = clustered(delta, buckets=args.buckets).cache()
+        with recorder.stage(f"{scale}x:clustered:prepare") as record:
+            rows = grouped.count()
+        prepare_bytes = record.get("shuffle_write_bytes")
+
+        results[scale] = {
+            "rows": rows,
+            "delta": run_variant(spark, recorder, f"{scale}x:delta", delta),
+            "bucketed": run_variant(spark, recorder, f"{scale}x:bucketed", spark.table(BUCKETED_TABLE)),
+            "clustered": run_variant(spark, recorder, f"{scale}x:clustered", grouped),
+            "clustered_prepare_shuffle_bytes": prepare_bytes,
+        }
+        grouped.unpersist()
+
+        print(f"\n{scale}x ({rows} lignes)")
+        print(f"{'opération':<24}{'variante':<12}{'Exchange':>9}{'shuffle (Mo)':>14}{'durée (s)':>11}")
+        for name in WORKLOADS:
+            for variant in ("delta", "bucketed", "clustered"):
+                r = results[scale][variant][name]
+                shuffle = (r["shuffle_write_bytes"] or 0) / 2**20
+                print(f"{name:<24}{variant:<12}{r['exchanges']:>9}{shuffle:>14.1f}{r['wall_seconds']:>11.2f}")
+        saved = sum((results[scale]["delta"][n]["shuffle_write_bytes"] or 0)
+                    - (results[scale]["bucketed"][n]["shuffle_write_bytes"] or 0) for n in WORKLOADS)
+        print(f"Shuffle évité par la copie bucketée : {saved / 2**20:.1f} Mo")
+
+    save_results("bucketing", results)
+
+
+if __name__ == "__main__":
+    main()
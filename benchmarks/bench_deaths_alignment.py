@@ -0,0 +1,71 @@
+"""Alignement vaccinations × décès : jointure sur intervalle contre fenêtres ``RANGE``.
+
+Données synthétiques sur plusieurs années (par défaut 230 pays × 5 ans
+de décès journaliers, un relevé de vaccination par semaine) :
+
+    python -m benchmarks.bench_deaths_alignment --scale 1825 --days 1825 --repeat 3
+"""
+
+import argparse
+
+from pyspark.sql.functions import col, date_add, date_sub, datediff, lit, sum as _sum, when
+
+from benchmarks import synthetic
+from benchmarks._common import report, spark_session, timed
+from lakehouse import transforms
+from lakehouse.alignment import DEFAULT_WINDOWS, align_deaths, window_columns
+
+
+def _drain(df):
+    df.write.format("noop").mode("overwrite").save()
+
+
+def range_join(fact, deaths, windows=DEFAULT_WINDOWS):
+    """Version de référence : jointure sur (pays, intervalle de dates) puis agrégation."""
+    widest = max(windows)
+    f, d = fact.alias("f"), deaths.alias("d")
+    offset = datediff(col("d.DATE_UPDATED"), col("f.DATE_UPDATED"))
+    joined = f.join(
+        d,
+        (col("f.COUNTRY") == col("d.COUNTRY"))
+        & (col("d.DATE_UPDATED") > date_sub(col("f.DATE_UPDATED"), widest))
+        & (col("d.DATE_UPDATED") <= date_add(col("f.DATE_UPDATED"), widest)),
+        "left",
+    )
+    aggregations = []
+    for w in windows:
+        aggregations.append(_sum(when((offset > -w) & (offset <= 0), col("d.NEW_DEATHS")))
+                            .alias(f"deaths_before_{w}d"))
+        aggregations.append(_sum(when((offset > 0) & (offset <= w), col("d.NEW_DEATHS")))
+                            .alias(f"deaths_after_{w}d"))
+    return joined.groupBy(*(col(f"f.{c}") for c in transforms.FACT_COLUMNS)).agg(*aggregations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=5 * 365)
+    parser.add_argument("--days", type=int, default=5 * 365)
+    parser.add_argument("--snapshot-every", type=int, default=7, help="Un relevé de vaccination tous les N jours")
+    parser.add_argument("--seed", type=int, default=synthetic.DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spark = spark_session()
+    vaccination = synthetic.vaccination(spark, args.scale, args.days, args.seed) \
+        .filter(datediff(col("DATE_UPDATED"), lit(synthetic.START_DATE)) % args.snapshot_every == 0)
+    fact = transforms.build_fact(transforms.clean_vaccination(vaccination)).cache()
+    deaths = transforms.clean_who_daily(synthetic.who_daily(spark, args.scale, args.days, args.seed)).cache()
+    print(f"{fact.count()} relevés, {deaths.count()} décomptes journaliers")
+
+    report("jointure sur intervalle", timed(lambda: _drain(range_join(fact, deaths)), args.repeat))
+    report("fenêtres RANGE (tri par pays)", timed(lambda: _drain(align_deaths(fact, deaths)), args.repeat))
+
+    # Les deux méthodes doivent produire les mêmes fenêtres
+    compared = [c for c in window_columns() if c.startswith("deaths_")]
+    totals = [df.agg(*(_sum(c).alias(c) for c in compared)).first().asDict()
+              for df in (range_join(fact, deaths), align_deaths(fact, deaths))]
+    print("Résultats identiques" if totals[0] == totals[1] else f"Résultats différents : {totals}")
+
+
+if __name__ == "__main__":
+    main()
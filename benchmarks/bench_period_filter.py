@@ -0,0 +1,52 @@
+"""Filtrage des décès mensuels : ``apply`` ligne à ligne contre filtre poussé dans Spark.
+
+Données journalières synthétiques (``benchmarks/synthetic.py``) ; par
+défaut 230 pays sur cinq ans à partir de 2020 :
+
+    python -m benchmarks.bench_period_filter --scale 1825 --days 1825 --repeat 3
+"""
+
+import argparse
+
+from pyspark.sql.functions import month, sum as _sum, year
+
+from benchmarks import synthetic
+from benchmarks._common import report, spark_session, timed
+from lakehouse import transforms
+from lakehouse.periods import filter_periods_pandas, monthly_deaths, parse_periods
+
+TARGET_PERIODS = [{"start": "2022-07", "end": "2024-01", "step": 2}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=5 * 365)
+    parser.add_argument("--days", type=int, default=5 * 365)
+    parser.add_argument("--seed", type=int, default=synthetic.DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spark = spark_session()
+    df = transforms.clean_who_daily(synthetic.who_daily(spark, args.scale, args.days, args.seed)).cache()
+    df.count()
+    target = [(k // 100, k % 100) for k in parse_periods(TARGET_PERIODS)]
+
+    def legacy():
+        deaths_df = df.groupBy(year("DATE_UPDATED").alias("year"), month("DATE_UPDATED").alias("month")) \
+            .agg(_sum("NEW_DEATHS").alias("monthly_new_deaths")).toPandas()
+        return deaths_df[deaths_df.apply(lambda row: (row["year"], row["month"]) in target, axis=1)]
+
+    def pushed_down():
+        return monthly_deaths(df, TARGET_PERIODS).toPandas()
+
+    report("apply ligne à ligne (driver)", timed(legacy, args.repeat))
+    report("filtre poussé dans Spark", timed(pushed_down, args.repeat))
+
+    # Filtre pandas seul, sur un grand DataFrame déjà collecté
+    pdf = df.select(year("DATE_UPDATED").alias("year"), month("DATE_UPDATED").alias("month")).toPandas()
+    report("pandas apply", timed(lambda: pdf[pdf.apply(lambda r: (r["year"], r["month"]) in target, axis=1)], 1))
+    report("pandas isin vectorisé", timed(lambda: filter_periods_pandas(pdf, TARGET_PERIODS), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Latence et débit de chaque étape du pipeline et des requêtes analytiques.
+
+Pour chaque facteur d'échelle, les deux sources sont générées de façon
+déterministe (``benchmarks/synthetic.py``), le pipeline Bronze → Silver
+→ Gold est exécuté étape par étape (mesurée par ``RunRecorder``) dans un
+répertoire de travail isolé, puis les requêtes des graphiques sont
+chronométrées sur les tables produites. Les résultats sont écrits en
+JSON dans ``reports/benchmarks`` ; ``--baseline`` compare à une exécution
+précédente.
+
+    python -m benchmarks.bench_pipeline --scales 1 10 100 1000 --repeat 3
+    python -m benchmarks.bench_pipeline --scales 100 --baseline reports/benchmarks/pipeline-<date>.json
+"""
+
+import argparse
+import os
+import shutil
+from collections import defaultdict
+
+from benchmarks import synthetic
+from benchmarks._common import load_results, save_results, spark_session, summarize, timed
+from lakehouse import config
+from lakehouse.cube import VaccinationCube
+from lakehouse.metrics import RunRecorder
+from lakehouse.periods import monthly_deaths
+from lakehouse.stages import build_pipeline
+from lakehouse.timeseries import normalize_country_series, normalize_country_series_spark
+
+DEFAULT_WORK_DIR = ".cache/benchmarks"
+
+
+def _drain(df):
+    """Exécute entièrement le plan de ``df`` sans rien écrire."""
+    df.write.format("noop").mode("overwrite").save()
+
+
+def run_stages(spark, root, sources, repeat):
+    """Exécute le pipeline ``repeat`` fois, une étape à la fois ; une mesure par étape."""
+    durations, rows = defaultdict(list), {}
+    for i in range(repeat):
+        shutil.rmtree(os.path.join(root, "delta"), ignore_errors=True)
+        recorder = RunRecorder(spark, run_id=f"bench-{i}", report_dir=os.path.join(root, "runs"))
+        build_pipeline(root=root, sources=sources).run(spark, max_workers=1, recorder=recorder)
+        recorder.write_report()
+        for record in recorder.records:
+            durations[record["stage"]].append(record["wall_seconds"])
+            rows[record["stage"]] = record.get("rows_written") or record.get("rows_read")
+    return {name: summarize(durations[name], rows[name]) for name in sorted(durations)}
+
+
+def _periods(silver_who):
+    """Un mois sur deux sur toute la période générée."""
+    start, end = silver_who.selectExpr("min(DATE_UPDATED)", "max(DATE_UPDATED)").first()
+    return [{"start": f"{start:%Y-%m}", "end": f"{end:%Y-%m}", "step": 2}]
+
+
+def queries(spark, root):
+    """Requêtes des graphiques du notebook : ``{nom: (fonction, lignes lues)}``."""
+    def table(path):
+        return spark.read.format("delta").load(os.path.join(root, path))
+
+    fact = table(config.GOLD_FACT_ENRICHED)
+    silver_who = table(config.SILVER_WHO_DEATHS)
+    cube_df = table(config.GOLD_CUBE)
+    fact_rows, who_rows, cube_rows = fact.count(), silver_who.count(), cube_df.count()
+
+    periods = _periods(silver_who)
+    cube = VaccinationCube(cube_df.toPandas())
+    progress = fact.groupBy("COUNTRY", "DATE_UPDATED").sum("TOTAL_VACCINATIONS") \
+        .withColumnRenamed("sum(TOTAL_VACCINATIONS)", "total_vaccinations_sum")
+    progress_pdf = progress.toPandas()
+
+    return {
+        "monthly_deaths": (lambda: monthly_deaths(silver_who, periods).toPandas(), who_rows),
+        "fact_region_scan": (lambda: _drain(fact.filter("WHO_REGION = 'EURO'")), fact_rows),
+        "cube_load": (cube_df.toPandas, cube_rows),
+        "cube_region_totals": (cube.region_totals, cube_rows),
+        "cube_country_monthly": (cube.country_monthly_progress, cube_rows),
+        "progress_collect": (progress.toPandas, fact_rows),
+        "progress_normalize_pandas": (
+            lambda: normalize_country_series(progress_pdf, "total_vaccinations_sum"), len(progress_pdf)
+        ),
+        "progress_normalize_spark": (
+            lambda: _drain(normalize_country_series_spark(progress, "total_vaccinations_sum")), fact_rows
+        ),
+    }
+
+
+def run_queries(spark, root, repeat):
+    results = {}
+    for name, (query, rows) in queries(spark, root).items():
+        query()  # préchauffage : compilation du plan, chargement des classes
+        results[name] = summarize(timed(query, repeat), rows)
+    return results
+
+
+def compare(results, baseline):
+    """Rapport médiane actuelle / médiane de référence pour les mesures communes."""
+    reference = {(r["scale"], r["kind"], r["name"]): r for r in baseline}
+    for r in results:
+        before = reference.get((r["scale"], r["kind"], r["name"]))
+        if before and before["median_seconds"]:
+            ratio = r["median_seconds"] / before["median_seconds"]
+            flag = "  <-- régression" if ratio > 1.2 else ""
+            print(f"x{r['scale']:<6} {r['kind']:<6} {r['name']:<32} {ratio:6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--days", type=int, help="Nombre de jours imposé (le nombre de pays s'ajuste)")
+    parser.add_argument("--seed", type=int, default=synthetic.DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--master", default="local[*]")
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR)
+    parser.add_argument("--output-dir", default="reports/benchmarks")
+    parser.add_argument("--baseline", help="Résultats JSON d'une exécution précédente à comparer")
+    parser.add_argument("--skip-queries", action="store_true")
+    args = parser.parse_args()
+
+    spark = spark_session(master=args.master)
+    results = []
+    for scale in args.scales:
+        n_countries, n_days = synthetic.grid(scale, args.days)
+        print(f"=== x{scale} : {n_countries} pays × {n_days} jours ===")
+        root = os.path.join(args.work_dir, f"x{scale}")
+        sources = synthetic.generate(spark, scale, os.path.join(root, "sources"), args.days, args.seed)
+
+        measures = [("stage", name, s) for name, s in run_stages(spark, root, sources, args.repeat).items()]
+        if not args.skip_queries:
+            measures += [("query", name, s) for name, s in run_queries(spark, root, args.repeat).items()]
+
+        for kind, name, summary in measures:
+            results.append({"scale": scale, "countries": n_countries, "days": n_days,
+                            "kind": kind, "name": name, **summary})
+            rate = summary.get("rows_per_second")
+            print(f"x{scale:<6} {kind:<6} {name:<32} médiane {summary['median_seconds']:8.3f}s"
+                  + (f"  {rate:>14,.0f} lignes/s" if rate else ""))
+
+    save_results("pipeline", {"master": args.master, "seed": args.seed, "measures": results},
+                 args.output_dir)
+    if args.baseline:
+        compare(results, load_results(args.baseline)["measures"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Compare la lecture Bronze avec ``inferSchema`` et avec le schéma déclaré.
+
+    python -m benchmarks.bench_schema_inference --source who_daily --repeat 5
+"""
+
+import argparse
+
+from benchmarks._common import report, spark_session, timed
+from lakehouse.schemas import PERMISSIVE, REGISTRY, get_schema, read_source
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", choices=sorted(REGISTRY), default="vaccination")
+    parser.add_argument("--path", help="Fichier CSV à lire (par défaut celui du registre)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spark = spark_session()
+    path = args.path or get_schema(args.source).path
+
+    def inferred():
+        spark.read.format("csv") \
+            .option("header", "true") \
+            .option("inferSchema", "true") \
+            .load(path) \
+            .write.format("noop").mode("overwrite").save()
+
+    def declared():
+        read_source(spark, args.source, mode=PERMISSIVE, path=path) \
+            .write.format("noop").mode("overwrite").save()
+
+    report("inferSchema", timed(inferred, args.repeat))
+    report(f"schéma déclaré ({get_schema(args.source).stamp})", timed(declared, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Générateur déterministe de données synthétiques aux schémas des deux sources.
+
+Le facteur d'échelle multiplie le nombre de couples pays × jours : 1x
+correspond à ``BASE_COUNTRIES`` pays sur un jour (l'ordre de grandeur de
+``data/vaccination-data.csv``), 10 000x à 2,3 millions de lignes par
+source. Le produit est réparti entre pays et jours de façon exacte
+(``grid``), ou avec un nombre de jours imposé (``days=``).
+
+Toutes les valeurs sont des fonctions pures de (pays, jour, graine)
+calculées dans Spark avec ``hash`` (Murmur3) : deux générations avec les
+mêmes paramètres produisent les mêmes fichiers, sur n'importe quelle
+machine. Les cumuls sont croissants par pays et une fraction fixe de
+valeurs est nulle, comme dans les données réelles.
+"""
+
+import json
+import math
+import os
+
+from pyspark.sql.functions import array, col, date_add, element_at, expr, floor, hash as _hash, lit, pmod
+from pyspark.sql.functions import round as _round, sum as _sum, when
+from pyspark.sql.window import Window
+
+BASE_COUNTRIES = 230
+START_DATE = "2020-01-01"
+DEFAULT_SEED = 42
+GENERATOR_VERSION = 1
+
+WHO_REGIONS = ("AFRO", "AMRO", "EMRO", "EURO", "SEARO", "WPRO")
+VACCINES = ("Pfizer BioNTech", "Moderna", "AstraZeneca", "Janssen", "Sinovac", "Sinopharm")
+
+MARKER_NAME = "_generated.json"
+
+
+def grid(scale, days=None):
+    """Nombre de pays et de jours pour le facteur ``scale``.
+
+    Sans ``days``, le facteur est réparti entre pays et jours avec le plus
+    grand diviseur de ``scale`` inférieur à sa racine (10 000x → 23 000 pays
+    × 100 jours). Avec ``days``, le nombre de pays est ajusté pour garder
+    ``BASE_COUNTRIES × scale`` couples.
+    """
+    if scale < 1:
+        raise ValueError(f"Facteur d'échelle invalide : {scale}")
+    if days is not None:
+        return max(1, BASE_COUNTRIES * scale // days), days
+    factor = max(d for d in range(1, math.isqrt(scale) + 1) if scale % d == 0)
+    return BASE_COUNTRIES * factor, scale // factor
+
+
+def _noise(seed, *columns):
+    """Entier positif pseudo-aléatoire, fonction pure des colonnes et de la graine."""
+    return pmod(_hash(lit(seed), *columns), lit(2 ** 31 - 1))
+
+
+def countries(spark, n, seed=DEFAULT_SEED):
+    """``n`` pays : nom, code ISO3 (unique), région OMS et population."""
+    iso3 = expr(
+        "concat(char(65 + id div 676 % 26), char(65 + id div 26 % 26), char(65 + id % 26), "
+        "if(id >= 17576, cast(id div 17576 as string), ''))"
+    )
+    regions = array(*[lit(r) for r in WHO_REGIONS])
+    return spark.range(n).select(
+        col("id").alias("country_id"),
+        expr("format_string('Country %05d', id)").alias("COUNTRY"),
+        iso3.alias("ISO3"),
+        element_at(regions, (col("id") % len(WHO_REGIONS) + 1).cast("int")).alias("WHO_REGION"),
+        (lit(100_000) + _noise(seed, col("id")) % 50_000_000).alias("population"),
+    )
+
+
+def _country_days(spark, scale, days, seed):
+    n_countries, n_days = grid(scale, days)
+    df = countries(spark, n_countries, seed) \
+        .crossJoin(spark.range(n_days).withColumnRenamed("id", "day")) \
+        .withColumn("date", date_add(lit(START_DATE).cast("date"), col("day").cast("int")))
+    return df, n_days
+
+
+def vaccination(spark, scale, days=None, seed=DEFAULT_SEED):
+    """DataFrame au schéma ``vaccination`` : un relevé par pays et par jour."""
+    df, n_days = _country_days(spark, scale, days, seed)
+    coverage = lit(0.5) + _noise(seed + 1, col("country_id")) % 250 / 100
+    total = floor(col("population") * coverage * (col("day") + 1) / n_days)
+    first_dose = floor(total * 0.45)
+    last_dose = floor(total * 0.4)
+    booster = when(_noise(seed + 2, col("country_id"), col("day")) % 10 != 0, floor(total * 0.15))
+    # 1 % de totaux manquants, écartés par la zone Silver
+    reported_total = when(_noise(seed + 3, col("country_id"), col("day")) % 100 != 0, total)
+    n_types = (_noise(seed + 4, col("country_id")) % len(VACCINES) + 1).cast("int")
+    first_vaccine = date_add(lit(START_DATE).cast("date"),
+                             (-(_noise(seed + 5, col("country_id")) % 60)).cast("int"))
+
+    def per100(column):
+        return _round(column / col("population") * 100)
+
+    return df \
+        .withColumn("vaccines", array(*[lit(v) for v in VACCINES])) \
+        .withColumn("n_types", n_types) \
+        .select(
+            col("COUNTRY"),
+            col("ISO3"),
+            col("WHO_REGION"),
+            when(col("country_id") % 3 == 0, lit("OWID")).otherwise(lit("REPORTING")).alias("DATA_SOURCE"),
+            col("date").alias("DATE_UPDATED"),
+            reported_total.cast("double").alias("TOTAL_VACCINATIONS"),
+            first_dose.cast("double").alias("PERSONS_VACCINATED_1PLUS_DOSE"),
+            per100(reported_total).alias("TOTAL_VACCINATIONS_PER100"),
+            per100(first_dose).alias("PERSONS_VACCINATED_1PLUS_DOSE_PER100"),
+            last_dose.cast("double").alias("PERSONS_LAST_DOSE"),
+            per100(last_dose).alias("PERSONS_LAST_DOSE_PER100"),
+            expr("array_join(slice(vaccines, 1, n_types), ',')").alias("VACCINES_USED"),
+            first_vaccine.alias("FIRST_VACCINE_DATE"),
+            col("n_types").cast("double").alias("NUMBER_VACCINES_TYPES_USED"),
+            booster.cast("double").alias("PERSONS_BOOSTER_ADD_DOSE"),
+            per100(booster).alias("PERSONS_BOOSTER_ADD_DOSE_PER100"),
+        )
+
+
+def who_daily(spark, scale, days=None, seed=DEFAULT_SEED):
+    """DataFrame au schéma ``who_daily`` : cas et décès journaliers par pays."""
+    df, _ = _country_days(spark, scale, days, seed)
+    weekly = (col("day") % 7 + 1).cast("long")
+    new_cases = (_noise(seed + 6, col("country_id"), col("day")) % 500) * weekly
+    new_deaths = _noise(seed + 7, col("country_id"), col("day")) % 20
+    to_date = Window.partitionBy("country_id").orderBy("day") \
+        .rowsBetween(Window.unboundedPreceding, Window.currentRow)
+
+    return df \
+        .withColumn("New_cases", new_cases.cast("long")) \
+        .withColumn("New_deaths", new_deaths.cast("long")) \
+        .select(
+            col("date").alias("Date_reported"),
+            col("ISO3").alias("Country_code"),
+            col("COUNTRY").alias("Country"),
+            col("WHO_REGION").alias("WHO_region"),
+            col("New_cases"),
+            _sum("New_cases").over(to_date).alias("Cumulative_cases"),
+            col("New_deaths"),
+            _sum("New_deaths").over(to_date).alias("Cumulative_deaths"),
+        )
+
+
+GENERATORS = {"vaccination": vaccination, "who_daily": who_daily}
+
+
+def _marker(path):
+    marker = os.path.join(path, MARKER_NAME)
+    if not os.path.exists(marker):
+        return None
+    with open(marker, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def generate(spark, scale, root, days=None, seed=DEFAULT_SEED, sources=tuple(GENERATORS)):
+    """Écrit les CSV synthétiques sous ``root`` et retourne ``{source: chemin}``.
+
+    Un jeu déjà généré avec les mêmes paramètres est réutilisé tel quel.
+    """
+    n_countries, n_days = grid(scale, days)
+    params = {"scale": scale, "countries": n_countries, "days": n_days, "seed": seed,
+              "version": GENERATOR_VERSION}
+    paths = {}
+    for name in sources:
+        path = os.path.join(root, name)
+        paths[name] = path
+        if _marker(path) == params:
+            continue
+        GENERATORS[name](spark, scale, days, seed) \
+            .write.mode("overwrite").option("header", "true").csv(path)
+        with open(os.path.join(path, MARKER_NAME), "w", encoding="utf-8") as f:
+            json.dump(params, f)
+        print(f"Données synthétiques {name} x{scale} ({n_countries} pays × {n_days} jours) : {path}")
+    return paths
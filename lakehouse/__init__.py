@@ -0,0 +1,6 @@
+"""Briques réutilisables du pipeline Lakehouse (Bronze → Silver → Gold).
+
+Les modules sont importés explicitement depuis le notebook
+(``from lakehouse.schemas import read_source``) afin que l'import du
+paquet ne démarre pas de session Spark.
+"""
@@ -0,0 +1,65 @@
+"""Table Fait croisée : relevés de vaccination et décès journaliers alignés dans le temps.
+
+Les deux sources n'ont pas la même granularité : un relevé de
+vaccination (``DATE_UPDATED``) tous les quelques jours ou semaines, un
+décompte de décès par jour. Pour chaque relevé, on veut les décès des
+``w`` jours qui le précèdent (relevé compris) et des ``w`` jours qui le
+suivent, ainsi que le cumul connu à la date du relevé (*as-of*).
+
+Une jointure sur intervalle de dates (``COUNTRY`` égal et date entre
+deux bornes) duplique chaque jour de décès dans toutes les fenêtres qui
+le couvrent avant de réagréger. Ici les deux sources sont réunies dans
+un seul DataFrame, partitionné par pays et trié par jour (un seul
+shuffle, comme l'entrée d'un *sort-merge join*), puis chaque fenêtre est
+une somme sur un cadre ``RANGE`` autour du relevé : chaque ligne de
+décès est lue une fois par pays et toutes les fenêtres sont calculées
+dans le même tri.
+
+Une fenêtre sans aucun décès déclaré vaut ``null``.
+"""
+
+from pyspark.sql.functions import col, datediff, lit, max as _max, sum as _sum, when
+from pyspark.sql.window import Window
+
+from lakehouse import transforms
+
+DEFAULT_WINDOWS = (7, 28)
+
+_SNAPSHOT = "_is_snapshot"
+_DAY = "_day"
+_EPOCH = "1970-01-01"
+
+
+def window_columns(windows=DEFAULT_WINDOWS):
+    """Noms des colonnes produites pour ``windows``."""
+    names = []
+    for w in windows:
+        names += [f"deaths_before_{w}d", f"deaths_after_{w}d"]
+    return names + ["cumulative_deaths", "last_deaths_report"]
+
+
+def align_deaths(fact, deaths, windows=DEFAULT_WINDOWS):
+    """Relevés de ``fact`` (clés naturelles) complétés par les décès de ``deaths`` (Silver OMS).
+
+    ``deaths_before_{w}d`` couvre ``]date - w, date]``, ``deaths_after_{w}d``
+    couvre ``]date, date + w]`` ; ``cumulative_deaths`` et
+    ``last_deaths_report`` sont le cumul et la date du dernier décompte
+    connus au jour du relevé.
+    """
+    snapshots = fact.select(*transforms.FACT_COLUMNS).withColumn(_SNAPSHOT, lit(True))
+    daily = deaths.select("COUNTRY", "DATE_UPDATED", "NEW_DEATHS").withColumn(_SNAPSHOT, lit(False))
+    rows = snapshots.unionByName(daily, allowMissingColumns=True) \
+        .withColumn(_DAY, datediff(col("DATE_UPDATED"), lit(_EPOCH)))
+
+    by_country = Window.partitionBy("COUNTRY").orderBy(_DAY)
+    to_date = by_country.rangeBetween(Window.unboundedPreceding, 0)
+    aligned = []
+    for w in windows:
+        aligned.append(_sum("NEW_DEATHS").over(by_country.rangeBetween(-(w - 1), 0)).alias(f"deaths_before_{w}d"))
+        aligned.append(_sum("NEW_DEATHS").over(by_country.rangeBetween(1, w)).alias(f"deaths_after_{w}d"))
+    aligned.append(_sum("NEW_DEATHS").over(to_date).alias("cumulative_deaths"))
+    aligned.append(_max(when(~col(_SNAPSHOT), col("DATE_UPDATED"))).over(to_date).alias("last_deaths_report"))
+
+    return rows.select(*transforms.FACT_COLUMNS, _SNAPSHOT, *aligned) \
+        .filter(col(_SNAPSHOT)) \
+        .drop(_SNAPSHOT)
@@ -0,0 +1,100 @@
+"""Tables Silver regroupées par pays : opérations par pays sans Exchange.
+
+Fenêtres ``partitionBy("COUNTRY")``, ``groupBy("COUNTRY")`` ou
+``groupBy("COUNTRY", "DATE_UPDATED")`` redistribuent (shuffle) toutes
+les lignes par pays à chaque requête. Delta Lake 2.3 ne conserve pas de
+spécification de *buckets* ; les tables Silver restent donc en Delta
+(source de vérité, triées en Z-ORDER sur ``COUNTRY``) et deux moyens
+permettent à Spark de savoir que les données sont déjà regroupées :
+
+- ``write_bucketed`` en écrit une copie Parquet *bucketée* par
+  ``COUNTRY`` et triée par (``COUNTRY``, ``DATE_UPDATED``) sous
+  ``config.BUCKETED_DIR``, déclarée comme table externe du catalogue et
+  marquée avec la version Delta copiée. Le catalogue sans Hive est vidé
+  à chaque session, mais une table externe se recrée sur son répertoire
+  existant (une table gérée refuserait l'emplacement déjà occupé dans
+  ``spark-warehouse``). ``read_silver`` lit cette copie si elle
+  correspond à la version courante, la table Delta sinon : une copie
+  périmée (après un MERGE incrémental) n'est jamais lue ;
+- ``clustered`` redistribue une fois un DataFrame par pays (à mettre en
+  cache) : les opérations par pays qui suivent réutilisent ce
+  partitionnement.
+
+``exchange_count`` compte les shuffles d'un plan physique.
+"""
+
+import os
+
+from lakehouse import config
+from lakehouse.delta_log import table_version
+
+DEFAULT_BUCKETS = 16
+BUCKET_KEY = "COUNTRY"
+BUCKET_SORT = ("COUNTRY", "DATE_UPDATED")
+SOURCE_PROPERTY = "lakehouse.source_version"
+
+# Table Delta Silver → copie bucketée dans le catalogue
+BUCKETED_TABLES = {
+    config.SILVER_VACCINATION: "silver_vaccination_bucketed",
+    config.SILVER_WHO_DEATHS: "silver_who_deaths_bucketed",
+}
+
+
+def _source_stamp(spark, path, version=None):
+    return f"{path}@{table_version(spark, path) if version is None else version}"
+
+
+def write_bucketed(spark, path, table=None, buckets=DEFAULT_BUCKETS, key=BUCKET_KEY, sort_by=BUCKET_SORT,
+                   location=None):
+    """Copie la version courante de la table Delta ``path`` en table Parquet bucketée ``table``.
+
+    Les fichiers sont écrits dans ``location`` (``config.BUCKETED_DIR/table``
+    par défaut), remplacés à chaque copie.
+    """
+    table = table or BUCKETED_TABLES[path]
+    location = location or os.path.join(config.BUCKETED_DIR, table)
+    version = table_version(spark, path)
+    stamp = _source_stamp(spark, path, version)
+    # Table externe : supprimer l'entrée du catalogue ne touche pas aux fichiers,
+    # que l'écriture en overwrite remplace ensuite
+    spark.sql(f"DROP TABLE IF EXISTS {table}")
+    spark.read.format("delta").option("versionAsOf", version).load(path) \
+        .write.format("parquet") \
+        .option("path", os.path.abspath(location)) \
+        .bucketBy(buckets, key) \
+        .sortBy(*sort_by) \
+        .mode("overwrite") \
+        .saveAsTable(table)
+    spark.sql(f"ALTER TABLE {table} SET TBLPROPERTIES ('{SOURCE_PROPERTY}' = '{stamp}')")
+    print(f"Copie bucketée {table} : {buckets} buckets sur {key} ({stamp})")
+    return table
+
+
+def bucketed_table(spark, path, table=None):
+    """Nom de la copie bucketée de ``path`` si elle est à jour, sinon ``None``."""
+    table = table or BUCKETED_TABLES.get(path)
+    if table is None or not spark.catalog.tableExists(table):
+        return None
+    properties = {row["key"]: row["value"] for row in spark.sql(f"SHOW TBLPROPERTIES {table}").collect()}
+    return table if properties.get(SOURCE_PROPERTY) == _source_stamp(spark, path) else None
+
+
+def read_silver(spark, path, table=None):
+    """Table Silver ``path``, lue dans sa copie bucketée quand celle-ci est à jour."""
+    table = bucketed_table(spark, path, table)
+    if table is not None:
+        return spark.table(table)
+    return spark.read.format("delta").load(path)
+
+
+def clustered(df, buckets=DEFAULT_BUCKETS, key=BUCKET_KEY, sort_by=BUCKET_SORT):
+    """``df`` redistribué une fois par ``key`` et trié dans chaque partition."""
+    return df.repartition(buckets, key).sortWithinPartitions(*sort_by)
+
+
+def exchange_count(df):
+    """Nombre d'opérateurs Exchange (shuffle) dans le plan physique de ``df``."""
+    plan = df._jdf.queryExecution().executedPlan().toString()
+    # Les diffusions (BroadcastExchange) et les shuffles réutilisés ne redistribuent rien
+    return sum(1 for line in plan.splitlines()
+               if "Exchange " in line and "BroadcastExchange" not in line and "ReusedExchange" not in line)
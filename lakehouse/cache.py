@@ -0,0 +1,114 @@
+"""Gestion du cache des DataFrames intermédiaires partagés.
+
+Un DataFrame lu par plusieurs étapes (``df_clean``, la table Fait…) est
+épinglé une fois avec la liste de ses consommateurs ; il est évincé dès
+que le dernier consommateur a terminé. Le gestionnaire choisit le niveau
+de stockage selon la taille estimée du plan et compte les succès/échecs
+pour le rapport d'exécution.
+"""
+
+import threading
+
+from pyspark import StorageLevel
+
+# En dessous de ce volume estimé, le cache reste en mémoire uniquement
+DEFAULT_MEMORY_ONLY_THRESHOLD = 256 * 1024 * 1024
+
+
+def estimated_size(df):
+    """Taille en octets estimée par l'optimiseur Catalyst pour ``df``."""
+    stats = df._jdf.queryExecution().optimizedPlan().stats()
+    return int(stats.sizeInBytes().toString())
+
+
+class CacheManager:
+    def __init__(self, spark, storage_level=None,
+                 memory_only_threshold=DEFAULT_MEMORY_ONLY_THRESHOLD):
+        """``storage_level`` force un niveau de stockage ; sinon il est choisi par DataFrame."""
+        self.spark = spark
+        self.storage_level = storage_level
+        self.memory_only_threshold = memory_only_threshold
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def choose_storage_level(self, df):
+        if self.storage_level is not None:
+            return self.storage_level
+        try:
+            size = estimated_size(df)
+        except Exception:
+            return StorageLevel.MEMORY_AND_DISK
+        if size <= self.memory_only_threshold:
+            return StorageLevel.MEMORY_ONLY
+        return StorageLevel.MEMORY_AND_DISK
+
+    def pin(self, name, df, consumers=None):
+        """Persiste ``df`` sous ``name`` jusqu'à ce que tous ``consumers`` l'aient libéré.
+
+        Sans ``consumers``, le DataFrame reste en cache jusqu'à ``unpin(name)``.
+        """
+        with self._lock:
+            if name in self._entries:
+                self._evict(name)
+            level = self.choose_storage_level(df)
+            df = df.persist(level)
+            self._entries[name] = {
+                "df": df,
+                "level": level,
+                "consumers": set(consumers) if consumers is not None else None,
+            }
+        return df
+
+    def get(self, name):
+        """Retourne le DataFrame épinglé sous ``name``, ou ``None`` (échec comptabilisé)."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry["df"]
+
+    def is_pinned(self, name):
+        with self._lock:
+            return name in self._entries
+
+    def release(self, name, consumer):
+        """Signale que ``consumer`` a fini d'utiliser ``name`` ; évince après le dernier."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry["consumers"] is None:
+                return
+            entry["consumers"].discard(consumer)
+            if not entry["consumers"]:
+                self._evict(name)
+
+    def unpin(self, name):
+        with self._lock:
+            if name in self._entries:
+                self._evict(name)
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._entries):
+                self._evict(name)
+
+    def _evict(self, name):
+        self._entries.pop(name)["df"].unpersist()
+
+    def storage_usage(self):
+        """Octets occupés en mémoire et sur disque par les RDD en cache."""
+        memory = disk = 0
+        for info in self.spark.sparkContext._jsc.sc().getRDDStorageInfo():
+            memory += info.memSize()
+            disk += info.diskSize()
+        return {"memory_bytes": memory, "disk_bytes": disk}
+
+    def report(self):
+        with self._lock:
+            pinned = {name: str(entry["level"]) for name, entry in self._entries.items()}
+            stats = {"hits": self.hits, "misses": self.misses, "pinned": pinned}
+        stats.update(self.storage_usage())
+        return stats
@@ -0,0 +1,106 @@
+"""Dimension temporelle générée : un calendrier continu, sans lire les données.
+
+La dimension était dérivée d'un ``distinct()`` sur les dates de la table
+Fait (un shuffle à chaque exécution) et ne contenait que les dates
+présentes dans les relevés. Ici chaque jour d'une plage est produit par
+``spark.range`` et toutes les colonnes (``date_id``, année, mois, jour,
+trimestre, semaine et année ISO, semaine et année épidémiologiques) sont
+calculées dans une seule projection.
+
+La semaine ISO commence le lundi et appartient à l'année de son jeudi ;
+la semaine épidémiologique (MMWR) commence le dimanche et appartient à
+l'année de son mercredi.
+
+``extend_calendar`` n'ajoute que les jours manquants à une table
+existante : la plage reste continue et les jointures sur des séries
+journalières ne perdent aucune date.
+"""
+
+import datetime
+from functools import reduce
+
+from delta.tables import DeltaTable
+from pyspark.sql.functions import col, date_add, dayofmonth, expr, lit, max as _max, min as _min, month
+from pyspark.sql.functions import quarter, weekofyear, year
+
+from lakehouse.transforms import DATE_KEY, date_key
+
+DEFAULT_START = datetime.date(2020, 1, 1)
+
+CALENDAR_COLUMNS = (
+    "DATE_UPDATED", DATE_KEY, "year", "month", "day", "quarter",
+    "iso_year", "iso_week", "epi_year", "epi_week",
+)
+
+# dayofweek : 1 = dimanche … 7 = samedi
+_ISO_THURSDAY = "date_add(DATE_UPDATED, 3 - (dayofweek(DATE_UPDATED) + 5) % 7)"
+_EPI_WEDNESDAY = "date_add(DATE_UPDATED, 4 - dayofweek(DATE_UPDATED))"
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value)
+    return value
+
+
+def build_calendar(spark, start=DEFAULT_START, end=None):
+    """Un jour par ligne de ``start`` à ``end`` inclus (aujourd'hui par défaut)."""
+    start = _as_date(start)
+    end = _as_date(end) or datetime.date.today()
+    if end < start:
+        raise ValueError(f"Plage de dates vide : {start} → {end}")
+    day = col("DATE_UPDATED")
+    return spark.range((end - start).days + 1) \
+        .select(date_add(lit(start), col("id").cast("int")).alias("DATE_UPDATED")) \
+        .select(
+            day,
+            date_key().alias(DATE_KEY),
+            year(day).alias("year"),
+            month(day).alias("month"),
+            dayofmonth(day).alias("day"),
+            quarter(day).alias("quarter"),
+            year(expr(_ISO_THURSDAY)).alias("iso_year"),
+            weekofyear(day).alias("iso_week"),
+            year(expr(_EPI_WEDNESDAY)).alias("epi_year"),
+            ((expr(f"dayofyear({_EPI_WEDNESDAY})") - 1) / 7 + 1).cast("int").alias("epi_week"),
+        )
+
+
+def _missing_ranges(first, last, start, end):
+    ranges = []
+    if start < first:
+        ranges.append((start, first - datetime.timedelta(days=1)))
+    if end > last:
+        ranges.append((last + datetime.timedelta(days=1), end))
+    return ranges
+
+
+def extend_calendar(spark, path, end=None, start=DEFAULT_START, transform=None):
+    """Complète la dimension ``path`` pour couvrir ``start`` → ``end``.
+
+    Seuls les jours absents sont ajoutés (``append``). ``transform``
+    s'applique aux nouvelles lignes (par exemple
+    ``transforms.enrich_dimension_date``). Une table absente, ou construite
+    avant le générateur, est (re)créée. Retourne le nombre de jours ajoutés.
+    """
+    start = _as_date(start)
+    end = _as_date(end) or datetime.date.today()
+    transform = transform or (lambda df: df)
+
+    if DeltaTable.isDeltaTable(spark, path):
+        existing = spark.read.format("delta").load(path)
+        if set(CALENDAR_COLUMNS) <= set(existing.columns):
+            first, last = existing.agg(_min("DATE_UPDATED"), _max("DATE_UPDATED")).first()
+            ranges = _missing_ranges(first, last, start, end)
+            if not ranges:
+                return 0
+            frames = [build_calendar(spark, a, b) for a, b in ranges]
+            transform(reduce(lambda a, b: a.unionByName(b), frames)) \
+                .write.format("delta").mode("append").save(path)
+            return sum((b - a).days + 1 for a, b in ranges)
+
+    transform(build_calendar(spark, start, end)) \
+        .write.format("delta").mode("overwrite").option("overwriteSchema", "true").save(path)
+    return (end - start).days + 1
@@ -0,0 +1,327 @@
+"""Modifications d'une table Delta entre deux versions : clés insérées, modifiées, supprimées.
+
+Le notebook réécrit les tables Gold à chaque exécution : chaque
+``overwrite`` crée une version qui, ligne à ligne, peut être identique
+à la précédente. Un *changeset* compare l'état de la table à la version
+``start`` et à la version ``end`` clé par clé et ne retient que les
+différences nettes :
+
+- avec le Change Data Feed (``delta.enableChangeDataFeed``, activé par
+  défaut par ``lakehouse.session`` et sur les tables existantes par
+  ``enable_change_feed``), seuls les fichiers de changements des
+  versions intermédiaires sont lus ; pour chaque clé, la première image
+  (avant ``start + 1``) et la dernière (à ``end``) sont comparées, de
+  sorte qu'une ligne supprimée puis réinsérée à l'identique par un
+  ``overwrite`` n'apparaît pas ;
+- sinon (table créée sans Change Data Feed, ou activé en cours de
+  plage), les deux versions sont relues par *time travel* et jointes
+  sur leurs clés.
+
+Les lignes du changeset reprennent le vocabulaire du Change Data Feed
+dans ``_change_type`` : ``insert``, ``delete`` et, pour une clé
+modifiée, ``update_preimage`` puis ``update_postimage``.
+
+    changes = changes_since(spark, config.GOLD_FACT_ENRICHED, 12)
+    changes.counts()          # {"inserted": 30, "updated": 4, "deleted": 0}
+    changes.affected("WHO_REGION")
+
+Les consommateurs (exports, agrégats) mémorisent la dernière version
+traitée de chaque source dans ``delta/_control/change_offsets``
+(``read_offset``/``write_offset``) et ne traitent ensuite que le
+changeset depuis cette version (``refresh_from_changes``).
+"""
+
+from dataclasses import dataclass, field
+from functools import reduce
+
+from delta.tables import DeltaTable
+from pyspark.sql.functions import array, col, current_timestamp, explode, expr, lit, struct, when
+from pyspark.sql.utils import AnalysisException
+
+from lakehouse import config, cube, star
+from lakehouse.delta_log import table_version
+from lakehouse.incremental import ENRICHED_KEYS, VACCINATION_KEYS, WHO_DEATHS_KEYS, replace_where
+
+CHANGE_FEED_PROPERTY = "delta.enableChangeDataFeed"
+CHANGE_TYPE = "_change_type"
+CDF_METADATA = (CHANGE_TYPE, "_commit_version", "_commit_timestamp")
+
+INSERT = "insert"
+DELETE = "delete"
+UPDATE_PREIMAGE = "update_preimage"
+UPDATE_POSTIMAGE = "update_postimage"
+
+# Table Delta → colonnes qui identifient une ligne
+TABLE_KEYS = {
+    config.SILVER_VACCINATION: VACCINATION_KEYS,
+    config.SILVER_WHO_DEATHS: WHO_DEATHS_KEYS,
+    config.GOLD_FACT: star.FACT_KEYS,
+    config.GOLD_FACT_ENRICHED: ENRICHED_KEYS,
+    config.GOLD_DIM_COUNTRY: (star.COUNTRY_KEY,),
+    config.GOLD_DIM_DATE: ("date_id",),
+    config.GOLD_DIM_DATE_ENRICHED: ("date_id",),
+    config.GOLD_REGION_AGG: ("WHO_REGION",),
+    config.GOLD_DAILY_AVG: ("COUNTRY",),
+    config.GOLD_CUBE: (cube.LEVEL_COLUMN,) + cube.DIMENSIONS,
+    config.GOLD_VACCINATION_DEATHS: ("COUNTRY", "DATE_UPDATED"),
+}
+
+
+@dataclass
+class Changeset:
+    """Différences nettes de la table ``path`` entre les versions ``start`` et ``end``.
+
+    ``rows`` : lignes modifiées (colonnes de la table et ``_change_type``),
+    calculées à la demande ; ``source`` vaut ``"cdf"`` ou ``"snapshot"``.
+    """
+
+    path: str
+    start: int
+    end: int
+    keys: tuple
+    rows: object
+    source: str
+    _counts: dict = field(default=None, repr=False, compare=False)
+
+    def counts(self):
+        """Nombre de clés insérées, modifiées et supprimées (calculé une fois)."""
+        if self._counts is None:
+            found = dict(self.rows.groupBy(CHANGE_TYPE).count().collect())
+            self._counts = {
+                "inserted": found.get(INSERT, 0),
+                "updated": found.get(UPDATE_POSTIMAGE, 0),
+                "deleted": found.get(DELETE, 0),
+            }
+        return self._counts
+
+    def is_empty(self):
+        return not any(self.counts().values())
+
+    def changed_keys(self):
+        """Clés modifiées et nature du changement (``insert``, ``update`` ou ``delete``)."""
+        return self.rows.filter(col(CHANGE_TYPE) != UPDATE_PREIMAGE).select(
+            *self.keys,
+            when(col(CHANGE_TYPE) == UPDATE_POSTIMAGE, "update").otherwise(col(CHANGE_TYPE)).alias("change"),
+        )
+
+    def affected(self, column):
+        """Valeurs de ``column`` avant ou après modification (pays, régions touchés…)."""
+        return sorted(row[0] for row in self.rows.select(column).distinct().collect() if row[0] is not None)
+
+    def current_rows(self):
+        """Lignes insérées ou modifiées, dans leur état à la version ``end``."""
+        return self.rows.filter(col(CHANGE_TYPE).isin(INSERT, UPDATE_POSTIMAGE))
+
+
+# --- Change Data Feed ---
+
+def change_feed_enabled(spark, path):
+    properties = DeltaTable.forPath(spark, path).detail().select("properties").first()[0] or {}
+    return properties.get(CHANGE_FEED_PROPERTY, "false").lower() == "true"
+
+
+def enable_change_feed(spark, paths=tuple(TABLE_KEYS)):
+    """Active le Change Data Feed des tables existantes de ``paths`` qui ne l'ont pas encore."""
+    enabled = []
+    for path in paths:
+        if DeltaTable.isDeltaTable(spark, path) and not change_feed_enabled(spark, path):
+            spark.sql(f"ALTER TABLE delta.`{path}` SET TBLPROPERTIES ('{CHANGE_FEED_PROPERTY}' = 'true')")
+            enabled.append(path)
+    if enabled:
+        print(f"Change Data Feed activé sur {len(enabled)} table(s) : {', '.join(enabled)}")
+    return enabled
+
+
+def _earliest_version(spark, path):
+    return DeltaTable.forPath(spark, path).history().agg(expr("min(version)")).first()[0]
+
+
+def _data_columns(df):
+    return [c for c in df.columns if c not in CDF_METADATA]
+
+
+def _net_rows(pairs, columns):
+    """Lignes du changeset à partir de ``_first`` (état à ``start``) et ``_last`` (état à ``end``).
+
+    Une image est nulle si la clé n'existe pas dans la version correspondante.
+    """
+    before, after = col("_first").isNotNull(), col("_last").isNotNull()
+    same = col("_first").dropFields(CHANGE_TYPE).eqNullSafe(col("_last").dropFields(CHANGE_TYPE))
+    updated = before & after & ~same
+
+    def tagged(image, change_type, condition):
+        return when(condition, col(image).withField(CHANGE_TYPE, lit(change_type)))
+
+    return pairs.select(explode(array(
+        tagged("_last", INSERT, ~before & after),
+        tagged("_first", DELETE, before & ~after),
+        tagged("_first", UPDATE_PREIMAGE, updated),
+        tagged("_last", UPDATE_POSTIMAGE, updated),
+    )).alias("_row")) \
+        .filter(col("_row").isNotNull()) \
+        .select(*(col(f"_row.`{c}`").alias(c) for c in columns + [CHANGE_TYPE]))
+
+
+def _from_change_feed(spark, path, start, end, keys):
+    feed = spark.read.format("delta") \
+        .option("readChangeFeed", "true") \
+        .option("startingVersion", start + 1) \
+        .option("endingVersion", end) \
+        .load(path)
+    # Planifié tout de suite : une version sans Change Data Feed lève AnalysisException ici
+    feed._jdf.queryExecution().executedPlan()
+    return _net_change_feed(feed, keys)
+
+
+def _net_change_feed(feed, keys):
+    """Changeset net d'un DataFrame au format du Change Data Feed (``_change_type``, ``_commit_version``)."""
+    columns = _data_columns(feed)
+    # Dans une même version, les images « avant » (delete, update_preimage)
+    # précèdent les images « après » (un overwrite supprime puis réinsère)
+    feed = feed.withColumn("_image", struct(*columns, CHANGE_TYPE)) \
+        .withColumn("_order", struct(
+            "_commit_version",
+            when(col(CHANGE_TYPE).isin(DELETE, UPDATE_PREIMAGE), 0).otherwise(1).alias("_after"),
+        ))
+    pairs = feed.groupBy(*keys).agg(
+        expr("min_by(_image, _order)").alias("_first"),
+        expr("max_by(_image, _order)").alias("_last"),
+    )
+    pairs = pairs.select(
+        when(col(f"_first.{CHANGE_TYPE}").isin(DELETE, UPDATE_PREIMAGE), col("_first")).alias("_first"),
+        when(col(f"_last.{CHANGE_TYPE}").isin(INSERT, UPDATE_POSTIMAGE), col("_last")).alias("_last"),
+    )
+    return _net_rows(pairs, columns)
+
+
+def _from_snapshots(spark, path, start, end, keys):
+    old = spark.read.format("delta").option("versionAsOf", start).load(path)
+    new = spark.read.format("delta").option("versionAsOf", end).load(path)
+    columns = new.columns
+    # Colonnes ajoutées entre les deux versions : nulles dans l'ancienne
+    old = old.select(*(col(c) if c in old.columns else lit(None).cast(new.schema[c].dataType).alias(c)
+                       for c in columns))
+
+    def side(df, prefix, image, change_type):
+        return df.select(*(col(k).alias(f"{prefix}{k}") for k in keys),
+                         struct(*columns, lit(change_type).alias(CHANGE_TYPE)).alias(image))
+
+    old, new = side(old, "_o_", "_first", DELETE), side(new, "_n_", "_last", INSERT)
+    condition = reduce(lambda acc, k: acc & old[f"_o_{k}"].eqNullSafe(new[f"_n_{k}"]),
+                       keys[1:], old[f"_o_{keys[0]}"].eqNullSafe(new[f"_n_{keys[0]}"]))
+    pairs = old.join(new, condition, "full_outer").select("_first", "_last")
+    return _net_rows(pairs, columns)
+
+
+def changes_since(spark, path, version, end=None, keys=None):
+    """Changeset de la table ``path`` depuis la version ``version`` jusqu'à ``end`` (courante par défaut).
+
+    Lève ``ValueError`` si ``version`` n'est plus dans l'historique de la
+    table (journal nettoyé) : le consommateur doit alors tout retraiter.
+    """
+    keys = tuple(keys or TABLE_KEYS[path])
+    end = table_version(spark, path) if end is None else end
+    if version > end:
+        raise ValueError(f"Version de départ {version} postérieure à la version {end} de {path}")
+    if version < _earliest_version(spark, path):
+        raise ValueError(f"Version {version} de {path} absente de l'historique : retraitement complet nécessaire")
+
+    if version == end:
+        rows = spark.read.format("delta").option("versionAsOf", end).load(path).limit(0) \
+            .withColumn(CHANGE_TYPE, lit(None).cast("string"))
+        return Changeset(path, version, end, keys, rows, "snapshot")
+    try:
+        return Changeset(path, version, end, keys, _from_change_feed(spark, path, version, end, keys), "cdf")
+    except AnalysisException as e:
+        print(f"Change Data Feed indisponible pour {path} [{version + 1}, {end}], "
+              f"comparaison des deux versions : {str(e).splitlines()[0]}")
+        return Changeset(path, version, end, keys, _from_snapshots(spark, path, version, end, keys), "snapshot")
+
+
+def what_changed(spark, since, paths=None):
+    """Ce qui a changé depuis la version ``since`` ({table: version} ou une version commune).
+
+    Retourne {table: Changeset} pour les tables existantes de ``paths``
+    (toutes les tables de ``TABLE_KEYS`` par défaut) et affiche le
+    nombre de clés insérées, modifiées et supprimées de chacune.
+    """
+    if paths is None:
+        paths = list(since) if isinstance(since, dict) else list(TABLE_KEYS)
+    changesets = {}
+    for path in paths:
+        if not DeltaTable.isDeltaTable(spark, path):
+            continue
+        version = since[path] if isinstance(since, dict) else since
+        changes = changes_since(spark, path, version)
+        counts = changes.counts()
+        print(f"{path} v{changes.start} → v{changes.end} ({changes.source}) : "
+              f"{counts['inserted']} insérée(s), {counts['updated']} modifiée(s), {counts['deleted']} supprimée(s)")
+        changesets[path] = changes
+    return changesets
+
+
+# --- Versions traitées par les consommateurs ---
+
+def read_offset(spark, consumer, source, path=config.CONTROL_CHANGE_OFFSETS):
+    """Dernière version de ``source`` traitée par ``consumer``, ou ``None``."""
+    if not DeltaTable.isDeltaTable(spark, path):
+        return None
+    rows = spark.read.format("delta").load(path) \
+        .filter((col("consumer") == consumer) & (col("source") == source)) \
+        .select("version") \
+        .collect()
+    return rows[0][0] if rows else None
+
+
+def write_offset(spark, consumer, source, version, path=config.CONTROL_CHANGE_OFFSETS):
+    df = spark.createDataFrame([(consumer, source, version)], "consumer string, source string, version long") \
+        .withColumn("updated_at", current_timestamp())
+
+    if not DeltaTable.isDeltaTable(spark, path):
+        df.write.format("delta").mode("overwrite").save(path)
+        return
+
+    DeltaTable.forPath(spark, path).alias("t") \
+        .merge(df.alias("s"), "t.consumer = s.consumer AND t.source = s.source") \
+        .whenMatchedUpdateAll() \
+        .whenNotMatchedInsertAll() \
+        .execute()
+
+
+def pending_changes(spark, consumer, source, end=None):
+    """Changeset de ``source`` depuis la dernière version traitée par ``consumer`` jusqu'à ``end``.
+
+    ``None`` si ``consumer`` n'a encore rien traité ou si cette version
+    n'est plus disponible : tout est à retraiter.
+    """
+    version = read_offset(spark, consumer, source)
+    if version is None:
+        return None
+    try:
+        return changes_since(spark, source, version, end)
+    except ValueError as e:
+        print(f"{consumer} : {e}")
+        return None
+
+
+def refresh_from_changes(spark, aggregate, target, source, column):
+    """Réécrit dans ``target`` les seules valeurs de ``column`` touchées dans ``source``.
+
+    ``aggregate`` est l'agrégat complet (DataFrame non évalué, groupé par
+    ``column``) : il est filtré sur les valeurs de ``column`` présentes
+    dans le changeset de ``source`` depuis la dernière mise à jour de
+    ``target``, avant ou après modification. Au premier passage, ou si
+    ``target`` n'existe pas, l'agrégat est écrit entièrement. Retourne
+    les valeurs réécrites (``None`` pour une réécriture complète).
+    """
+    version = table_version(spark, source)
+    changes = pending_changes(spark, target, source, version) if DeltaTable.isDeltaTable(spark, target) else None
+    if changes is None:
+        aggregate.write.format("delta").mode("overwrite").save(target)
+        values = None
+    else:
+        values = changes.affected(column)
+        replace_where(aggregate.filter(col(column).isin(values)), target, column, values)
+    write_offset(spark, target, source, version)
+    print(f"{target} : {'réécriture complète' if values is None else f'{len(values)} {column} recalculé(s)'}")
+    return values
@@ -0,0 +1,276 @@
+"""Rendu des graphiques du rapport, sans affichage et en parallèle.
+
+Chaque graphique est une fonction qui dessine un DataFrame agrégé sur
+un ``Axes`` ; le rendu passe par des ``Figure`` Agg (aucun état
+``pyplot``, aucun serveur d'affichage) dans un pool de processus. Les
+fichiers PNG/SVG sont nommés d'après une empreinte des données (et de
+``CHART_VERSION``) : un graphique dont les données n'ont pas changé n'est
+pas redessiné.
+
+    renderer = ReportRenderer()
+    paths = renderer.render_all({"region_totals": region_df, "yearly_totals": yearly_df})
+
+Les processus ``spawn`` réimportent le module ``__main__`` : lancé
+depuis un script (le notebook exporté en ``.py``), le pool réexécuterait
+tout le script dans chaque processus. Dans ce cas le rendu parallèle est
+délégué à ``python -m lakehouse.charts`` dans un sous-processus, dont
+les processus n'importent que ce module.
+
+En tâche de nuit, les données d'entrée enregistrées par ``save_frames``
+se rendent sans Spark :
+
+    python -m lakehouse.charts reports/charts/data
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+DEFAULT_OUTPUT_DIR = "reports/charts"
+DEFAULT_FORMATS = ("png", "svg")
+DEFAULT_DPI = 100
+MANIFEST_NAME = "manifest.json"
+# Graphiques à rendre par le sous-processus : {nom: chemins}
+JOBS_NAME = "jobs.json"
+
+# À incrémenter quand le dessin d'un graphique change : invalide les fichiers existants
+CHART_VERSION = 1
+
+
+# --- Graphiques ---
+
+def deaths_by_month(ax, pdf):
+    ax.plot(pdf["Year-Month"], pdf["monthly_new_deaths"], label="Monthly New Deaths", marker="x", color="red")
+    ax.set_xlabel("Year-Month")
+    ax.set_ylabel("Monthly New Deaths")
+    ax.set_title("Monthly New Deaths for Selected Months")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.legend()
+    ax.grid(True)
+
+
+def country_progress(ax, pdf):
+    for country, country_data in pdf.groupby("COUNTRY", observed=True):
+        ax.plot(country_data["DATE_UPDATED"], country_data["cumulative_vaccinations"], label=country)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Cumulative Vaccinations")
+    ax.set_title("Progression cumulée des vaccinations par pays (avec dates normalisées)")
+    ax.legend()
+    ax.grid(True)
+
+
+def region_totals(ax, pdf):
+    from matplotlib import cm
+
+    pdf = pdf.sort_values(by="total_vaccinations_sum", ascending=False)
+    colors = cm.viridis(range(len(pdf)))  # Palette de couleurs dynamique
+    bars = ax.bar(pdf["WHO_REGION"].astype(str), pdf["total_vaccinations_sum"], color=colors)
+    for bar in bars:
+        yval = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2, yval + yval * 0.01, f"{int(yval):,}",
+                ha="center", va="bottom", fontsize=10, rotation=45)
+    ax.set_title("Comparaison des vaccinations par région OMS (Tri décroissant)")
+    ax.set_ylabel("Total Vaccinations")
+    ax.set_xlabel("Région OMS")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+
+
+def yearly_totals(ax, pdf):
+    ax.plot(pdf["year"], pdf["total_vaccinations_sum"],
+            marker="o", linestyle="-", color="tab:blue", label="Total Vaccinations")
+    for x, y in zip(pdf["year"], pdf["total_vaccinations_sum"]):
+        ax.text(x, y, f"{y:,.0f}", ha="center", va="bottom", fontsize=10)
+    ax.set_title("Analyse temporelle des vaccinations (par année)", fontsize=14)
+    ax.set_xlabel("Année", fontsize=12)
+    ax.set_ylabel("Total Vaccinations", fontsize=12)
+    ax.grid(True, linestyle="--", alpha=0.7)
+    ax.set_xticks(pdf["year"].astype(int))  # Format des années en entier
+    ax.legend()
+
+
+# Nom du graphique → (fonction de dessin, taille de la figure)
+CHARTS = {
+    "deaths_by_month": (deaths_by_month, (10, 6)),
+    "country_progress": (country_progress, (12, 6)),
+    "region_totals": (region_totals, (10, 6)),
+    "yearly_totals": (yearly_totals, (10, 6)),
+}
+
+
+# --- Rendu ---
+
+def data_hash(name, pdf):
+    """Empreinte du graphique ``name`` pour les données ``pdf``."""
+    digest = hashlib.sha256(f"{name}:{CHART_VERSION}".encode())
+    digest.update(json.dumps([(c, str(t)) for c, t in pdf.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(pdf, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def render(name, pdf, paths, dpi=DEFAULT_DPI):
+    """Dessine ``name`` et l'écrit dans chacun des ``paths`` (format déduit de l'extension)."""
+    # Figure Agg autonome : pas de pyplot, donc pas de backend interactif
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    draw, figsize = CHARTS[name]
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    draw(figure.add_subplot(), pdf)
+    figure.tight_layout()
+    for path in paths:
+        tmp = f"{path}.tmp"
+        figure.savefig(tmp, dpi=dpi, format=os.path.splitext(path)[1][1:])
+        os.replace(tmp, path)
+    return paths
+
+
+def _render_pool(jobs, frames, max_workers, dpi=DEFAULT_DPI):
+    """Rend ``jobs`` ({nom: chemins}) dans un pool de processus ; retourne {nom: chemins}."""
+    # "spawn" : pas de fork d'un driver qui porte la JVM et ses threads
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs)), mp_context=context) as pool:
+        futures = {name: pool.submit(render, name, frames[name], paths, dpi) for name, paths in jobs.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _spawn_safe():
+    """``__main__`` peut-il être réimporté par les processus ``spawn`` ?
+
+    Oui pour un module lancé par ``-m`` (protégé par ``if __name__ ==
+    "__main__"``) ou une session interactive (Jupyter, Databricks) ; non
+    pour un script lancé par son chemin.
+    """
+    main = sys.modules.get("__main__")
+    return getattr(main, "__spec__", None) is not None or getattr(main, "__file__", None) is None
+
+
+def _render_subprocess(jobs, frames, max_workers, dpi=DEFAULT_DPI):
+    """Rend ``jobs`` par ``python -m lakehouse.charts`` dans un sous-processus."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    with tempfile.TemporaryDirectory() as data_dir:
+        save_frames({name: frames[name] for name in jobs}, data_dir)
+        with open(os.path.join(data_dir, JOBS_NAME), "w", encoding="utf-8") as f:
+            json.dump(jobs, f)
+        subprocess.run([sys.executable, "-m", "lakehouse.charts", data_dir, "--jobs",
+                        "--workers", str(max_workers), "--dpi", str(dpi)], check=True, env=env)
+    return jobs
+
+
+class ReportRenderer:
+    """Rend les graphiques dans ``output_dir``, une seule fois par empreinte de données."""
+
+    def __init__(self, output_dir=DEFAULT_OUTPUT_DIR, formats=DEFAULT_FORMATS, max_workers=None,
+                 dpi=DEFAULT_DPI):
+        self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.dpi = dpi
+        self.rendered = 0
+        self.skipped = 0
+        os.makedirs(output_dir, exist_ok=True)
+        self._manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    def _read_manifest(self):
+        if not os.path.exists(self._manifest_path):
+            return {}
+        with open(self._manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self._manifest_path)
+
+    def _paths(self, name, digest):
+        return [os.path.join(self.output_dir, f"{name}-{digest}.{fmt}") for fmt in self.formats]
+
+    def _remove_stale(self, name, keep):
+        for path in glob.glob(os.path.join(self.output_dir, f"{name}-*.*")):
+            if path not in keep:
+                os.remove(path)
+
+    def render_all(self, frames):
+        """Rend les graphiques de ``frames`` ({nom: DataFrame}) ; retourne {nom: chemins}."""
+        unknown = set(frames) - set(CHARTS)
+        if unknown:
+            raise ValueError(f"Graphiques inconnus : {sorted(unknown)} (disponibles : {sorted(CHARTS)})")
+
+        manifest = self._read_manifest()
+        results, pending = {}, {}
+        for name, pdf in frames.items():
+            digest = data_hash(name, pdf)
+            paths = self._paths(name, digest)
+            if all(os.path.exists(p) for p in paths):
+                self.skipped += 1
+                results[name] = paths
+            else:
+                pending[name] = (digest, paths)
+
+        jobs = {name: paths for name, (digest, paths) in pending.items()}
+        if len(jobs) == 1:
+            (name, paths), = jobs.items()
+            results[name] = render(name, frames[name], paths, self.dpi)
+        elif jobs and _spawn_safe():
+            results.update(_render_pool(jobs, frames, self.max_workers, self.dpi))
+        elif jobs:
+            results.update(_render_subprocess(jobs, frames, self.max_workers, self.dpi))
+
+        for name, (digest, paths) in pending.items():
+            self.rendered += 1
+            manifest[name] = digest
+            self._remove_stale(name, set(paths))
+        if pending:
+            self._write_manifest(manifest)
+        print(f"Graphiques : {len(pending)} rendu(s), {len(frames) - len(pending)} inchangé(s) "
+              f"dans {self.output_dir}")
+        return results
+
+
+def save_frames(frames, data_dir=os.path.join(DEFAULT_OUTPUT_DIR, "data")):
+    """Enregistre les données d'entrée des graphiques pour un rendu ultérieur sans Spark."""
+    os.makedirs(data_dir, exist_ok=True)
+    for name, pdf in frames.items():
+        pdf.to_parquet(os.path.join(data_dir, f"{name}.parquet"), index=False)
+
+
+def load_frames(data_dir):
+    return {name: pd.read_parquet(os.path.join(data_dir, f"{name}.parquet"))
+            for name in CHARTS if os.path.exists(os.path.join(data_dir, f"{name}.parquet"))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_dir", nargs="?", default=os.path.join(DEFAULT_OUTPUT_DIR, "data"))
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--formats", nargs="+", default=list(DEFAULT_FORMATS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--jobs", action="store_true",
+                        help=f"Rendre les chemins de {JOBS_NAME} (appel interne de ReportRenderer)")
+    args = parser.parse_args()
+    frames = load_frames(args.data_dir)
+    if not frames:
+        parser.error(f"Aucune donnée de graphique dans {args.data_dir}")
+    if args.jobs:
+        with open(os.path.join(args.data_dir, JOBS_NAME), encoding="utf-8") as f:
+            jobs = json.load(f)
+        _render_pool(jobs, frames, args.workers or os.cpu_count() or 1, args.dpi)
+        return
+    ReportRenderer(args.output_dir, args.formats, args.workers, args.dpi).render_all(frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Rapatriement des résultats Spark vers pandas par Arrow, avec repli sans Arrow.
+
+``toPandas()`` sans Arrow sérialise chaque ligne en objets Python sur le
+driver ; avec Arrow, les exécuteurs envoient des lots colonnes. Si
+``pyarrow`` est absent ou trop ancien pour PySpark, la collecte repasse
+par le chemin ligne à ligne et les calculs groupés (``applyInPandas``)
+par leur équivalent Spark.
+
+Les DataFrames collectés sont compactés (``compact``) : chaînes répétées
+en ``category``, entiers réduits jusqu'à ``int32`` ou moins, flottants
+en ``float32`` s'ils restent sous 2**24 en valeur absolue (au-delà, un
+``float32`` arrondirait les totaux nationaux) — l'empreinte mémoire
+avant et après est affichée. Seules les colonnes que le schéma Spark
+déclare entières sont converties en entiers (``toPandas`` passe en
+``float64`` les colonnes entières avec valeurs nulles) : une colonne
+flottante dont les valeurs sont entières reste flottante, quelle que
+soit l'exécution. Un budget mémoire du driver
+(``LAKEHOUSE_DRIVER_BUDGET_MB``, 512 Mo par défaut) borne la collecte :
+si la taille estimée du résultat le dépasse, ``to_pandas`` échoue
+(``MemoryError``) avant de rien collecter ; ``iter_pandas`` parcourt
+alors le résultat lot par lot.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+from pyspark.sql.pandas.utils import require_minimum_pyarrow_version
+from pyspark.sql.types import IntegralType
+
+from lakehouse.cache import estimated_size
+
+ARROW_CONF = "spark.sql.execution.arrow.pyspark.enabled"
+
+BUDGET_ENV = "LAKEHOUSE_DRIVER_BUDGET_MB"
+DEFAULT_BUDGET_BYTES = 512 * 1024 * 1024
+
+# Chaînes converties en catégories si le nombre de valeurs distinctes
+# ne dépasse pas cette fraction du nombre de lignes
+CATEGORY_MAX_RATIO = 0.5
+# Écart relatif toléré pour ramener un float64 en float32
+FLOAT32_RTOL = 1e-6
+
+# Plus grand entier représenté exactement en float32
+_FLOAT32_EXACT = 2 ** 24
+
+_arrow = None
+
+
+def arrow_available():
+    """``pyarrow`` est-il utilisable par PySpark ? (résultat mémorisé)"""
+    global _arrow
+    if _arrow is None:
+        try:
+            require_minimum_pyarrow_version()
+            _arrow = True
+        except Exception as e:
+            print(f"Arrow indisponible, repli sans Arrow : {e}")
+            _arrow = False
+    return _arrow
+
+
+def driver_budget():
+    """Budget mémoire des DataFrames pandas du driver, en octets."""
+    value = os.environ.get(BUDGET_ENV)
+    return int(float(value) * 1024 * 1024) if value else DEFAULT_BUDGET_BYTES
+
+
+def memory_bytes(pdf):
+    return int(pdf.memory_usage(index=True, deep=True).sum())
+
+
+def _format_bytes(size):
+    return f"{size / (1024 * 1024):.1f} Mo"
+
+
+def _compact_column(series, integral=False):
+    if series.dtype == object:
+        if infer_dtype(series, skipna=True) == "string" \
+                and series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(series):
+            return series.astype("category")
+        return series
+    if pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_extension_array_dtype(series.dtype):
+        return pd.to_numeric(series, downcast="integer")
+    if series.dtype == np.float64:
+        if integral:
+            # Colonne entière avec valeurs nulles : entiers exacts, nulls conservés
+            return series.astype("Int64")
+        values = series.to_numpy()
+        finite = values[np.isfinite(values)]
+        if len(finite) and np.abs(finite).max() > _FLOAT32_EXACT:
+            return series
+        narrowed = values.astype(np.float32)
+        if np.allclose(narrowed, values, rtol=FLOAT32_RTOL, atol=0, equal_nan=True):
+            return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def integral_columns(schema):
+    """Colonnes que le schéma Spark ``schema`` déclare entières."""
+    return [f.name for f in schema.fields if isinstance(f.dataType, IntegralType)]
+
+
+def compact(pdf, integral=()):
+    """Types réduits colonne par colonne (catégories, ``int32`` ou moins, ``float32``).
+
+    ``integral`` : colonnes entières dans la source, ramenées en entiers
+    si ``toPandas`` les a converties en ``float64``.
+    """
+    integral = set(integral)
+    return pd.DataFrame({name: _compact_column(pdf[name], name in integral) for name in pdf.columns},
+                        index=pdf.index)
+
+
+def _iter_chunks(df):
+    if arrow_available():
+        from lakehouse.export import arrow_batches
+
+        for batch in arrow_batches(df):
+            yield batch.to_pandas()
+    else:
+        rows = []
+        for row in df.toLocalIterator():
+            rows.append(row)
+            if len(rows) == 64 * 1024:
+                yield pd.DataFrame(rows, columns=df.columns)
+                rows = []
+        if rows:
+            yield pd.DataFrame(rows, columns=df.columns)
+
+
+def iter_pandas(df, compact_types=True):
+    """Itère sur ``df`` en DataFrames pandas d'une partition au plus, compactés."""
+    integral = integral_columns(df.schema)
+    for chunk in _iter_chunks(df):
+        yield compact(chunk, integral) if compact_types else chunk
+
+
+def to_pandas(df, name=None, compact_types=True, budget=None):
+    """``df.toPandas()`` par Arrow lorsque c'est possible, compacté et borné par ``budget``.
+
+    ``name`` identifie le résultat dans le rapport mémoire.
+    """
+    spark = df.sparkSession
+    enabled = arrow_available()
+    if spark.conf.get(ARROW_CONF, "false").lower() != str(enabled).lower():
+        spark.conf.set(ARROW_CONF, str(enabled).lower())
+
+    budget = driver_budget() if budget is None else budget
+    label = name or "résultat"
+    try:
+        estimate = estimated_size(df)
+    except Exception:
+        estimate = 0
+
+    if estimate > budget:
+        raise MemoryError(f"{label} : taille estimée {_format_bytes(estimate)} au-delà du budget driver "
+                          f"({_format_bytes(budget)}) ; filtrer ou agréger davantage dans Spark, "
+                          f"ou parcourir le résultat par lots avec iter_pandas")
+
+    pdf = df.toPandas()
+    before = memory_bytes(pdf)
+    if compact_types:
+        pdf = compact(pdf, integral_columns(df.schema))
+
+    after = memory_bytes(pdf)
+    if name is not None:
+        print(f"Mémoire pandas {name} : {_format_bytes(before)} → {_format_bytes(after)} "
+              f"({len(pdf)} lignes)")
+    if after > budget:
+        raise MemoryError(f"{label} : {_format_bytes(after)} au-delà du budget driver "
+                          f"({_format_bytes(budget)})")
+    return pdf
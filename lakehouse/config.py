@@ -0,0 +1,38 @@
+"""Emplacements des fichiers sources et des tables Delta du Lakehouse."""
+
+# Sources CSV
+VACCINATION_CSV = "data/vaccination-data.csv"
+WHO_DAILY_CSV = "data/WHO-COVID-19-global-daily-data.csv"
+
+# Zone Bronze
+BRONZE_VACCINATION = "delta/bronze/vaccination_data"
+BRONZE_WHO_DAILY = "delta/bronze/who_covid_daily_cases"
+BRONZE_QUARANTINE = "delta/bronze/quarantine"
+
+# Zone Silver
+SILVER_VACCINATION = "delta/silver/vaccination_data_cleaned"
+SILVER_WHO_DEATHS = "delta/silver/who_covid_daily_deaths_cleaned"
+
+# Zone Gold
+GOLD_FACT = "delta/gold/fact_covid_vaccinations"
+GOLD_FACT_ENRICHED = "delta/gold/fact_covid_vaccinations_enriched"
+GOLD_DIM_COUNTRY = "delta/gold/dimension_country"
+GOLD_DIM_DATE = "delta/gold/dimension_date"
+GOLD_DIM_DATE_ENRICHED = "delta/gold/enriched_dimension_date"
+GOLD_REGION_AGG = "delta/gold/region_aggregation"
+GOLD_DAILY_AVG = "delta/gold/daily_avg_vaccinations"
+GOLD_CUBE = "delta/gold/vaccination_cube"
+GOLD_VACCINATION_DEATHS = "delta/gold/fact_vaccination_deaths"
+
+# Copies Parquet bucketées des tables Silver (tables externes du catalogue)
+BUCKETED_DIR = "warehouse/bucketed"
+
+# Tables de contrôle du pipeline
+CONTROL_WATERMARKS = "delta/_control/watermarks"
+CONTROL_RUN_METRICS = "delta/_control/run_metrics"
+CONTROL_QUALITY = "delta/_control/quality_metrics"
+CONTROL_CHANGE_OFFSETS = "delta/_control/change_offsets"
+
+# Ingestion en continu : répertoire de dépôt des fichiers et checkpoints
+LANDING_WHO_DAILY = "landing/who_daily"
+CHECKPOINT_WHO_DAILY = "delta/_checkpoints/who_daily"
@@ -0,0 +1,121 @@
+"""Cube d'agrégats WHO_REGION × COUNTRY × année × mois.
+
+Un seul ``cube()`` sur la table Fait matérialise toutes les combinaisons
+de ces quatre dimensions (somme, moyenne, nombre, min et max des
+colonnes de vaccination). ``grouping_id`` identifie le niveau de chaque
+ligne : répondre à « total par région » ou « moyenne par pays » revient
+à filtrer un niveau du cube, sans relire la table Fait.
+
+Le cube tient en quelques dizaines de milliers de lignes : ``VaccinationCube``
+le charge une fois en pandas et répond ensuite aux requêtes en
+millisecondes.
+"""
+
+from pyspark.sql.functions import avg, col, count, grouping_id, max as _max, min as _min, month
+from pyspark.sql.functions import sum as _sum, year
+
+from lakehouse import config
+
+DIMENSIONS = ("WHO_REGION", "COUNTRY", "year", "month")
+
+MEASURES = (
+    "TOTAL_VACCINATIONS",
+    "PERSONS_VACCINATED_1PLUS_DOSE",
+    "PERSONS_LAST_DOSE",
+    "PERSONS_BOOSTER_ADD_DOSE",
+)
+
+AGGREGATES = {"sum": _sum, "avg": avg, "count": count, "min": _min, "max": _max}
+
+LEVEL_COLUMN = "grouping_level"
+
+
+def measure_column(measure, aggregate):
+    """Nom de colonne d'un agrégat, par exemple ``total_vaccinations_sum``."""
+    return f"{measure.lower()}_{aggregate}"
+
+
+def level_of(by):
+    """``grouping_id`` des lignes agrégées sur les dimensions ``by``."""
+    unknown = set(by) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Dimensions inconnues : {sorted(unknown)} (disponibles : {DIMENSIONS})")
+    n = len(DIMENSIONS)
+    return sum(1 << (n - 1 - i) for i, d in enumerate(DIMENSIONS) if d not in by)
+
+
+def build_cube(fact_table):
+    """Toutes les combinaisons des dimensions en une seule agrégation."""
+    aggregations = [
+        fn(col(m)).alias(measure_column(m, name))
+        for m in MEASURES
+        for name, fn in AGGREGATES.items()
+    ]
+    return fact_table \
+        .withColumn("year", year("DATE_UPDATED")) \
+        .withColumn("month", month("DATE_UPDATED")) \
+        .cube(*DIMENSIONS) \
+        .agg(grouping_id().alias(LEVEL_COLUMN), *aggregations)
+
+
+def cube_level(cube_df, by):
+    """Lignes du cube (DataFrame Spark) au niveau ``by``, sans les autres dimensions."""
+    return cube_df.filter(col(LEVEL_COLUMN) == level_of(by)) \
+        .drop(LEVEL_COLUMN, *(d for d in DIMENSIONS if d not in by))
+
+
+def region_aggregation_from_cube(cube_df):
+    """Équivalent de ``transforms.build_region_aggregation`` lu dans le cube."""
+    return cube_level(cube_df, ("WHO_REGION",)) \
+        .select("WHO_REGION", measure_column("TOTAL_VACCINATIONS", "sum"))
+
+
+def daily_avg_from_cube(cube_df):
+    """Équivalent de ``transforms.build_daily_avg`` lu dans le cube."""
+    return cube_level(cube_df, ("COUNTRY",)).select(
+        "COUNTRY",
+        col(measure_column("TOTAL_VACCINATIONS", "avg")).alias("avg_total_vaccinations"),
+    )
+
+
+class VaccinationCube:
+    """API de requête en mémoire sur le cube matérialisé."""
+
+    def __init__(self, cube_pdf):
+        self.data = cube_pdf
+
+    @classmethod
+    def load(cls, spark, path=config.GOLD_CUBE):
+        return cls(spark.read.format("delta").load(path).toPandas())
+
+    def query(self, by=(), measures=("total_vaccinations_sum",), where=None):
+        """Agrégats au niveau ``by``, filtrés par ``where`` ({dimension: valeur ou liste}).
+
+        Ex. : ``cube.query(by=["year"], where={"WHO_REGION": "EURO"})`` n'est
+        pas un niveau du cube en soi ; il faut inclure la dimension filtrée
+        dans ``by`` : ``cube.query(by=["WHO_REGION", "year"], where={"WHO_REGION": "EURO"})``.
+        """
+        by = list(by)
+        where = where or {}
+        missing = set(where) - set(by)
+        if missing:
+            raise ValueError(f"Les dimensions filtrées doivent figurer dans by : {sorted(missing)}")
+
+        rows = self.data[self.data[LEVEL_COLUMN] == level_of(by)]
+        for dimension, value in where.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            rows = rows[rows[dimension].isin(values)]
+        return rows[by + list(measures)].sort_values(by).reset_index(drop=True)
+
+    def region_totals(self):
+        return self.query(by=["WHO_REGION"])
+
+    def country_averages(self):
+        return self.query(by=["COUNTRY"], measures=["total_vaccinations_avg"])
+
+    def yearly_totals(self):
+        return self.query(by=["year"])
+
+    def country_monthly_progress(self, countries=None):
+        where = {"COUNTRY": countries} if countries is not None else None
+        return self.query(by=["COUNTRY", "year", "month"], where=where)
@@ -0,0 +1,182 @@
+"""Lecture directe du journal ``_delta_log`` d'une table Delta locale, sans JVM.
+
+``snapshot`` rejoue le journal (dernier checkpoint Parquet puis commits
+JSON suivants) pour obtenir les fichiers actifs d'une version, leurs
+valeurs de partition et le schéma de la table. ``added_partitions``
+liste les partitions écrites par une série de commits, ``data_version``
+la dernière version qui a modifié les données (OPTIMIZE et commits
+``dataChange=false`` ignorés).
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from urllib.parse import unquote
+
+LOG_DIR = "_delta_log"
+LAST_CHECKPOINT = "_last_checkpoint"
+
+# Opérations du journal qui ne modifient pas les données
+MAINTENANCE_OPERATIONS = frozenset({
+    "OPTIMIZE", "VACUUM START", "VACUUM END", "SET TBLPROPERTIES", "UNSET TBLPROPERTIES",
+})
+
+
+@dataclass
+class Snapshot:
+    """État d'une table Delta à une version : fichiers actifs et métadonnées."""
+
+    path: str
+    version: int
+    files: dict = field(default_factory=dict)  # chemin absolu → valeurs de partition
+    schema_string: str = None
+    partition_columns: tuple = ()
+
+    @property
+    def schema(self):
+        return json.loads(self.schema_string) if self.schema_string else None
+
+
+def is_local_table(path):
+    return os.path.isdir(os.path.join(path, LOG_DIR))
+
+
+def local_version(path):
+    """Dernière version commitée, déduite du nom des fichiers ``NNNN.json`` du journal."""
+    versions = [
+        int(name[:-len(".json")])
+        for name in os.listdir(os.path.join(path, LOG_DIR))
+        if name.endswith(".json") and name[:-len(".json")].isdigit()
+    ]
+    if not versions:
+        raise FileNotFoundError(f"Aucun commit dans {os.path.join(path, LOG_DIR)}")
+    return max(versions)
+
+
+def table_version(spark, path):
+    """Version courante d'une table Delta, lue localement quand c'est possible."""
+    if is_local_table(path):
+        return local_version(path)
+    from delta.tables import DeltaTable
+
+    return DeltaTable.forPath(spark, path).history(1).select("version").first()[0]
+
+
+def _log_path(path, *names):
+    return os.path.join(path, LOG_DIR, *names)
+
+
+def _data_file(path, relative):
+    relative = unquote(relative)
+    if relative.startswith("file:"):
+        return relative[len("file:"):]
+    return relative if os.path.isabs(relative) else os.path.join(path, relative)
+
+
+def _apply(snapshot, action):
+    if action.get("add"):
+        add = action["add"]
+        snapshot.files[_data_file(snapshot.path, add["path"])] = dict(add.get("partitionValues") or {})
+    elif action.get("remove"):
+        snapshot.files.pop(_data_file(snapshot.path, action["remove"]["path"]), None)
+    elif action.get("metaData"):
+        meta = action["metaData"]
+        snapshot.schema_string = meta["schemaString"]
+        snapshot.partition_columns = tuple(meta.get("partitionColumns") or ())
+
+
+def _checkpoint_files(path, version):
+    prefix = f"{version:020d}.checkpoint"
+    return sorted(
+        _log_path(path, name) for name in os.listdir(_log_path(path))
+        if name.startswith(prefix) and name.endswith(".parquet")
+    )
+
+
+def _read_checkpoint(snapshot, version):
+    import pyarrow.parquet as pq
+
+    for checkpoint in _checkpoint_files(snapshot.path, version):
+        columns = [c for c in ("add", "remove", "metaData") if c in pq.read_schema(checkpoint).names]
+        for action in pq.read_table(checkpoint, columns=columns).to_pylist():
+            if action.get("add") and isinstance(action["add"].get("partitionValues"), list):
+                # Les maps Parquet sont relues en liste de paires
+                action["add"]["partitionValues"] = dict(action["add"]["partitionValues"])
+            _apply(snapshot, action)
+
+
+def snapshot(path, version=None):
+    """Rejoue le journal de ``path`` jusqu'à ``version`` (dernière version par défaut)."""
+    version = local_version(path) if version is None else version
+    state = Snapshot(path=path, version=version)
+
+    start = 0
+    last_checkpoint = _log_path(path, LAST_CHECKPOINT)
+    if os.path.exists(last_checkpoint):
+        with open(last_checkpoint, encoding="utf-8") as f:
+            checkpoint_version = json.load(f)["version"]
+        if checkpoint_version <= version and _checkpoint_files(path, checkpoint_version):
+            _read_checkpoint(state, checkpoint_version)
+            start = checkpoint_version + 1
+
+    for commit in range(start, version + 1):
+        with open(_log_path(path, f"{commit:020d}.json"), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    _apply(state, json.loads(line))
+    return state
+
+
+def _commit_actions(path, version):
+    with open(_log_path(path, f"{version:020d}.json"), encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def added_partitions(path, versions):
+    """Valeurs de partition des fichiers ajoutés par les commits ``versions``.
+
+    Retourne un ensemble de tuples triés ``(colonne, valeur)``, ou
+    ``None`` si un de ces commits n'est plus dans le journal (nettoyé
+    après un checkpoint).
+    """
+    if not all(os.path.exists(_log_path(path, f"{v:020d}.json")) for v in versions):
+        return None
+    partitions = set()
+    for version in versions:
+        for action in _commit_actions(path, version):
+            if action.get("add"):
+                partitions.add(tuple(sorted((action["add"].get("partitionValues") or {}).items())))
+    return partitions
+
+
+def _changes_data(path, version):
+    """Le commit ``version`` ajoute-t-il ou retire-t-il des données ?"""
+    actions = list(_commit_actions(path, version))
+    if any((a.get("commitInfo") or {}).get("operation") in MAINTENANCE_OPERATIONS for a in actions):
+        return False
+    return any(a.get(kind) and a[kind].get("dataChange", True) for a in actions for kind in ("add", "remove"))
+
+
+def data_version(spark, path):
+    """Dernière version de ``path`` qui a modifié les données.
+
+    Les commits de maintenance (OPTIMIZE, propriétés) et ceux dont les
+    fichiers ajoutés ou retirés portent tous ``dataChange=false`` ne
+    comptent pas : le contenu de la table n'a pas changé. Une version
+    dont le commit n'est plus dans le journal est considérée comme une
+    modification.
+    """
+    if is_local_table(path):
+        version = local_version(path)
+        while version > 0 and os.path.exists(_log_path(path, f"{version:020d}.json")) \
+                and not _changes_data(path, version):
+            version -= 1
+        return version
+    from delta.tables import DeltaTable
+
+    operations = ", ".join(f"'{op}'" for op in sorted(MAINTENANCE_OPERATIONS))
+    return DeltaTable.forPath(spark, path).history() \
+        .filter(f"operation NOT IN ({operations})") \
+        .selectExpr("max(version)").first()[0]
@@ -0,0 +1,215 @@
+"""Export des tables vers des fichiers locaux en flux Arrow.
+
+Au lieu de ``toPandas().to_csv()`` (toute la table sur le driver) ou de
+``coalesce(1)`` (une seule tâche), les exécuteurs sérialisent chaque
+partition en lots Arrow (``mapInArrow``, flux IPC) que le driver lit une
+partition à la fois (``toLocalIterator``) : une seule passe sur les
+données, sans ``Row`` Python par ligne ni mise en cache. La mémoire du
+driver est bornée par une partition, et le fichier unique est assemblé
+directement par l'écrivain Arrow (Parquet, CSV ou Feather). Les
+horodatages sont exportés en UTC.
+
+Un manifeste (``_export_manifest.json``) mémorise l'empreinte de chaque
+export : une table déjà exportée dans la même version n'est pas
+réécrite. ``export_changes`` n'exporte ensuite que les lignes modifiées
+depuis la dernière version exportée (``lakehouse.changes``).
+"""
+
+import json
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+from pyspark.sql.pandas.types import to_arrow_schema
+
+from lakehouse.changes import changes_since
+from lakehouse.delta_log import table_version
+
+FORMATS = {"parquet": ".parquet", "csv": ".csv", "feather": ".feather"}
+MANIFEST_NAME = "_export_manifest.json"
+# Clé du manifeste : dernière version couverte par les exports de changements
+CHANGES_SUFFIX = "#changes"
+DEFAULT_BATCH_ROWS = 64 * 1024
+# Colonne des lots Arrow sérialisés renvoyés par les exécuteurs
+PAYLOAD_COLUMN = "arrow_ipc"
+
+
+def _open_writer(path, fmt, schema):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema)
+    if fmt == "csv":
+        return pa_csv.CSVWriter(path, schema)
+    if fmt == "feather":
+        return pa_ipc.new_file(path, schema)
+    raise ValueError(f"Format inconnu : {fmt!r} (attendu : {sorted(FORMATS)})")
+
+
+def _utc_schema(schema):
+    """Horodatages en UTC explicite : Spark envoie des instants UTC étiquetés du fuseau de session."""
+    return pa.schema([
+        field.with_type(pa.timestamp("us", tz="UTC")) if pa.types.is_timestamp(field.type) else field
+        for field in schema
+    ])
+
+
+def _serialize_batches(batch_rows):
+    """Fonction ``mapInArrow`` : chaque lot, découpé en ``batch_rows`` lignes au plus, en flux IPC."""
+    def serialize(batches):
+        for batch in batches:
+            for offset in range(0, batch.num_rows, batch_rows):
+                piece = batch.slice(offset, batch_rows)
+                sink = pa.BufferOutputStream()
+                with pa_ipc.new_stream(sink, piece.schema) as writer:
+                    writer.write_batch(piece)
+                yield pa.RecordBatch.from_arrays([pa.array([sink.getvalue().to_pybytes()], pa.binary())],
+                                                 names=[PAYLOAD_COLUMN])
+    return serialize
+
+
+def arrow_batches(df, batch_rows=DEFAULT_BATCH_ROWS):
+    """Itère sur ``df`` en ``RecordBatch`` Arrow de ``batch_rows`` lignes au plus.
+
+    Les partitions sont lues l'une après l'autre (un job par partition,
+    les étapes de shuffle en amont ne sont calculées qu'une fois) :
+    arrêter l'itération n'en lit pas davantage. La taille des lots
+    Arrow de la session (``spark.sql.execution.arrow.maxRecordsPerBatch``)
+    n'est pas modifiée.
+    """
+    schema = _utc_schema(to_arrow_schema(df.schema))
+    payloads = df.mapInArrow(_serialize_batches(batch_rows), f"{PAYLOAD_COLUMN} binary")
+    for row in payloads.toLocalIterator():
+        for batch in pa_ipc.open_stream(pa.py_buffer(row[0])):
+            yield batch.cast(schema)
+
+
+class Exporter:
+    """Exporte des DataFrames dans ``export_dir`` une seule fois par empreinte."""
+
+    def __init__(self, export_dir="exports", batch_rows=DEFAULT_BATCH_ROWS):
+        self.export_dir = export_dir
+        self.batch_rows = batch_rows
+        self.run_id = uuid.uuid4().hex
+        os.makedirs(export_dir, exist_ok=True)
+        self._manifest_path = os.path.join(export_dir, MANIFEST_NAME)
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        if not os.path.exists(self._manifest_path):
+            return {}
+        with open(self._manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self._manifest_path)
+
+    def export(self, df, name, fmt="csv", single_file=True, fingerprint=None):
+        """Exporte ``df`` sous ``export_dir/name`` et retourne le chemin produit.
+
+        ``fingerprint`` identifie le contenu (version Delta, par exemple).
+        Par défaut c'est le hash sémantique du plan, valable pour cette
+        instance seulement : le plan ne dit rien de la version des données.
+        Si le même contenu a déjà été exporté au même endroit, rien n'est
+        réécrit.
+
+        Avec ``single_file=False`` l'écriture est distribuée (un fichier
+        par partition, formats Parquet et CSV uniquement).
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Format inconnu : {fmt!r} (attendu : {sorted(FORMATS)})")
+        if fingerprint is None:
+            fingerprint = f"{self.run_id}:{df.semanticHash()}"
+        fingerprint = str(fingerprint)
+        target = os.path.join(self.export_dir, name + (FORMATS[fmt] if single_file else ""))
+
+        if self.manifest.get(target) == fingerprint and os.path.exists(target):
+            print(f"Export inchangé, ignoré : {target}")
+            return target
+
+        if single_file:
+            self._write_single_file(df, target, fmt)
+        elif fmt == "feather":
+            raise ValueError("Le format feather n'est disponible qu'en fichier unique")
+        else:
+            df.write.format(fmt).mode("overwrite").option("header", "true").save(target)
+
+        self.manifest[target] = fingerprint
+        self._write_manifest()
+        print(f"Données exportées avec succès dans : {target}")
+        return target
+
+    def export_delta(self, spark, table_path, name, fmt="csv", single_file=True):
+        """Exporte une table Delta ; l'empreinte est sa version courante."""
+        version = table_version(spark, table_path)
+        df = spark.read.format("delta").option("versionAsOf", version).load(table_path)
+        return self.export(df, name, fmt=fmt, single_file=single_file,
+                           fingerprint=f"{table_path}@{version}")
+
+    def export_changes(self, spark, table_path, name, fmt="csv", keys=None):
+        """Exporte les lignes de la table Delta modifiées depuis le dernier export.
+
+        Au premier passage, ou si la version déjà exportée n'est plus dans
+        l'historique de la table, la table entière est exportée
+        (``export_delta``). Ensuite, chaque appel écrit le fichier
+        ``name.changes-v<début>-v<fin>`` : lignes insérées, modifiées
+        (image avant et après) ou supprimées, avec leur ``_change_type``.
+        Retourne le chemin produit, ou ``None`` si rien n'a changé.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Format inconnu : {fmt!r} (attendu : {sorted(FORMATS)})")
+        target = os.path.join(self.export_dir, name + FORMATS[fmt])
+        cursor = target + CHANGES_SUFFIX
+        version = table_version(spark, table_path)
+
+        last = self.manifest.get(cursor)
+        full_export = self.manifest.get(target, "")
+        if last is None and full_export.startswith(f"{table_path}@") and os.path.exists(target):
+            last = int(full_export.rsplit("@", 1)[1])
+        if last == version:
+            print(f"Export inchangé, ignoré : {table_path}@{version}")
+            return None
+
+        changes = None
+        if last is not None:
+            try:
+                changes = changes_since(spark, table_path, last, version, keys)
+            except ValueError as e:
+                print(f"Export complet de {table_path} : {e}")
+
+        path = None
+        if changes is None:
+            path = self.export_delta(spark, table_path, name, fmt=fmt)
+        elif changes.is_empty():
+            print(f"Aucune modification de {table_path} entre v{last} et v{version}")
+        else:
+            counts = changes.counts()
+            path = self.export(changes.rows, f"{name}.changes-v{last}-v{version}", fmt=fmt,
+                               fingerprint=f"{table_path}@{last}..{version}")
+            print(f"{counts['inserted']} insérée(s), {counts['updated']} modifiée(s), "
+                  f"{counts['deleted']} supprimée(s) depuis v{last}")
+
+        self.manifest[cursor] = version
+        self._write_manifest()
+        return path
+
+    def _write_single_file(self, df, target, fmt):
+        # Écriture dans un fichier temporaire puis renommage : un export
+        # interrompu ne laisse pas de fichier partiel
+        tmp = target + ".tmp"
+        schema = _utc_schema(to_arrow_schema(df.schema))
+        try:
+            writer = _open_writer(tmp, fmt, schema)
+            try:
+                for batch in arrow_batches(df, self.batch_rows):
+                    writer.write_batch(batch)
+            finally:
+                writer.close()
+            os.replace(tmp, target)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
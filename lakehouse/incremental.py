@@ -0,0 +1,406 @@
+"""Mode incrémental Bronze → Silver → Gold basé sur Delta MERGE.
+
+Au lieu de réécrire chaque table en ``overwrite``, seules les lignes
+nouvelles ou modifiées depuis le dernier chargement sont fusionnées.
+Un *high-water mark* par source (table ``delta/_control/watermarks``)
+limite la lecture aux dates récentes, et les clés touchées en Bronze
+sont propagées vers Silver puis Gold : le coût d'un rafraîchissement
+dépend de la taille du delta, pas de l'historique complet.
+"""
+
+import datetime
+from functools import reduce
+
+from delta.tables import DeltaTable
+from pyspark import StorageLevel
+from pyspark.sql.functions import broadcast, col, current_timestamp, date_sub, lit, max as _max, min as _min
+
+from lakehouse import alignment, config, cube, star, transforms
+from lakehouse.calendar_dimension import extend_calendar
+from lakehouse.delta_log import table_version
+from lakehouse.layout import LAYOUTS, write_table
+from lakehouse.schemas import PERMISSIVE, quarantine_rejected, read_source, valid_rows
+
+VACCINATION_KEYS = ("ISO3", "DATE_UPDATED")
+FACT_KEYS = star.FACT_KEYS
+WHO_DAILY_KEYS = ("Country_code", "Date_reported")
+WHO_DEATHS_KEYS = ("COUNTRY", "DATE_UPDATED")
+ENRICHED_KEYS = ("COUNTRY", "DATE_UPDATED")
+# Tables dont les changesets déterminent les dates à ré-enrichir
+ENRICHED_SOURCES = (config.GOLD_FACT, config.GOLD_DIM_COUNTRY)
+
+_DELETE_FLAG = "_delete"
+
+
+# --- High-water marks ---
+
+def read_watermark(spark, source, path=config.CONTROL_WATERMARKS):
+    """Dernière date chargée pour ``source``, ou ``None`` au premier passage."""
+    if not DeltaTable.isDeltaTable(spark, path):
+        return None
+    rows = spark.read.format("delta").load(path) \
+        .filter(col("source") == source) \
+        .select("high_water_mark") \
+        .collect()
+    return rows[0][0] if rows else None
+
+
+def write_watermark(spark, source, value, path=config.CONTROL_WATERMARKS):
+    """Avance le high-water mark de ``source`` (il ne recule jamais)."""
+    df = spark.createDataFrame([(source, value)], "source string, high_water_mark date") \
+        .withColumn("updated_at", current_timestamp())
+
+    if not DeltaTable.isDeltaTable(spark, path):
+        df.write.format("delta").mode("overwrite").save(path)
+        return
+
+    DeltaTable.forPath(spark, path).alias("t") \
+        .merge(df.alias("s"), "t.source = s.source") \
+        .whenMatchedUpdateAll(condition="s.high_water_mark > t.high_water_mark") \
+        .whenNotMatchedInsertAll() \
+        .execute()
+
+
+# --- Écritures Delta ---
+
+def _sql_literal(value):
+    if isinstance(value, datetime.date):
+        return f"DATE'{value.isoformat()}'"
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return str(value)
+
+
+def _create(df, path):
+    """Première écriture d'une table, avec son layout Gold s'il en a un."""
+    if path in LAYOUTS:
+        write_table(df, path, LAYOUTS[path])
+    else:
+        df.write.format("delta").mode("overwrite").save(path)
+
+
+def merge_upsert(spark, df, path, keys, delete_when=None):
+    """Fusionne ``df`` dans la table Delta ``path`` sur les colonnes ``keys``.
+
+    Seules les lignes absentes de la cible ou différentes d'au moins une
+    colonne sont fusionnées. Les lignes qui vérifient ``delete_when``
+    (expression ``Column`` sur ``df``) suppriment la clé correspondante
+    au lieu d'être insérées.
+
+    Retourne ces lignes modifiées, matérialisées par un checkpoint local
+    avant le MERGE : elles servent à propager le delta vers la zone
+    suivante. L'appelant doit appeler ``unpersist()`` lorsqu'il a terminé.
+    """
+    columns = df.columns
+
+    if DeltaTable.isDeltaTable(spark, path):
+        existing = spark.read.format("delta").load(path).select(*columns)
+        same_row = reduce(
+            lambda acc, c: acc & df[c].eqNullSafe(existing[c]),
+            columns[1:],
+            df[columns[0]].eqNullSafe(existing[columns[0]]),
+        )
+        changes = df.join(existing, same_row, "left_anti")
+    else:
+        changes = df
+
+    # Matérialisé avant le MERGE, lignage coupé : recalculer l'anti-jointure
+    # ensuite (bloc de cache évincé ou perdu) donnerait un résultat vide.
+    # Un bloc perdu fait échouer la lecture au lieu de la vider
+    changes = changes.localCheckpoint(eager=True)
+    if changes.count() == 0:
+        return changes
+
+    flag = delete_when if delete_when is not None else lit(False)
+    source = changes.withColumn(_DELETE_FLAG, flag)
+
+    if not DeltaTable.isDeltaTable(spark, path):
+        _create(source.filter(~col(_DELETE_FLAG)).drop(_DELETE_FLAG), path)
+        return changes
+
+    values = {c: f"s.`{c}`" for c in columns}
+    condition = " AND ".join(f"t.`{k}` <=> s.`{k}`" for k in keys)
+    DeltaTable.forPath(spark, path).alias("t") \
+        .merge(source.alias("s"), condition) \
+        .whenMatchedDelete(condition=f"s.{_DELETE_FLAG}") \
+        .whenMatchedUpdate(set=values) \
+        .whenNotMatchedInsert(condition=f"NOT s.{_DELETE_FLAG}", values=values) \
+        .execute()
+    return changes
+
+
+def replace_where(df, path, column, values):
+    """Remplace atomiquement les lignes de ``path`` dont ``column`` est dans ``values``."""
+    if not values:
+        return
+    if not DeltaTable.isDeltaTable(df.sparkSession, path):
+        _create(df, path)
+        return
+    predicate = f"`{column}` IN ({', '.join(_sql_literal(v) for v in values)})"
+    df.write.format("delta").mode("overwrite").option("replaceWhere", predicate).save(path)
+
+
+def _distinct_values(df, column):
+    return [row[0] for row in df.select(column).distinct().collect() if row[0] is not None]
+
+
+# --- Rafraîchissement par source ---
+
+def ingest_bronze_incremental(spark, name, bronze_path, keys, date_column,
+                              path=None, lookback_days=0,
+                              quarantine_path=config.BRONZE_QUARANTINE):
+    """Fusionne en Bronze les lignes du CSV postérieures au high-water mark.
+
+    ``lookback_days`` relit quelques jours avant le high-water mark pour
+    capter les corrections tardives. Retourne ``(changes, high_water_mark)``
+    où ``changes`` est matérialisé (``merge_upsert``).
+    """
+    df_raw = read_source(spark, name, mode=PERMISSIVE, path=path) \
+        .persist(StorageLevel.MEMORY_AND_DISK)
+    try:
+        quarantine_rejected(df_raw, name, quarantine_path)
+        df_valid = valid_rows(df_raw)
+
+        watermark = read_watermark(spark, name)
+        if watermark is not None:
+            df_valid = df_valid.filter(col(date_column) >= date_sub(lit(watermark), lookback_days))
+
+        changes = merge_upsert(spark, df_valid, bronze_path, keys)
+    finally:
+        df_raw.unpersist()
+
+    new_watermark = changes.agg(_max(date_column)).collect()[0][0]
+    return changes, new_watermark
+
+
+def refresh_vaccination(spark, path=None, lookback_days=0):
+    """Rafraîchit incrémentalement toute la chaîne des données de vaccination.
+
+    Retourne le nombre de lignes modifiées par table.
+    """
+    bronze_changes, watermark = ingest_bronze_incremental(
+        spark, "vaccination", config.BRONZE_VACCINATION, VACCINATION_KEYS,
+        "DATE_UPDATED", path=path, lookback_days=lookback_days,
+    )
+    pending = [bronze_changes]
+    summary = {config.BRONZE_VACCINATION: bronze_changes.count()}
+    try:
+        if summary[config.BRONZE_VACCINATION]:
+            summary.update(_propagate_vaccination(spark, bronze_changes, pending))
+            write_watermark(spark, "vaccination", watermark)
+    finally:
+        for df in pending:
+            df.unpersist()
+
+    print(f"Rafraîchissement incrémental (vaccination) : {summary}")
+    return summary
+
+
+def _propagate_vaccination(spark, bronze_changes, pending):
+    summary = {}
+    is_deleted = col("TOTAL_VACCINATIONS").isNull()
+
+    # Silver : nettoyage des seules lignes touchées, suppression des lignes
+    # que le nettoyage complet aurait filtrées
+    silver_changes = merge_upsert(
+        spark, transforms.normalize_vaccination(bronze_changes),
+        config.SILVER_VACCINATION, VACCINATION_KEYS, delete_when=is_deleted,
+    )
+    pending.append(silver_changes)
+    summary[config.SILVER_VACCINATION] = silver_changes.count()
+
+    # Gold : dimensions puis table Fait, dont les clés viennent de la dimension
+    # géographique (identifiants existants conservés, nouveaux pays numérotés)
+    silver_kept = silver_changes.filter(~is_deleted)
+    dimension_country = merge_upsert(
+        spark, star.build_dimension_country(spark, silver_kept),
+        config.GOLD_DIM_COUNTRY, (star.COUNTRY_KEY,),
+    )
+    fact_changes = merge_upsert(
+        spark, star.build_fact(silver_changes, spark.read.format("delta").load(config.GOLD_DIM_COUNTRY)),
+        config.GOLD_FACT, FACT_KEYS, delete_when=is_deleted,
+    )
+    pending.append(fact_changes)
+    summary[config.GOLD_FACT] = fact_changes.count()
+
+    pending.append(dimension_country)
+    summary[config.GOLD_DIM_COUNTRY] = dimension_country.count()
+
+    # Calendrier prolongé jusqu'à la date la plus récente reçue, si besoin
+    last_date = silver_kept.agg(_max("DATE_UPDATED")).first()[0]
+    summary[config.GOLD_DIM_DATE] = extend_calendar(spark, config.GOLD_DIM_DATE, end=last_date)
+    summary[config.GOLD_DIM_DATE_ENRICHED] = extend_calendar(
+        spark, config.GOLD_DIM_DATE_ENRICHED, end=last_date, transform=transforms.enrich_dimension_date,
+    )
+
+    # Tables recalculées uniquement pour les pays et régions touchés.
+    # Les régions d'origine sont lues avant réécriture de la table enrichie
+    # pour couvrir un pays qui change de région.
+    countries = _distinct_values(silver_changes, "COUNTRY")
+    regions = set(_distinct_values(silver_changes, "WHO_REGION"))
+    if DeltaTable.isDeltaTable(spark, config.GOLD_FACT_ENRICHED):
+        previous = spark.read.format("delta").load(config.GOLD_FACT_ENRICHED) \
+            .filter(col("COUNTRY").isin(countries))
+        regions.update(_distinct_values(previous, "WHO_REGION"))
+    regions = sorted(regions)
+
+    fact_table = star.read_fact(spark)
+    affected_facts = fact_table.filter(col("COUNTRY").isin(countries))
+    starts = silver_changes.groupBy("COUNTRY").agg(_min("DATE_UPDATED").alias("_since"))
+    summary[config.GOLD_FACT_ENRICHED] = refresh_enriched_fact(spark, fact_table, starts)
+    replace_where(transforms.build_daily_avg(affected_facts),
+                  config.GOLD_DAILY_AVG, "COUNTRY", countries)
+    replace_where(transforms.build_region_aggregation(fact_table.filter(col("WHO_REGION").isin(regions))),
+                  config.GOLD_REGION_AGG, "WHO_REGION", regions)
+    # Le cube couvre des niveaux sans pays (région, année…) : reconstruit en
+    # une seule agrégation, son volume reste de l'ordre de pays × mois
+    cube.build_cube(fact_table).write.format("delta").mode("overwrite").save(config.GOLD_CUBE)
+    _refresh_deaths_alignment(spark, countries)
+    summary["pays recalculés"] = len(countries)
+    summary["régions recalculées"] = len(regions)
+    return summary
+
+
+def changed_since(fact_table, enriched):
+    """Première date différente par pays entre la table Fait et la table enrichie.
+
+    Retourne (``COUNTRY``, ``_since``) : lignes ajoutées, modifiées ou
+    supprimées depuis le dernier enrichissement.
+    """
+    columns = list(transforms.FACT_COLUMNS)
+    current, previous = fact_table.select(*columns), enriched.select(*columns)
+    changed = current.subtract(previous).unionByName(previous.subtract(current))
+    return changed.groupBy("COUNTRY").agg(_min("DATE_UPDATED").alias("_since"))
+
+
+def starts_from_changes(spark, versions, path=config.GOLD_FACT_ENRICHED):
+    """(``COUNTRY``, ``_since``) d'après les changesets des ``ENRICHED_SOURCES``.
+
+    ``versions`` : {table source: version jusqu'à laquelle lire}. Les
+    changesets courent depuis les versions consommées par le dernier
+    enrichissement de ``path`` (``lakehouse.changes``) : une clé de la
+    table Fait ajoutée, modifiée ou supprimée donne sa date ; un pays
+    modifié dans la dimension (nom, région) est recalculé entièrement,
+    sous son ancien et son nouveau nom. ``None`` si un changeset n'est
+    pas disponible (premier passage, historique nettoyé).
+    """
+    from lakehouse.changes import pending_changes
+
+    fact_path, dimension_path = ENRICHED_SOURCES
+    fact_changes = pending_changes(spark, path, fact_path, versions[fact_path])
+    dimension_changes = pending_changes(spark, path, dimension_path, versions[dimension_path])
+    if fact_changes is None or dimension_changes is None:
+        return None
+
+    dimension = spark.read.format("delta").option("versionAsOf", dimension_changes.end).load(dimension_path) \
+        .select(star.COUNTRY_KEY, "COUNTRY")
+    by_date = fact_changes.rows.join(broadcast(dimension), star.COUNTRY_KEY) \
+        .select("COUNTRY", star.date_from_key().alias("_since"))
+    whole_country = dimension_changes.rows.select("COUNTRY", lit(datetime.date.min).alias("_since"))
+    return by_date.unionByName(whole_country) \
+        .filter(col("COUNTRY").isNotNull()) \
+        .groupBy("COUNTRY").agg(_min("_since").alias("_since"))
+
+
+def _record_enriched_sources(spark, versions, path):
+    from lakehouse.changes import write_offset
+
+    for source, version in versions.items():
+        write_offset(spark, path, source, version)
+
+
+def refresh_enriched_fact(spark, fact_table, starts=None, path=config.GOLD_FACT_ENRICHED):
+    """Met à jour la table enrichie à partir de la date ``_since`` de chaque pays de ``starts``.
+
+    Seules ces dates (et l'état des fenêtres qui les précède) sont
+    recalculées puis fusionnées ; les lignes disparues de ``fact_table``
+    sont supprimées. Sans ``starts``, les dates à recalculer viennent des
+    changesets de la table Fait et de la dimension pays depuis le dernier
+    enrichissement (``starts_from_changes``), ou à défaut de la
+    comparaison complète ``changed_since`` ; les versions sources
+    consommées sont alors enregistrées. Une table absente, ou sans les
+    colonnes d'enrichissement actuelles, est reconstruite entièrement.
+    Retourne le nombre de lignes modifiées.
+    """
+    # ``fact_table`` est lue dans les versions courantes des sources
+    versions = {source: table_version(spark, source) for source in ENRICHED_SOURCES}
+    enriched_columns = set(transforms.enrichment_columns())
+    existing = spark.read.format("delta").load(path) if DeltaTable.isDeltaTable(spark, path) else None
+    if existing is None or not enriched_columns <= set(existing.columns):
+        full = transforms.enrich_fact(fact_table)
+        write_table(full, path, LAYOUTS[path])
+        _record_enriched_sources(spark, versions, path)
+        return spark.read.format("delta").load(path).count()
+
+    # ``starts`` fourni par l'appelant peut ne couvrir qu'une partie des
+    # changements en attente : les versions consommées ne sont pas avancées
+    complete = starts is None
+    if starts is None:
+        starts = starts_from_changes(spark, versions, path)
+    if starts is None:
+        print(f"{path} : changesets indisponibles, comparaison complète avec la table Fait")
+        starts = changed_since(fact_table, existing)
+    starts = starts.persist(StorageLevel.MEMORY_AND_DISK)
+    try:
+        if starts.count() == 0:
+            if complete:
+                _record_enriched_sources(spark, versions, path)
+            return 0
+        rows = transforms.enrich_fact_since(fact_table, starts)
+        # Clés supprimées : une ligne sans mesure qui déclenche la suppression
+        removed = existing.join(starts, "COUNTRY") \
+            .filter(col("DATE_UPDATED") >= col("_since")) \
+            .select(*ENRICHED_KEYS) \
+            .join(fact_table.select(*ENRICHED_KEYS), list(ENRICHED_KEYS), "left_anti")
+        changes = merge_upsert(
+            spark, rows.unionByName(removed, allowMissingColumns=True), path, ENRICHED_KEYS,
+            delete_when=col("TOTAL_VACCINATIONS").isNull(),
+        )
+        count = changes.count()
+        changes.unpersist()
+        if complete:
+            _record_enriched_sources(spark, versions, path)
+        return count
+    finally:
+        starts.unpersist()
+
+
+def _refresh_deaths_alignment(spark, countries):
+    """Recalcule la table croisée vaccination × décès des seuls ``countries``.
+
+    Les fenêtres sont calculées pays par pays : remplacer les pays touchés
+    donne le même résultat qu'un recalcul complet. Sans table existante,
+    rien n'est fait (la première construction est complète).
+    """
+    paths = (config.GOLD_VACCINATION_DEATHS, config.GOLD_FACT, config.SILVER_WHO_DEATHS)
+    if not countries or not all(DeltaTable.isDeltaTable(spark, p) for p in paths):
+        return
+    facts = star.read_fact(spark).filter(col("COUNTRY").isin(countries))
+    deaths = spark.read.format("delta").load(config.SILVER_WHO_DEATHS) \
+        .filter(col("COUNTRY").isin(countries))
+    replace_where(alignment.align_deaths(facts, deaths),
+                  config.GOLD_VACCINATION_DEATHS, "COUNTRY", countries)
+
+
+def refresh_who_daily(spark, path=None, lookback_days=0):
+    """Rafraîchit incrémentalement les données journalières de l'OMS (Bronze et Silver)."""
+    bronze_changes, watermark = ingest_bronze_incremental(
+        spark, "who_daily", config.BRONZE_WHO_DAILY, WHO_DAILY_KEYS,
+        "Date_reported", path=path, lookback_days=lookback_days,
+    )
+    summary = {config.BRONZE_WHO_DAILY: bronze_changes.count()}
+    try:
+        if summary[config.BRONZE_WHO_DAILY]:
+            silver_changes = merge_upsert(
+                spark, transforms.clean_who_daily(bronze_changes),
+                config.SILVER_WHO_DEATHS, WHO_DEATHS_KEYS,
+            )
+            summary[config.SILVER_WHO_DEATHS] = silver_changes.count()
+            _refresh_deaths_alignment(spark, _distinct_values(silver_changes, "COUNTRY"))
+            silver_changes.unpersist()
+            write_watermark(spark, "who_daily", watermark)
+    finally:
+        bronze_changes.unpersist()
+
+    print(f"Rafraîchissement incrémental (OMS journalier) : {summary}")
+    return summary
@@ -0,0 +1,210 @@
+"""Organisation physique des tables Delta : partitionnement, Z-ORDER, compactage.
+
+Les tableaux de bord filtrent par ``WHO_REGION`` et par période : la
+table Fait enrichie est partitionnée par région et par année (colonne
+générée ``year``, calculée par Delta à chaque écriture ou MERGE) puis
+triée en Z-ORDER sur ``COUNTRY`` et ``DATE_UPDATED`` pour que le *data
+skipping* écarte les fichiers hors prédicat. La table Fait à clés de
+substitution, étroite, n'est pas partitionnée : elle est triée sur ses
+clés entières. Les tables Silver, lues pays par pays, sont triées sur
+``COUNTRY`` et ``DATE_UPDATED`` (voir aussi ``lakehouse.bucketing``).
+
+Un Z-ORDER réécrit tous les fichiers des partitions visées, même
+inchangées : ``optimize_all`` ignore les tables sans écriture depuis
+leur dernier OPTIMIZE et, pour une table partitionnée, se limite aux
+partitions écrites depuis.
+"""
+
+from dataclasses import dataclass, field
+
+from delta.tables import DeltaTable
+
+from lakehouse import config
+from lakehouse.delta_log import MAINTENANCE_OPERATIONS, added_partitions, is_local_table
+
+
+@dataclass(frozen=True)
+class TableLayout:
+    """Organisation physique d'une table Delta.
+
+    ``generated`` associe un nom de colonne à ``(type SQL, expression)``,
+    par exemple ``{"year": ("INT", "YEAR(DATE_UPDATED)")}``.
+    """
+
+    partition_by: tuple = ()
+    zorder_by: tuple = ()
+    generated: dict = field(default_factory=dict)
+
+
+FACT_LAYOUT = TableLayout(
+    partition_by=("WHO_REGION", "year"),
+    zorder_by=("COUNTRY", "DATE_UPDATED"),
+    generated={"year": ("INT", "YEAR(DATE_UPDATED)")},
+)
+
+KEYED_FACT_LAYOUT = TableLayout(zorder_by=("country_id", "date_id"))
+
+SILVER_LAYOUT = TableLayout(zorder_by=("COUNTRY", "DATE_UPDATED"))
+
+# Petite table sans tri : le layout sert à la recréer (``write_table``) quand
+# une dimension écrite avant les clés de substitution n'a pas ``country_id``
+DIMENSION_LAYOUT = TableLayout()
+
+LAYOUTS = {
+    config.SILVER_VACCINATION: SILVER_LAYOUT,
+    config.SILVER_WHO_DEATHS: SILVER_LAYOUT,
+    config.GOLD_FACT: KEYED_FACT_LAYOUT,
+    config.GOLD_DIM_COUNTRY: DIMENSION_LAYOUT,
+    config.GOLD_FACT_ENRICHED: FACT_LAYOUT,
+}
+
+
+def _partition_columns(spark, path):
+    return list(DeltaTable.forPath(spark, path).detail().select("partitionColumns").first()[0])
+
+
+def _create_table(spark, df, path, layout):
+    columns = [f for f in df.schema.fields if f.name not in layout.generated]
+    builder = DeltaTable.createOrReplace(spark).location(path).addColumns(columns)
+    for name, (data_type, expression) in layout.generated.items():
+        builder = builder.addColumn(name, data_type, generatedAlwaysAs=expression)
+    if layout.partition_by:
+        builder = builder.partitionedBy(*layout.partition_by)
+    builder.execute()
+
+
+def write_table(df, path, layout):
+    """Écrit ``df`` en ``overwrite`` selon ``layout``.
+
+    La table est (re)créée si elle n'existe pas, si son partitionnement
+    a changé ou s'il lui manque des colonnes de ``df`` ; sinon la
+    définition existante (colonnes générées comprises) est conservée.
+    """
+    spark = df.sparkSession
+    if (not DeltaTable.isDeltaTable(spark, path)
+            or _partition_columns(spark, path) != list(layout.partition_by)
+            or not set(df.columns) <= set(spark.read.format("delta").load(path).columns)):
+        _create_table(spark, df, path, layout)
+    df.write.format("delta").mode("overwrite").save(path)
+
+
+def optimize(spark, path, layout=None, where=None):
+    """Compacte les petits fichiers de ``path`` et applique le Z-ORDER du layout.
+
+    ``where`` (prédicat SQL sur les colonnes de partition) limite
+    OPTIMIZE à ces partitions. Retourne les métriques d'OPTIMIZE
+    (fichiers ajoutés et supprimés).
+    """
+    layout = layout or LAYOUTS.get(path, TableLayout())
+    builder = DeltaTable.forPath(spark, path).optimize()
+    if where:
+        builder = builder.where(where)
+    if layout.zorder_by:
+        result = builder.executeZOrderBy(*layout.zorder_by)
+    else:
+        result = builder.executeCompaction()
+    metrics = result.select("metrics.numFilesAdded", "metrics.numFilesRemoved").first()
+    report = {"path": path, "files_added": metrics[0], "files_removed": metrics[1]}
+    print(f"OPTIMIZE {path}{f' WHERE {where}' if where else ''} : {report}")
+    return report
+
+
+def writes_since_optimize(spark, path):
+    """Versions de ``path`` qui ont écrit des données depuis son dernier OPTIMIZE.
+
+    Toutes les écritures de l'historique si la table n'a jamais été
+    optimisée (ou si cet OPTIMIZE n'est plus dans l'historique).
+    """
+    history = DeltaTable.forPath(spark, path).history().select("version", "operation").collect()
+    last = max((version for version, operation in history if operation == "OPTIMIZE"), default=-1)
+    return sorted(version for version, operation in history
+                  if version > last and operation not in MAINTENANCE_OPERATIONS)
+
+
+def _sql_value(value):
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _changed_partitions(spark, path, versions):
+    """Prédicat sur les partitions écrites par ``versions``.
+
+    ``None`` pour toute la table (table non partitionnée, non locale, ou
+    journal incomplet), ``""`` si ces commits n'ont ajouté aucun fichier.
+    """
+    if not _partition_columns(spark, path) or not is_local_table(path):
+        return None
+    partitions = added_partitions(path, versions)
+    if partitions is None:
+        return None
+    return " OR ".join(
+        "(" + " AND ".join(f"`{c}` IS NULL" if v is None else f"`{c}` = {_sql_value(v)}" for c, v in values) + ")"
+        for values in sorted(partitions, key=str)
+    )
+
+
+def optimize_all(spark, layouts=None, force=False):
+    """Tâche de compactage des tables ayant un layout déclaré.
+
+    Sans ``force``, une table sans écriture depuis son dernier OPTIMIZE
+    est ignorée, et seules les partitions écrites depuis sont optimisées :
+    une exécution sans nouvelles données ne réécrit rien et ne crée pas
+    de version.
+    """
+    layouts = LAYOUTS if layouts is None else layouts
+    reports = []
+    for path, layout in layouts.items():
+        if not DeltaTable.isDeltaTable(spark, path):
+            continue
+        if force:
+            reports.append(optimize(spark, path, layout))
+            continue
+        versions = writes_since_optimize(spark, path)
+        where = _changed_partitions(spark, path, versions) if versions else ""
+        if where == "":
+            print(f"OPTIMIZE {path} : aucune écriture depuis le dernier OPTIMIZE, ignoré")
+            continue
+        reports.append(optimize(spark, path, layout, where))
+    return reports
+
+
+def _final_plan(plan):
+    # Avec AQE, le plan exécuté est enveloppé dans AdaptiveSparkPlanExec
+    while plan.nodeName() == "AdaptiveSparkPlan":
+        plan = plan.executedPlan()
+    return plan
+
+
+def _scan_metrics(plan):
+    files = partitions = 0
+    nodes = _final_plan(plan).collectLeaves()
+    for i in range(nodes.size()):
+        metrics = nodes.apply(i).metrics()
+        if metrics.contains("numFiles"):
+            files += metrics.apply("numFiles").value()
+        if metrics.contains("numPartitions"):
+            partitions += metrics.apply("numPartitions").value()
+    return files, partitions
+
+
+def pruning_report(spark, path, predicate):
+    """Nombre de fichiers lus et écartés pour une requête filtrée par ``predicate`` (SQL).
+
+    La requête est exécutée une fois et les métriques du scan (après
+    élagage des partitions et *data skipping*) sont comparées au nombre
+    total de fichiers de la table.
+    """
+    total = DeltaTable.forPath(spark, path).detail().select("numFiles").first()[0]
+    query_execution = spark.read.format("delta").load(path).filter(predicate) \
+        ._jdf.queryExecution()
+    query_execution.toRdd().count()
+    files_read, partitions_read = _scan_metrics(query_execution.executedPlan())
+    report = {
+        "path": path,
+        "predicate": predicate,
+        "total_files": total,
+        "files_read": files_read,
+        "files_skipped": total - files_read,
+        "partitions_read": partitions_read,
+    }
+    print(f"Élagage : {report}")
+    return report
@@ -0,0 +1,221 @@
+"""Instrumentation des étapes du pipeline et rapport d'exécution.
+
+Chaque étape est exécutée dans ``RunRecorder.stage(nom)`` : ses jobs
+Spark sont rattachés à un groupe de jobs propre à l'étape, ce qui permet
+de retrouver après coup les identifiants des jobs et des stages Spark et
+d'additionner leurs métriques (lignes et octets lus/écrits, shuffle,
+spill) depuis le ``AppStatusStore`` du driver. S'y ajoutent la durée
+réelle et les pics mémoire du driver (RSS du processus Python et tas de
+la JVM — ce sont des maxima depuis le démarrage : une hausse entre deux
+étapes désigne l'étape responsable).
+
+``finish()`` écrit le rapport en JSON (``reports/runs/<run_id>.json``) et
+ajoute une ligne par étape à la table Delta des métriques, pour comparer
+les exécutions entre elles.
+"""
+
+import datetime
+import json
+import os
+import resource
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from pyspark.sql.types import (
+    ArrayType, DoubleType, IntegerType, LongType, StringType, StructField, StructType, TimestampType,
+)
+
+from lakehouse import config
+
+DEFAULT_REPORT_DIR = "reports/runs"
+
+# Métrique du rapport → accesseur de ``org.apache.spark.status.api.v1.StageData``
+STAGE_METRICS = {
+    "rows_read": "inputRecords",
+    "bytes_read": "inputBytes",
+    "rows_written": "outputRecords",
+    "bytes_written": "outputBytes",
+    "shuffle_read_bytes": "shuffleReadBytes",
+    "shuffle_write_bytes": "shuffleWriteBytes",
+    "memory_spill_bytes": "memoryBytesSpilled",
+    "disk_spill_bytes": "diskBytesSpilled",
+}
+
+METRICS_SCHEMA = StructType(
+    [
+        StructField("run_id", StringType(), False),
+        StructField("stage", StringType(), False),
+        StructField("status", StringType(), False),
+        StructField("error", StringType()),
+        StructField("started_at", TimestampType()),
+        StructField("wall_seconds", DoubleType()),
+        StructField("job_ids", ArrayType(IntegerType())),
+        StructField("stage_ids", ArrayType(IntegerType())),
+    ]
+    + [StructField(name, LongType()) for name in STAGE_METRICS]
+    + [
+        StructField("driver_peak_rss_bytes", LongType()),
+        StructField("driver_jvm_peak_heap_bytes", LongType()),
+    ]
+)
+
+
+def _new_run_id():
+    return f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+def _flush_listener_bus(sc):
+    # Les métriques des stages terminés arrivent de façon asynchrone dans le status store
+    try:
+        sc._jsc.sc().listenerBus().waitUntilEmpty()
+    except Exception:
+        pass
+
+
+def _stage_totals(sc, stage_ids):
+    store = sc._jsc.sc().statusStore()
+    totals = dict.fromkeys(STAGE_METRICS, 0)
+    for stage_id in stage_ids:
+        try:
+            data = store.lastStageAttempt(stage_id)
+        except Exception:
+            continue  # stage évincé de l'interface (spark.ui.retainedStages)
+        for name, getter in STAGE_METRICS.items():
+            totals[name] += int(getattr(data, getter)())
+    return totals
+
+
+def driver_memory(sc):
+    """Pics mémoire du driver : RSS du processus Python et tas de la JVM."""
+    # ru_maxrss est en kilo-octets sous Linux
+    memory = {"driver_peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+              "driver_jvm_peak_heap_bytes": None}
+    try:
+        management = sc._jvm.java.lang.management.ManagementFactory
+        pools = management.getMemoryPoolMXBeans()
+        heap = sc._jvm.java.lang.management.MemoryType.HEAP
+        memory["driver_jvm_peak_heap_bytes"] = sum(
+            pools.get(i).getPeakUsage().getUsed()
+            for i in range(pools.size())
+            if pools.get(i).getType() == heap
+        )
+    except Exception:
+        pass
+    return memory
+
+
+class RunRecorder:
+    def __init__(self, spark, run_id=None, report_dir=DEFAULT_REPORT_DIR,
+                 metrics_table=config.CONTROL_RUN_METRICS):
+        self.spark = spark
+        self.run_id = run_id or _new_run_id()
+        self.report_dir = report_dir
+        self.metrics_table = metrics_table
+        self.started_at = datetime.datetime.now()
+        self._start = time.perf_counter()
+        self.records = []
+        self._lock = threading.Lock()
+
+    def _spark_metrics(self, group):
+        sc = self.spark.sparkContext
+        _flush_listener_bus(sc)
+        tracker = sc.statusTracker()
+        job_ids = sorted(tracker.getJobIdsForGroup(group))
+        stage_ids = set()
+        for job_id in job_ids:
+            info = tracker.getJobInfo(job_id)
+            if info is not None:
+                stage_ids.update(info.stageIds)
+        stage_ids = sorted(stage_ids)
+        return {"job_ids": job_ids, "stage_ids": stage_ids, **_stage_totals(sc, stage_ids)}
+
+    @contextmanager
+    def stage(self, name):
+        """Mesure le bloc exécuté sous le nom ``name``.
+
+        L'exception éventuelle est enregistrée (statut ``failed``) puis
+        relancée. Le dictionnaire produit peut être complété par l'appelant.
+        """
+        sc = self.spark.sparkContext
+        group = f"{self.run_id}:{name}"
+        # Propriétés locales au thread : les étapes parallèles du DAG ne se mélangent pas
+        previous = {key: sc.getLocalProperty(key)
+                    for key in ("spark.jobGroup.id", "spark.job.description")}
+        sc.setLocalProperty("spark.jobGroup.id", group)
+        sc.setLocalProperty("spark.job.description", name)
+
+        record = {"run_id": self.run_id, "stage": name, "status": "running", "error": None,
+                  "started_at": datetime.datetime.now()}
+        start = time.perf_counter()
+        try:
+            yield record
+            record["status"] = "succeeded"
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)[:1000]
+            raise
+        finally:
+            record["wall_seconds"] = time.perf_counter() - start
+            for key, value in previous.items():
+                sc.setLocalProperty(key, value)
+            try:
+                record.update(self._spark_metrics(group))
+            except Exception as e:
+                print(f"Métriques Spark indisponibles pour {name} : {e}")
+            record.update(driver_memory(sc))
+            with self._lock:
+                self.records.append(record)
+            print(f"Étape {name} : {record['status']} en {record['wall_seconds']:.2f} s, "
+                  f"{len(record.get('job_ids', []))} job(s)")
+
+    def summary(self, top=5):
+        """Étapes les plus longues de l'exécution."""
+        ranked = sorted(self.records, key=lambda r: r["wall_seconds"], reverse=True)
+        return [(r["stage"], round(r["wall_seconds"], 2)) for r in ranked[:top]]
+
+    def report(self):
+        """Rapport de l'exécution.
+
+        ``wall_seconds`` est la durée écoulée depuis la création de
+        l'enregistreur ; ``stage_seconds`` la somme des durées d'étape,
+        plus grande quand des étapes du DAG s'exécutent en parallèle.
+        """
+        records = list(self.records)
+        sc = self.spark.sparkContext
+        return {
+            "run_id": self.run_id,
+            "application_id": sc.applicationId,
+            "spark_version": self.spark.version,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.datetime.now().isoformat(),
+            "wall_seconds": time.perf_counter() - self._start,
+            "stage_seconds": sum(r["wall_seconds"] for r in records),
+            "totals": {name: sum(r.get(name, 0) for r in records) for name in STAGE_METRICS},
+            "stages": records,
+        }
+
+    def write_report(self, report=None):
+        """Écrit le rapport JSON et retourne son chemin."""
+        report = report or self.report()
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, f"{self.run_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        return path
+
+    def write_table(self):
+        """Ajoute une ligne par étape à la table Delta des métriques."""
+        rows = [tuple(r.get(f.name) for f in METRICS_SCHEMA.fields) for r in self.records]
+        self.spark.createDataFrame(rows, METRICS_SCHEMA) \
+            .write.format("delta").mode("append").save(self.metrics_table)
+
+    def finish(self):
+        """Écrit le rapport JSON et la table des métriques ; retourne le rapport."""
+        report = self.report()
+        path = self.write_report(report)
+        self.write_table()
+        print(f"Rapport d'exécution {self.run_id} : {path}")
+        print(f"Étapes les plus longues : {self.summary()}")
+        return report
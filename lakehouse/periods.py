@@ -0,0 +1,92 @@
+"""Sélection de périodes mensuelles (année, mois) poussée dans Spark.
+
+Une période est codée ``year * 100 + month`` (``202307`` pour juillet
+2023). Le filtre est appliqué avant l'agrégation, côté Spark, avec un
+``isin`` sur cette clé et un encadrement ``DATE_UPDATED`` entre la
+première et la dernière période (transmis au scan Parquet/Delta) ; côté
+pandas, le même filtre est un ``isin`` vectorisé.
+"""
+
+import datetime
+
+from pyspark.sql.functions import col, month, sum as _sum, year
+
+PERIOD_COLUMN = "period"
+
+
+def period_key(value):
+    """``"2023-07"``, ``(2023, 7)`` ou ``202307`` → ``202307``."""
+    if isinstance(value, int):
+        key = value
+    elif isinstance(value, str):
+        y, m = value.split("-")
+        key = int(y) * 100 + int(m)
+    else:
+        y, m = value
+        key = int(y) * 100 + int(m)
+    if not 1 <= key % 100 <= 12:
+        raise ValueError(f"Période invalide : {value!r}")
+    return key
+
+
+def period_range(start, end, step=1):
+    """Périodes de ``start`` à ``end`` inclus, tous les ``step`` mois."""
+    start, end = period_key(start), period_key(end)
+    index = (start // 100) * 12 + start % 100 - 1
+    last = (end // 100) * 12 + end % 100 - 1
+    return [(i // 12) * 100 + i % 12 + 1 for i in range(index, last + 1, step)]
+
+
+def parse_periods(spec):
+    """Normalise une liste de périodes et de plages en clés triées.
+
+    Chaque élément est une période (``"2023-07"``, ``(2023, 7)``, ``202307``)
+    ou une plage ``{"start": "2022-07", "end": "2024-01", "step": 2}``.
+    """
+    keys = set()
+    for item in spec:
+        if isinstance(item, dict):
+            keys.update(period_range(item["start"], item["end"], item.get("step", 1)))
+        else:
+            keys.add(period_key(item))
+    return sorted(keys)
+
+
+def _bounds(keys):
+    first, last = keys[0], keys[-1]
+    start = datetime.date(first // 100, first % 100, 1)
+    end_year, end_month = divmod(last // 100 * 12 + last % 100, 12)
+    end = datetime.date(end_year, end_month + 1, 1)  # premier jour après la dernière période
+    return start, end
+
+
+def filter_periods(df, periods, date_column="DATE_UPDATED"):
+    """Lignes de ``df`` (Spark) dont la date tombe dans ``periods``, avec la colonne ``period``."""
+    keys = parse_periods(periods)
+    if not keys:
+        return df.limit(0).withColumn(PERIOD_COLUMN, (year(date_column) * 100 + month(date_column)))
+    start, end = _bounds(keys)
+    return df.filter((col(date_column) >= start) & (col(date_column) < end)) \
+        .withColumn(PERIOD_COLUMN, year(date_column) * 100 + month(date_column)) \
+        .filter(col(PERIOD_COLUMN).isin(keys))
+
+
+def monthly_deaths(df_silver_cases, periods):
+    """Décès mensuels des seules périodes demandées, agrégés dans Spark."""
+    return filter_periods(df_silver_cases, periods) \
+        .groupBy(PERIOD_COLUMN) \
+        .agg(_sum("NEW_DEATHS").alias("monthly_new_deaths")) \
+        .withColumn("year", (col(PERIOD_COLUMN) / 100).cast("int")) \
+        .withColumn("month", col(PERIOD_COLUMN) % 100)
+
+
+def filter_periods_pandas(pdf, periods, year_column="year", month_column="month"):
+    """Équivalent vectorisé pour un DataFrame pandas déjà agrégé par (année, mois)."""
+    keys = parse_periods(periods)
+    mask = (pdf[year_column].astype("int64") * 100 + pdf[month_column].astype("int64")).isin(keys)
+    return pdf[mask]
+
+
+def period_labels(pdf):
+    """Libellé ``YYYY-MM`` vectorisé à partir des colonnes ``year`` et ``month``."""
+    return pdf["year"].astype(str) + "-" + pdf["month"].astype(str).str.zfill(2)
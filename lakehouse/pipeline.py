@@ -0,0 +1,200 @@
+"""Ordonnanceur DAG des étapes du pipeline.
+
+Chaque étape déclare les jeux de données qu'elle lit (``inputs``) et
+ceux qu'elle produit (``outputs``). Les étapes indépendantes sont
+soumises en parallèle dans un pool de threads ; chaque thread place ses
+jobs Spark dans un pool FAIR portant le nom de l'étape, si bien que la
+durée totale est bornée par la branche la plus lente et non par la
+somme des étapes.
+
+Les sorties d'une étape sont écrites en Delta par l'ordonnanceur. Une
+sortie lue par plusieurs étapes est d'abord épinglée dans le
+``CacheManager`` puis évincée après son dernier consommateur. Un jeu de
+données qui n'est pas produit pendant l'exécution (par exemple lorsqu'on
+ne relance qu'une étape) est relu depuis sa table Delta.
+
+Avec un ``RunRecorder`` (``lakehouse.metrics``), chaque étape est mesurée
+(durée, jobs Spark, volumes, shuffle, spill) pour le rapport d'exécution.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+from lakehouse.cache import CacheManager
+from lakehouse.layout import write_table
+
+
+class PipelineError(RuntimeError):
+    """Erreur de définition ou d'exécution du pipeline."""
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Étape du pipeline.
+
+    ``func(spark, **inputs)`` reçoit un DataFrame par entrée et retourne
+    un dictionnaire ``{sortie: DataFrame}``. Les sorties sont écrites en
+    Delta par l'ordonnanceur, sauf si ``write_outputs`` est faux (étape
+    qui écrit elle-même, comme l'ingestion Bronze).
+    """
+
+    name: str
+    func: object
+    inputs: tuple = ()
+    outputs: tuple = ()
+    write_outputs: bool = True
+
+
+class Pipeline:
+    def __init__(self, stages, datasets, layouts=None):
+        """``datasets`` associe chaque nom de jeu de données à son chemin Delta,
+        ``layouts`` à son ``TableLayout`` (partitionnement, Z-ORDER) le cas échéant.
+        """
+        self.stages = {}
+        self.datasets = dict(datasets)
+        self.layouts = dict(layouts or {})
+        self._producers = {}
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage):
+        if stage.name in self.stages:
+            raise PipelineError(f"Étape déjà définie : {stage.name}")
+        for output in stage.outputs:
+            if output in self._producers:
+                raise PipelineError(
+                    f"{output} est produit par {self._producers[output]} et {stage.name}"
+                )
+            self._producers[output] = stage.name
+        self.stages[stage.name] = stage
+        return stage
+
+    def upstream(self, name):
+        """Étapes dont ``name`` dépend directement."""
+        return {self._producers[i] for i in self.stages[name].inputs if i in self._producers}
+
+    def downstream(self, name):
+        """Étapes qui dépendent directement de ``name``."""
+        return {other for other in self.stages if name in self.upstream(other)}
+
+    def select(self, targets=None, with_dependents=True):
+        """Étapes à exécuter : ``targets`` et, par défaut, tout ce qui en dépend."""
+        if targets is None:
+            return set(self.stages)
+        unknown = set(targets) - set(self.stages)
+        if unknown:
+            raise PipelineError(f"Étapes inconnues : {sorted(unknown)}")
+        selected = set(targets)
+        frontier = list(targets)
+        while with_dependents and frontier:
+            for child in self.downstream(frontier.pop()):
+                if child not in selected:
+                    selected.add(child)
+                    frontier.append(child)
+        return selected
+
+    def order(self, selected=None):
+        """Ordre topologique des étapes sélectionnées."""
+        selected = set(self.stages) if selected is None else set(selected)
+        ordered, done = [], set()
+        while len(ordered) < len(selected):
+            ready = sorted(
+                name for name in selected - done
+                if self.upstream(name) & selected <= done
+            )
+            if not ready:
+                raise PipelineError(f"Cycle entre les étapes : {sorted(selected - done)}")
+            ordered.extend(ready)
+            done.update(ready)
+        return ordered
+
+    def consumers(self, dataset, selected=None):
+        """Étapes (parmi ``selected``) qui lisent ``dataset``."""
+        selected = self.stages if selected is None else selected
+        return {name for name in selected if dataset in self.stages[name].inputs}
+
+    def _load(self, spark, dataset):
+        if dataset not in self.datasets:
+            raise PipelineError(f"Aucune table Delta connue pour {dataset}")
+        return spark.read.format("delta").load(self.datasets[dataset])
+
+    def _input(self, spark, dataset, frames, cache):
+        if cache.is_pinned(dataset):
+            return cache.get(dataset)
+        if dataset in frames:
+            return frames[dataset]
+        cache.get(dataset)  # comptabilisé comme échec : relecture depuis Delta
+        return self._load(spark, dataset)
+
+    def _write(self, dataset, df):
+        path = self.datasets[dataset]
+        if dataset in self.layouts:
+            write_table(df, path, self.layouts[dataset])
+        else:
+            df.write.format("delta").mode("overwrite").save(path)
+
+    def _run_stage(self, spark, stage, frames, selected, cache, recorder=None):
+        spark.sparkContext.setLocalProperty("spark.scheduler.pool", stage.name)
+        measured = recorder.stage(stage.name) if recorder is not None else nullcontext()
+        try:
+            with measured:
+                inputs = {name: self._input(spark, name, frames, cache) for name in stage.inputs}
+                produced = stage.func(spark, **inputs) or {}
+
+                missing = set(produced) - set(stage.outputs)
+                if missing:
+                    raise PipelineError(f"{stage.name} produit des sorties non déclarées : {sorted(missing)}")
+
+                for dataset, df in produced.items():
+                    consumers = self.consumers(dataset, selected)
+                    # Épinglé avant l'écriture : l'écriture remplit le cache
+                    if len(consumers) > 1:
+                        df = produced[dataset] = cache.pin(dataset, df, consumers)
+                    if stage.write_outputs:
+                        self._write(dataset, df)
+        finally:
+            spark.sparkContext.setLocalProperty("spark.scheduler.pool", None)
+        return produced
+
+    def run(self, spark, targets=None, with_dependents=True, max_workers=4, cache=None,
+            recorder=None):
+        """Exécute les étapes sélectionnées en parallélisant les branches indépendantes.
+
+        ``recorder`` (``RunRecorder``) mesure chaque étape ; le rapport est
+        écrit par l'appelant avec ``recorder.finish()``.
+        Retourne les DataFrames produits, indexés par nom de jeu de données.
+        """
+        selected = self.select(targets, with_dependents)
+        self.order(selected)  # détecte les cycles avant de lancer quoi que ce soit
+        cache = cache or CacheManager(spark)
+
+        frames, done, running = {}, set(), {}
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+                while len(done) < len(selected):
+                    for name in sorted(selected - done - set(running.values())):
+                        if self.upstream(name) & selected <= done:
+                            stage = self.stages[name]
+                            print(f"Lancement de l'étape : {name}")
+                            future = pool.submit(self._run_stage, spark, stage, dict(frames), selected, cache,
+                                                 recorder)
+                            running[future] = name
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name = running.pop(future)
+                        try:
+                            frames.update(future.result())
+                        except Exception as e:
+                            for other in running:
+                                other.cancel()
+                            raise PipelineError(f"Échec de l'étape {name} : {e}") from e
+                        for dataset in self.stages[name].inputs:
+                            cache.release(dataset, name)
+                        done.add(name)
+                        print(f"Étape terminée : {name}")
+        finally:
+            print(f"Cache : {cache.report()}")
+            cache.clear()
+        return frames
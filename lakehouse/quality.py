@@ -0,0 +1,228 @@
+"""Contrôles de qualité des données : une seule agrégation par table.
+
+La validation du notebook relisait trois tables Gold et affichait
+``show(5)`` ; le nettoyage Silver, lui, écarte sans le dire les relevés
+sans ``TOTAL_VACCINATIONS`` et remplace les régions manquantes par
+``"Unknown"``. Ici chaque contrôle est une expression SQL agrégée qui
+compte les lignes en défaut, et tous les contrôles d'une table sont
+évalués dans le même ``agg`` :
+
+- taux de valeurs nulles (``not_null``) et de valeurs de remplacement
+  (``filled``) ;
+- bornes des mesures « pour 100 » (``in_range``) ;
+- clés en double (``unique``) ;
+- ``TOTAL_VACCINATIONS`` croissant par pays (``monotonic``) : la valeur
+  précédente est lue par ``lag`` dans une fenêtre commune à tous les
+  contrôles de même partition et de même tri ;
+- intégrité référentielle de la table Fait (``references``) : la
+  dimension est diffusée (broadcast) et jointe avant l'agrégation.
+
+Chaque contrôle tolère un taux de lignes en défaut (``max_rate``) ;
+``validate`` écrit un résultat par contrôle dans la table Delta de
+qualité et lève ``ValueError`` si un seuil est dépassé. Les seuils se
+remplacent par ``thresholds={"table.contrôle": taux}``.
+"""
+
+import datetime
+from dataclasses import dataclass, replace
+
+from delta.tables import DeltaTable
+from pyspark.sql.functions import broadcast, col, expr, lag
+from pyspark.sql.types import (
+    BooleanType, DoubleType, LongType, StringType, StructField, StructType, TimestampType,
+)
+from pyspark.sql.window import Window
+
+from lakehouse import config
+
+QUALITY_SCHEMA = StructType([
+    StructField("run_id", StringType()),
+    StructField("checked_at", TimestampType(), False),
+    StructField("table", StringType(), False),
+    StructField("check", StringType(), False),
+    StructField("rows", LongType()),
+    StructField("failed_rows", LongType()),
+    StructField("failed_rate", DoubleType()),
+    StructField("max_rate", DoubleType()),
+    StructField("passed", BooleanType()),
+])
+
+# Taux maximal pour un contrôle purement informatif (jamais bloquant)
+REPORT_ONLY = 1.0
+
+
+@dataclass(frozen=True)
+class Check:
+    """Contrôle d'une table : ``failed`` est une expression SQL agrégée (nombre de lignes en défaut).
+
+    ``window`` (partition, tri, colonne) demande la colonne ``_prev_<colonne>`` ;
+    ``reference`` (table, colonne, colonne de la dimension) demande la colonne ``_ref_<colonne>``.
+    """
+
+    name: str
+    failed: str
+    max_rate: float = 0.0
+    window: tuple = ()
+    reference: tuple = ()
+
+
+def not_null(column, max_rate=0.0):
+    return Check(f"not_null:{column}", f"count_if({column} IS NULL)", max_rate)
+
+
+def filled(column, placeholder, max_rate=REPORT_ONLY):
+    """Lignes dont ``column`` porte la valeur de remplacement du nettoyage."""
+    return Check(f"filled:{column}", f"count_if({column} = '{placeholder}')", max_rate)
+
+
+def in_range(column, low, high, max_rate=0.0):
+    return Check(f"in_range:{column}", f"count_if({column} < {low} OR {column} > {high})", max_rate)
+
+
+def unique(*keys, max_rate=0.0):
+    """Lignes au-delà de la première pour une même clé (clés nulles exclues)."""
+    complete = " AND ".join(f"{k} IS NOT NULL" for k in keys)
+    return Check(f"unique:{','.join(keys)}",
+                 f"count_if({complete}) - count(DISTINCT {', '.join(keys)})", max_rate)
+
+
+def monotonic(column, partition="COUNTRY", order="DATE_UPDATED", max_rate=0.0):
+    """Lignes où ``column`` diminue par rapport à la précédente de sa partition."""
+    return Check(f"monotonic:{column}", f"count_if({column} < _prev_{column})", max_rate,
+                 window=(partition, order, column))
+
+
+def references(column, table, table_column=None, max_rate=0.0):
+    """Clés de ``column`` absentes de la dimension ``table``."""
+    return Check(f"references:{column}",
+                 f"count_if({column} IS NOT NULL AND _ref_{column} IS NULL)", max_rate,
+                 reference=(table, column, table_column or column))
+
+
+PER100_BOUNDS = {
+    "TOTAL_VACCINATIONS_PER100": (0, 500),
+    "PERSONS_VACCINATED_1PLUS_DOSE_PER100": (0, 100),
+    "PERSONS_LAST_DOSE_PER100": (0, 100),
+    "PERSONS_BOOSTER_ADD_DOSE_PER100": (0, 100),
+}
+
+# Table contrôlée → contrôles. Les chemins sont ceux de ``config``.
+SUITES = {
+    "bronze_vaccination": (config.BRONZE_VACCINATION, (
+        not_null("COUNTRY"),
+        not_null("DATE_UPDATED"),
+        # Lignes écartées en Silver, régions remplacées par "Unknown"
+        not_null("TOTAL_VACCINATIONS", max_rate=0.2),
+        not_null("WHO_REGION", max_rate=0.05),
+    )),
+    "silver_vaccination": (config.SILVER_VACCINATION, (
+        not_null("COUNTRY"),
+        not_null("ISO3", max_rate=0.01),
+        not_null("DATE_UPDATED"),
+        not_null("TOTAL_VACCINATIONS"),
+        filled("WHO_REGION", "Unknown", max_rate=0.05),
+        unique("COUNTRY", "DATE_UPDATED"),
+        monotonic("TOTAL_VACCINATIONS", max_rate=0.01),
+        *(in_range(c, low, high, max_rate=0.02) for c, (low, high) in PER100_BOUNDS.items()),
+    )),
+    "gold_fact": (config.GOLD_FACT, (
+        not_null("country_id"),
+        not_null("date_id"),
+        unique("country_id", "date_id"),
+        references("country_id", config.GOLD_DIM_COUNTRY),
+        references("date_id", config.GOLD_DIM_DATE),
+        not_null("PERSONS_VACCINATED_1PLUS_DOSE", max_rate=REPORT_ONLY),
+        not_null("PERSONS_LAST_DOSE", max_rate=REPORT_ONLY),
+        not_null("PERSONS_BOOSTER_ADD_DOSE", max_rate=REPORT_ONLY),
+    )),
+    "gold_dimension_country": (config.GOLD_DIM_COUNTRY, (
+        not_null("country_id"),
+        not_null("ISO3"),
+        unique("country_id"),
+        unique("ISO3"),
+    )),
+}
+
+
+def _with_lags(df, checks):
+    specs = {}
+    for check in checks:
+        if check.window:
+            partition, order, column = check.window
+            specs.setdefault((partition, order), set()).add(column)
+    for (partition, order), columns in specs.items():
+        # Une seule fenêtre (un seul tri) par couple partition / tri
+        window = Window.partitionBy(partition).orderBy(order)
+        for column in sorted(columns):
+            df = df.withColumn(f"_prev_{column}", lag(column).over(window))
+    return df
+
+
+def _with_references(spark, df, checks):
+    for check in checks:
+        if check.reference:
+            table, column, table_column = check.reference
+            keys = spark.read.format("delta").load(table) \
+                .select(col(table_column).alias(f"_ref_{column}")).distinct()
+            df = df.join(broadcast(keys), col(column) == col(f"_ref_{column}"), "left")
+    return df
+
+
+def evaluate(spark, df, checks, table=None, run_id=None):
+    """Évalue ``checks`` sur ``df`` en une agrégation ; un dictionnaire par contrôle."""
+    checked = _with_lags(_with_references(spark, df, checks), checks)
+    row = checked.agg(
+        expr("count(1)").alias("_rows"),
+        *(expr(check.failed).alias(f"_check_{i}") for i, check in enumerate(checks)),
+    ).first()
+
+    rows, checked_at = row["_rows"], datetime.datetime.now()
+    results = []
+    for i, check in enumerate(checks):
+        failed = row[f"_check_{i}"] or 0
+        rate = failed / rows if rows else 0.0
+        results.append({
+            "run_id": run_id, "checked_at": checked_at, "table": table, "check": check.name,
+            "rows": rows, "failed_rows": failed, "failed_rate": rate,
+            "max_rate": check.max_rate, "passed": rate <= check.max_rate,
+        })
+    return results
+
+
+def _suite_checks(name, checks, thresholds):
+    overrides = {key.split(".", 1)[1]: rate for key, rate in thresholds.items()
+                 if key.startswith(f"{name}.")}
+    return [replace(c, max_rate=overrides[c.name]) if c.name in overrides else c for c in checks]
+
+
+def validate(spark, suites=None, thresholds=None, metrics_table=config.CONTROL_QUALITY,
+             run_id=None, fail=True):
+    """Contrôle les tables de ``suites`` (``SUITES`` par défaut) et enregistre les résultats.
+
+    Les tables absentes sont ignorées. Lève ``ValueError`` si un contrôle
+    dépasse son seuil et que ``fail`` est vrai.
+    """
+    suites = SUITES if suites is None else suites
+    thresholds = thresholds or {}
+    results = []
+    for name, (path, checks) in suites.items():
+        if not DeltaTable.isDeltaTable(spark, path):
+            print(f"Qualité : table {name} absente, ignorée")
+            continue
+        df = spark.read.format("delta").load(path)
+        results += evaluate(spark, df, _suite_checks(name, checks, thresholds), table=name, run_id=run_id)
+
+    if results and metrics_table:
+        rows = [tuple(r[f.name] for f in QUALITY_SCHEMA.fields) for r in results]
+        spark.createDataFrame(rows, QUALITY_SCHEMA) \
+            .write.format("delta").mode("append").save(metrics_table)
+
+    failures = [r for r in results if not r["passed"]]
+    print(f"Qualité : {len(results) - len(failures)}/{len(results)} contrôles réussis")
+    for r in failures:
+        print(f"  ✗ {r['table']}.{r['check']} : {r['failed_rows']} ligne(s) "
+              f"({r['failed_rate']:.2%} > {r['max_rate']:.2%})")
+    if failures and fail:
+        failed = ", ".join(f"{r['table']}.{r['check']}" for r in failures)
+        raise ValueError(f"Contrôles de qualité en échec : {failed}")
+    return results
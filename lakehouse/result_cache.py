@@ -0,0 +1,96 @@
+"""Cache disque des résultats pandas des visualisations.
+
+Chaque résultat est identifié par l'empreinte de la requête (nom et
+paramètres) et par la dernière version des tables Delta qu'elle lit qui
+a modifié leurs données (``delta_log.data_version`` : un OPTIMIZE ou un
+commit ``dataChange=false`` ne compte pas). Tant que les données ne
+changent pas, le graphique est relu depuis un fichier Parquet local au
+lieu de relancer l'agrégation Spark et le ``toPandas()``. Une nouvelle
+version des données change la clé : l'ancienne entrée est supprimée. La
+taille totale est plafonnée avec une éviction LRU.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from lakehouse.delta_log import data_version
+
+DEFAULT_CACHE_DIR = ".cache/query_results"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _digest(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class ResultCache:
+    def __init__(self, spark=None, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """``spark`` n'est utilisé que pour les tables non locales (version via l'API Delta)."""
+        self.spark = spark
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, query_key, version_key):
+        return os.path.join(self.cache_dir, f"{query_key}-{version_key}.parquet")
+
+    def get_or_compute(self, name, sources, compute, params=None):
+        """Retourne le résultat de ``compute()`` pour la version courante des données de ``sources``.
+
+        ``sources`` : chemins des tables Delta lues par la requête.
+        ``compute`` : fonction sans argument qui retourne un DataFrame pandas.
+        """
+        query_key = _digest({"name": name, "params": params})
+        versions = {path: data_version(self.spark, path) for path in sorted(sources)}
+        entry = self._entry_path(query_key, _digest(versions))
+
+        if os.path.exists(entry):
+            self.hits += 1
+            os.utime(entry)  # date d'accès pour l'éviction LRU
+            return pd.read_parquet(entry)
+
+        self.misses += 1
+        result = compute()
+        self._invalidate(query_key)
+        tmp = entry + ".tmp"
+        result.to_parquet(tmp, index=False)
+        os.replace(tmp, entry)
+        self._evict()
+        return result
+
+    def _invalidate(self, query_key):
+        """Supprime les résultats de la même requête calculés sur d'anciennes versions."""
+        prefix = f"{query_key}-"
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def _entries(self):
+        paths = [os.path.join(self.cache_dir, n) for n in os.listdir(self.cache_dir)
+                 if n.endswith(".parquet")]
+        return sorted(paths, key=os.path.getmtime)
+
+    def size(self):
+        return sum(os.path.getsize(p) for p in self._entries())
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(os.path.getsize(p) for p in entries)
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+    def clear(self):
+        for path in self._entries():
+            os.remove(path)
+
+    def report(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(self._entries()), "bytes": self.size()}
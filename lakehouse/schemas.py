@@ -0,0 +1,184 @@
+"""Registre des schémas déclarés pour l'ingestion Bronze.
+
+Chaque source CSV possède un ``StructType`` explicite et un numéro de
+version : la lecture se fait en une seule passe (pas d'``inferSchema``)
+et les lignes mal formées sont, en mode permissif, isolées dans une
+table Delta de quarantaine au lieu de faire échouer le chargement.
+"""
+
+from dataclasses import dataclass
+
+from pyspark import StorageLevel
+from pyspark.sql.functions import col, current_timestamp, lit
+from pyspark.sql.types import (
+    DateType,
+    DoubleType,
+    LongType,
+    StringType,
+    StructField,
+    StructType,
+)
+
+from lakehouse import config
+
+CORRUPT_RECORD_COLUMN = "_corrupt_record"
+
+PERMISSIVE = "PERMISSIVE"
+STRICT = "STRICT"
+
+
+@dataclass(frozen=True)
+class SourceSchema:
+    """Schéma versionné d'une source CSV."""
+
+    name: str
+    version: int
+    path: str
+    schema: StructType
+    date_format: str = "yyyy-MM-dd"
+
+    @property
+    def stamp(self):
+        return f"{self.name}@v{self.version}"
+
+
+VACCINATION_SCHEMA = SourceSchema(
+    name="vaccination",
+    version=1,
+    path=config.VACCINATION_CSV,
+    schema=StructType([
+        StructField("COUNTRY", StringType()),
+        StructField("ISO3", StringType()),
+        StructField("WHO_REGION", StringType()),
+        StructField("DATA_SOURCE", StringType()),
+        StructField("DATE_UPDATED", DateType()),
+        StructField("TOTAL_VACCINATIONS", DoubleType()),
+        StructField("PERSONS_VACCINATED_1PLUS_DOSE", DoubleType()),
+        StructField("TOTAL_VACCINATIONS_PER100", DoubleType()),
+        StructField("PERSONS_VACCINATED_1PLUS_DOSE_PER100", DoubleType()),
+        StructField("PERSONS_LAST_DOSE", DoubleType()),
+        StructField("PERSONS_LAST_DOSE_PER100", DoubleType()),
+        StructField("VACCINES_USED", StringType()),
+        StructField("FIRST_VACCINE_DATE", DateType()),
+        StructField("NUMBER_VACCINES_TYPES_USED", DoubleType()),
+        StructField("PERSONS_BOOSTER_ADD_DOSE", DoubleType()),
+        StructField("PERSONS_BOOSTER_ADD_DOSE_PER100", DoubleType()),
+    ]),
+)
+
+WHO_DAILY_SCHEMA = SourceSchema(
+    name="who_daily",
+    version=1,
+    path=config.WHO_DAILY_CSV,
+    schema=StructType([
+        StructField("Date_reported", DateType()),
+        StructField("Country_code", StringType()),
+        StructField("Country", StringType()),
+        StructField("WHO_region", StringType()),
+        StructField("New_cases", LongType()),
+        StructField("Cumulative_cases", LongType()),
+        StructField("New_deaths", LongType()),
+        StructField("Cumulative_deaths", LongType()),
+    ]),
+)
+
+REGISTRY = {s.name: s for s in (VACCINATION_SCHEMA, WHO_DAILY_SCHEMA)}
+
+
+def get_schema(name):
+    """Retourne le schéma enregistré pour la source ``name``."""
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise ValueError(
+            f"Source inconnue : {name!r} (disponibles : {sorted(REGISTRY)})"
+        ) from None
+
+
+def read_source(spark, name, mode=PERMISSIVE, path=None):
+    """Lit une source CSV avec son schéma déclaré, sans inférence.
+
+    En mode ``STRICT`` la lecture échoue à la première ligne invalide et
+    l'en-tête doit correspondre au schéma. En mode ``PERMISSIVE`` la
+    colonne ``_corrupt_record`` est conservée pour permettre la mise en
+    quarantaine.
+    """
+    source = get_schema(name)
+    reader = spark.read.format("csv") \
+        .option("header", "true") \
+        .option("dateFormat", source.date_format)
+
+    if mode == STRICT:
+        reader = reader.schema(source.schema) \
+            .option("mode", "FAILFAST") \
+            .option("enforceSchema", "false")
+    elif mode == PERMISSIVE:
+        schema = StructType(
+            source.schema.fields + [StructField(CORRUPT_RECORD_COLUMN, StringType())]
+        )
+        reader = reader.schema(schema) \
+            .option("mode", "PERMISSIVE") \
+            .option("columnNameOfCorruptRecord", CORRUPT_RECORD_COLUMN)
+    else:
+        raise ValueError(f"Mode inconnu : {mode!r} (attendu : {PERMISSIVE} ou {STRICT})")
+
+    return reader.load(path or source.path)
+
+
+def valid_rows(df_raw):
+    """Lignes conformes au schéma, sans la colonne ``_corrupt_record``."""
+    return df_raw.filter(col(CORRUPT_RECORD_COLUMN).isNull()).drop(CORRUPT_RECORD_COLUMN)
+
+
+def quarantine_rejected(df_raw, name, quarantine_path=config.BRONZE_QUARANTINE, write_options=None):
+    """Ajoute les lignes mal formées de ``df_raw`` à la table de quarantaine.
+
+    Chaque ligne est accompagnée de la source, de la version du schéma et
+    de l'horodatage d'ingestion. ``write_options`` complète l'écriture
+    Delta (``txnAppId``/``txnVersion`` pour un ajout idempotent).
+    Retourne le nombre de lignes rejetées.
+    """
+    source = get_schema(name)
+    df_rejected = df_raw.filter(col(CORRUPT_RECORD_COLUMN).isNotNull()) \
+        .select(
+            lit(source.name).alias("source"),
+            lit(source.version).alias("schema_version"),
+            col(CORRUPT_RECORD_COLUMN).alias("raw_record"),
+            current_timestamp().alias("ingested_at"),
+        )
+    rejected = df_rejected.count()
+    if rejected:
+        df_rejected.write.format("delta").mode("append").options(**(write_options or {})).save(quarantine_path)
+        print(f"{rejected} ligne(s) mise(s) en quarantaine pour {source.stamp} : {quarantine_path}")
+    return rejected
+
+
+def ingest_bronze(spark, name, bronze_path, mode=PERMISSIVE,
+                  quarantine_path=config.BRONZE_QUARANTINE, path=None):
+    """Charge une source en zone Bronze en une seule lecture du CSV.
+
+    Les lignes valides sont écrites dans ``bronze_path``, les lignes mal
+    formées dans ``quarantine_path``. La version du schéma est inscrite
+    dans l'historique Delta via ``userMetadata``.
+    Retourne le DataFrame Bronze relu depuis Delta.
+    """
+    source = get_schema(name)
+    df_raw = read_source(spark, name, mode=mode, path=path)
+
+    if mode == STRICT:
+        df_raw.write.format("delta").mode("overwrite") \
+            .option("userMetadata", source.stamp) \
+            .save(bronze_path)
+        return spark.read.format("delta").load(bronze_path)
+
+    # Le CSV n'est parcouru qu'une fois : les deux écritures lisent le cache
+    df_raw = df_raw.persist(StorageLevel.MEMORY_AND_DISK)
+    try:
+        valid_rows(df_raw).write.format("delta").mode("overwrite") \
+            .option("userMetadata", source.stamp) \
+            .save(bronze_path)
+        quarantine_rejected(df_raw, name, quarantine_path)
+    finally:
+        df_raw.unpersist()
+
+    return spark.read.format("delta").load(bronze_path)
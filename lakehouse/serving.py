@@ -0,0 +1,290 @@
+"""Service de requêtes en lecture seule sur les tables Gold, sans Spark ni JVM.
+
+Les tables Delta sont lues directement : le journal est rejoué par
+``delta_log.snapshot`` et les fichiers Parquet actifs sont ouverts comme
+un ``pyarrow.dataset`` (valeurs de partition comprises, pour l'élagage).
+Un lecteur par table reste ouvert dans un pool (LRU) ; les métadonnées
+Parquet (pieds de fichiers, statistiques des row groups) sont chargées
+une fois par version de table. La version est revérifiée au plus une
+fois par ``refresh_seconds`` : une nouvelle écriture Gold est prise en
+compte sans redémarrer le service.
+
+    python -m lakehouse.serving --port 8050
+    curl 'http://127.0.0.1:8050/region_totals'
+    curl 'http://127.0.0.1:8050/country_series?country=France&start=2021-01-01&end=2021-12-31'
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from lakehouse import config
+from lakehouse.delta_log import local_version, snapshot
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8050
+DEFAULT_MAX_READERS = 16
+DEFAULT_REFRESH_SECONDS = 1.0
+
+TABLES = {
+    "region_aggregation": config.GOLD_REGION_AGG,
+    "daily_avg": config.GOLD_DAILY_AVG,
+    "fact_enriched": config.GOLD_FACT_ENRICHED,
+}
+
+SERIES_COLUMNS = (
+    "COUNTRY", "DATE_UPDATED", "TOTAL_VACCINATIONS", "progression_vaccinations",
+    "delta_7d", "delta_28d", "growth_7d", "growth_28d", "vaccination_ratio",
+)
+
+_PRIMITIVES = {
+    "string": pa.string(),
+    "long": pa.int64(),
+    "integer": pa.int32(),
+    "short": pa.int16(),
+    "byte": pa.int8(),
+    "double": pa.float64(),
+    "float": pa.float32(),
+    "boolean": pa.bool_(),
+    "date": pa.date32(),
+    "timestamp": pa.timestamp("us", tz="UTC"),
+    "binary": pa.binary(),
+}
+_DECIMAL = re.compile(r"decimal\((\d+),\s*(\d+)\)")
+
+
+def arrow_type(delta_type):
+    """Type Arrow d'un type du schéma Delta (JSON du ``metaData``)."""
+    if isinstance(delta_type, str):
+        if delta_type in _PRIMITIVES:
+            return _PRIMITIVES[delta_type]
+        decimal = _DECIMAL.fullmatch(delta_type)
+        if decimal:
+            return pa.decimal128(int(decimal.group(1)), int(decimal.group(2)))
+        raise ValueError(f"Type Delta non pris en charge : {delta_type!r}")
+    if delta_type["type"] == "array":
+        return pa.list_(arrow_type(delta_type["elementType"]))
+    if delta_type["type"] == "map":
+        return pa.map_(arrow_type(delta_type["keyType"]), arrow_type(delta_type["valueType"]))
+    return pa.struct([pa.field(f["name"], arrow_type(f["type"]), f.get("nullable", True))
+                      for f in delta_type["fields"]])
+
+
+def arrow_schema(delta_schema):
+    return pa.schema([pa.field(f["name"], arrow_type(f["type"]), f.get("nullable", True))
+                      for f in delta_schema["fields"]])
+
+
+def _partition_expression(values, schema):
+    expression = ds.scalar(True)
+    for name, value in values.items():
+        field = ds.field(name)
+        if value is None:
+            expression = expression & field.is_null()
+        else:
+            expression = expression & (field == pa.scalar(value).cast(schema.field(name).type))
+    return expression
+
+
+class TableReader:
+    """Lecteur d'une table Delta locale, rechargé quand sa version change."""
+
+    def __init__(self, path, refresh_seconds=DEFAULT_REFRESH_SECONDS):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.version = None
+        self.dataset = None
+        self.partition_columns = ()
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, version):
+        state = snapshot(self.path, version)
+        schema = arrow_schema(state.schema)
+        paths = sorted(state.files)
+        dataset = ds.FileSystemDataset.from_paths(
+            paths, schema=schema, format=ds.ParquetFileFormat(), filesystem=pafs.LocalFileSystem(),
+            partitions=[_partition_expression(state.files[p], schema) for p in paths],
+        )
+        # Pieds Parquet lus une fois : les requêtes suivantes élaguent les row groups sans I/O
+        for fragment in dataset.get_fragments():
+            fragment.ensure_complete_metadata()
+        self.dataset, self.version, self.partition_columns = dataset, version, state.partition_columns
+
+    def refresh(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.dataset is None or now - self._checked_at >= self.refresh_seconds:
+                version = local_version(self.path)
+                if version != self.version:
+                    self._load(version)
+                self._checked_at = now
+        return self.dataset
+
+    def read(self, columns=None, filter=None):
+        dataset = self.refresh()
+        if columns is not None:
+            columns = [c for c in columns if c in dataset.schema.names]
+        return dataset.to_table(columns=columns, filter=filter)
+
+
+class ReaderPool:
+    """Lecteurs ouverts, au plus ``max_readers`` (les moins récemment utilisés sont fermés)."""
+
+    def __init__(self, max_readers=DEFAULT_MAX_READERS, refresh_seconds=DEFAULT_REFRESH_SECONDS):
+        self.max_readers = max_readers
+        self.refresh_seconds = refresh_seconds
+        self._readers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            reader = self._readers.pop(path, None) or TableReader(path, self.refresh_seconds)
+            self._readers[path] = reader
+            while len(self._readers) > self.max_readers:
+                self._readers.popitem(last=False)
+            return reader
+
+
+def _as_date(value):
+    if value is None or isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
+
+
+class GoldQueryService:
+    """Requêtes paramétrées sur les tables Gold ; chaque méthode retourne une ``pyarrow.Table``."""
+
+    def __init__(self, root=".", pool=None):
+        self.root = root
+        self.pool = pool or ReaderPool()
+
+    def _reader(self, table):
+        return self.pool.get(os.path.join(self.root, TABLES[table]))
+
+    def tables(self):
+        """Version et nombre de fichiers actifs de chaque table servie."""
+        status = {}
+        for name in TABLES:
+            reader = self._reader(name)
+            try:
+                dataset = reader.refresh()
+            except FileNotFoundError:
+                continue
+            status[name] = {"version": reader.version, "files": len(dataset.files)}
+        return status
+
+    def region_totals(self, region=None):
+        filter = ds.field("WHO_REGION") == region if region else None
+        return self._reader("region_aggregation").read(filter=filter) \
+            .sort_by([("total_vaccinations_sum", "descending")])
+
+    def daily_avg(self, country=None):
+        filter = ds.field("COUNTRY") == country if country else None
+        return self._reader("daily_avg").read(filter=filter).sort_by("COUNTRY")
+
+    def country_series(self, country, start=None, end=None, columns=SERIES_COLUMNS):
+        """Série d'un pays entre ``start`` et ``end`` inclus (dates ISO ou ``datetime.date``)."""
+        if not country:
+            raise ValueError("Paramètre country obligatoire")
+        start, end = _as_date(start), _as_date(end)
+        reader = self._reader("fact_enriched")
+        reader.refresh()
+        filter = ds.field("COUNTRY") == country
+        if start is not None:
+            filter = filter & (ds.field("DATE_UPDATED") >= pa.scalar(start))
+        if end is not None:
+            filter = filter & (ds.field("DATE_UPDATED") <= pa.scalar(end))
+        if "year" in reader.partition_columns:
+            # Colonne de partition générée : élague les années hors plage
+            if start is not None:
+                filter = filter & (ds.field("year") >= start.year)
+            if end is not None:
+                filter = filter & (ds.field("year") <= end.year)
+        return reader.read(columns=list(columns), filter=filter).sort_by("DATE_UPDATED")
+
+
+# --- HTTP ---
+
+ENDPOINTS = {
+    "/tables": lambda service, params: service.tables(),
+    "/region_totals": lambda service, params: service.region_totals(params.get("region")),
+    "/daily_avg": lambda service, params: service.daily_avg(params.get("country")),
+    "/country_series": lambda service, params: service.country_series(
+        params.get("country"), params.get("start"), params.get("end")),
+}
+
+
+def _json(result):
+    if isinstance(result, pa.Table):
+        result = result.to_pylist()
+    return json.dumps(result, default=str).encode("utf-8")
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            endpoint = ENDPOINTS.get(url.path)
+            if endpoint is None:
+                self._send(404, _json({"error": f"Point d'accès inconnu : {url.path}",
+                                       "endpoints": sorted(ENDPOINTS)}))
+                return
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                self._send(200, _json(endpoint(service, params)))
+            except (ValueError, KeyError) as e:
+                self._send(400, _json({"error": str(e)}))
+            except FileNotFoundError as e:
+                self._send(404, _json({"error": str(e)}))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(root=".", host=DEFAULT_HOST, port=DEFAULT_PORT, max_readers=DEFAULT_MAX_READERS,
+          refresh_seconds=DEFAULT_REFRESH_SECONDS):
+    service = GoldQueryService(root, ReaderPool(max_readers, refresh_seconds))
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Service Gold en écoute sur http://{host}:{port} ({', '.join(sorted(ENDPOINTS))})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=".", help="Répertoire contenant delta/gold")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-readers", type=int, default=DEFAULT_MAX_READERS)
+    parser.add_argument("--refresh-seconds", type=float, default=DEFAULT_REFRESH_SECONDS)
+    args = parser.parse_args()
+    serve(args.root, args.host, args.port, args.max_readers, args.refresh_seconds)
+
+
+if __name__ == "__main__":
+    main()
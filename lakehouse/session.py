@@ -0,0 +1,131 @@
+"""Création de la session Spark : profils de configuration et jars Delta hors ligne.
+
+Le notebook et les benchmarks déclaraient chacun un builder avec
+``spark.jars.packages``, qui télécharge Delta depuis Maven Central au
+démarrage. Ici les jars sont pris, dans l'ordre :
+
+1. dans ``$DELTA_JARS_DIR`` ou le cache Ivy local (``~/.ivy2/jars``),
+   déjà rempli par un précédent téléchargement ;
+2. sinon via ``configure_spark_with_delta_pip`` (paquet ``delta-spark``
+   installé), qui fixe la version compatible et ne télécharge qu'une fois.
+
+Une session déjà active (Databricks, notebook relancé) est réutilisée :
+seules les options SQL modifiables à chaud du profil lui sont appliquées.
+
+Profils : ``local-small`` (portable, peu de partitions), ``local-large``
+(tous les cœurs, plus de mémoire) et ``cluster`` (maître fourni par
+l'environnement). Le profil par défaut se choisit avec la variable
+``LAKEHOUSE_SPARK_PROFILE``.
+"""
+
+import glob
+import os
+
+from pyspark.sql import SparkSession
+
+DEFAULT_APP_NAME = "VaccinationDataPipeline"
+DEFAULT_PROFILE = "local-small"
+PROFILE_ENV = "LAKEHOUSE_SPARK_PROFILE"
+DELTA_JARS_ENV = "DELTA_JARS_DIR"
+
+DELTA_VERSION = "2.3.0"
+SCALA_VERSION = "2.12"
+
+COMMON_CONF = {
+    "spark.sql.extensions": "io.delta.sql.DeltaSparkSessionExtension",
+    "spark.sql.catalog.spark_catalog": "org.apache.spark.sql.delta.catalog.DeltaCatalog",
+    "spark.scheduler.mode": "FAIR",
+    "spark.sql.adaptive.enabled": "true",
+    "spark.sql.adaptive.coalescePartitions.enabled": "true",
+    "spark.sql.execution.arrow.pyspark.enabled": "true",
+    "spark.sql.execution.arrow.pyspark.fallback.enabled": "true",
+    "spark.serializer": "org.apache.spark.serializer.KryoSerializer",
+    # Change Data Feed sur les nouvelles tables Delta (voir lakehouse.changes)
+    "spark.databricks.delta.properties.defaults.enableChangeDataFeed": "true",
+}
+
+PROFILES = {
+    "local-small": {
+        "spark.master": "local[2]",
+        "spark.driver.memory": "2g",
+        "spark.sql.shuffle.partitions": "8",
+        "spark.default.parallelism": "8",
+        "spark.ui.showConsoleProgress": "false",
+    },
+    "local-large": {
+        "spark.master": "local[*]",
+        "spark.driver.memory": "8g",
+        "spark.sql.shuffle.partitions": "64",
+        "spark.sql.adaptive.skewJoin.enabled": "true",
+        "spark.sql.adaptive.advisoryPartitionSizeInBytes": "64m",
+    },
+    "cluster": {
+        "spark.sql.shuffle.partitions": "200",
+        "spark.sql.adaptive.skewJoin.enabled": "true",
+        "spark.sql.adaptive.advisoryPartitionSizeInBytes": "128m",
+    },
+}
+
+
+def _installed_delta_version():
+    try:
+        from importlib.metadata import version
+        return version("delta-spark")
+    except Exception:
+        return DELTA_VERSION
+
+
+def local_delta_jars(version=None):
+    """Chemins des jars ``delta-core`` et ``delta-storage`` disponibles localement, ou ``None``."""
+    version = version or _installed_delta_version()
+    names = (f"delta-core_{SCALA_VERSION}-{version}.jar", f"delta-storage-{version}.jar")
+    directories = [os.environ.get(DELTA_JARS_ENV), os.path.expanduser("~/.ivy2/jars")]
+    for directory in filter(None, directories):
+        # Le cache Ivy préfixe les jars par leur groupe : io.delta_delta-core_2.12-2.3.0.jar
+        found = [next(iter(glob.glob(os.path.join(directory, f"*{name}"))), None) for name in names]
+        if all(found):
+            return found
+    return None
+
+
+def profile_conf(profile):
+    if profile not in PROFILES:
+        raise ValueError(f"Profil Spark inconnu : {profile!r} (disponibles : {sorted(PROFILES)})")
+    return {**COMMON_CONF, **PROFILES[profile]}
+
+
+def _apply_runtime_conf(spark, conf):
+    for key, value in conf.items():
+        if key.startswith("spark.sql.") and spark.conf.isModifiable(key):
+            spark.conf.set(key, value)
+
+
+def get_spark(profile=None, app_name=DEFAULT_APP_NAME, master=None, conf=None):
+    """Session Spark configurée selon ``profile`` ; réutilise la session active s'il y en a une.
+
+    ``master`` remplace celui du profil ; ``conf`` ajoute ou remplace des options.
+    """
+    profile = profile or os.environ.get(PROFILE_ENV, DEFAULT_PROFILE)
+    settings = {**profile_conf(profile), **(conf or {})}
+    if master:
+        settings["spark.master"] = master
+
+    active = SparkSession.getActiveSession()
+    if active is not None:
+        _apply_runtime_conf(active, settings)
+        return active
+
+    builder = SparkSession.builder.appName(app_name)
+    for key, value in settings.items():
+        builder = builder.config(key, value)
+
+    jars = local_delta_jars()
+    if jars:
+        builder = builder.config("spark.jars", ",".join(jars))
+    else:
+        from delta import configure_spark_with_delta_pip
+        builder = configure_spark_with_delta_pip(builder)
+
+    spark = builder.getOrCreate()
+    print(f"Session Spark {spark.version} (profil {profile}, Delta {'local' if jars else 'pip'})")
+    return spark
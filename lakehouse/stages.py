@@ -0,0 +1,151 @@
+"""Étapes du notebook déclarées pour l'ordonnanceur DAG.
+
+Toutes les tables Gold de vaccination ne dépendent que du DataFrame
+Silver (``df_clean`` dans le notebook) ; elles s'exécutent donc en
+parallèle une fois la zone Silver écrite, et lisent ``df_clean`` depuis
+le cache plutôt que de rejouer le nettoyage. Seule la table Fait attend
+en plus la dimension géographique, qui lui fournit ses clés ``country_id`` ;
+la dimension temporelle est un calendrier généré, sans dépendance.
+Les fonctions ne font que transformer : l'écriture Delta est faite par
+l'ordonnanceur.
+
+    from lakehouse.stages import build_pipeline
+    build_pipeline().run(spark)                               # tout le pipeline
+    build_pipeline().run(spark, targets=["gold_fact_enriched"])  # une étape et ses dépendants
+
+``build_pipeline(root=..., sources=...)`` place toutes les tables sous
+``root`` et lit d'autres fichiers sources (benchmarks sur données
+synthétiques).
+"""
+
+import os
+from functools import partial
+
+from lakehouse import alignment, config, cube, star, transforms
+from lakehouse.bucketing import clustered
+from lakehouse.calendar_dimension import build_calendar
+from lakehouse.layout import LAYOUTS
+from lakehouse.pipeline import Pipeline, Stage
+from lakehouse.schemas import ingest_bronze
+
+DATASETS = {
+    "bronze_vaccination": config.BRONZE_VACCINATION,
+    "silver_vaccination": config.SILVER_VACCINATION,
+    "gold_fact": config.GOLD_FACT,
+    "gold_fact_enriched": config.GOLD_FACT_ENRICHED,
+    "gold_dimension_country": config.GOLD_DIM_COUNTRY,
+    "gold_dimension_date": config.GOLD_DIM_DATE,
+    "gold_enriched_dimension_date": config.GOLD_DIM_DATE_ENRICHED,
+    "gold_region_aggregation": config.GOLD_REGION_AGG,
+    "gold_daily_avg": config.GOLD_DAILY_AVG,
+    "gold_vaccination_cube": config.GOLD_CUBE,
+    "gold_vaccination_deaths": config.GOLD_VACCINATION_DEATHS,
+    "bronze_who_daily": config.BRONZE_WHO_DAILY,
+    "silver_who_deaths": config.SILVER_WHO_DEATHS,
+}
+
+
+def bronze_vaccination(spark, bronze_path=config.BRONZE_VACCINATION, source_path=None,
+                       quarantine_path=config.BRONZE_QUARANTINE):
+    return {"bronze_vaccination": ingest_bronze(spark, "vaccination", bronze_path,
+                                                quarantine_path=quarantine_path, path=source_path)}
+
+
+def silver_vaccination(spark, bronze_vaccination):
+    # Regroupé par pays une fois : les fenêtres et agrégats par pays en aval
+    # réutilisent ce partitionnement sans nouveau shuffle
+    return {"silver_vaccination": clustered(transforms.clean_vaccination(bronze_vaccination))}
+
+
+def gold_fact(spark, silver_vaccination, gold_dimension_country):
+    return {"gold_fact": star.build_fact(silver_vaccination, gold_dimension_country)}
+
+
+def gold_fact_enriched(spark, silver_vaccination):
+    fact_table = transforms.build_fact(silver_vaccination)
+    return {"gold_fact_enriched": transforms.enrich_fact(fact_table)}
+
+
+def gold_dimension_country(spark, silver_vaccination, dimension_path=config.GOLD_DIM_COUNTRY):
+    # Relit la dimension existante pour conserver les identifiants de pays
+    return {"gold_dimension_country": star.build_dimension_country(spark, silver_vaccination, dimension_path)}
+
+
+def gold_dimension_date(spark):
+    return {"gold_dimension_date": build_calendar(spark)}
+
+
+def gold_enriched_dimension_date(spark, gold_dimension_date):
+    return {"gold_enriched_dimension_date": transforms.enrich_dimension_date(gold_dimension_date)}
+
+
+def gold_vaccination_cube(spark, silver_vaccination):
+    fact_table = transforms.build_fact(silver_vaccination)
+    return {"gold_vaccination_cube": cube.build_cube(fact_table)}
+
+
+def gold_region_aggregation(spark, gold_vaccination_cube):
+    return {"gold_region_aggregation": cube.region_aggregation_from_cube(gold_vaccination_cube)}
+
+
+def gold_daily_avg(spark, gold_vaccination_cube):
+    return {"gold_daily_avg": cube.daily_avg_from_cube(gold_vaccination_cube)}
+
+
+def gold_vaccination_deaths(spark, silver_vaccination, silver_who_deaths):
+    fact_table = transforms.build_fact(silver_vaccination)
+    return {"gold_vaccination_deaths": alignment.align_deaths(fact_table, silver_who_deaths)}
+
+
+def bronze_who_daily(spark, bronze_path=config.BRONZE_WHO_DAILY, source_path=None,
+                     quarantine_path=config.BRONZE_QUARANTINE):
+    return {"bronze_who_daily": ingest_bronze(spark, "who_daily", bronze_path,
+                                              quarantine_path=quarantine_path, path=source_path)}
+
+
+def silver_who_deaths(spark, bronze_who_daily):
+    return {"silver_who_deaths": clustered(transforms.clean_who_daily(bronze_who_daily))}
+
+
+def _stage(func, *inputs, write_outputs=True):
+    name = func.func.__name__ if isinstance(func, partial) else func.__name__
+    return Stage(name=name, func=func, inputs=inputs, outputs=(name,), write_outputs=write_outputs)
+
+
+def build_pipeline(root=None, sources=None):
+    """Pipeline complet Bronze → Silver → Gold des deux sources.
+
+    ``root`` préfixe les chemins de toutes les tables ; ``sources`` associe
+    un nom de source (``"vaccination"``, ``"who_daily"``) à un autre CSV.
+    """
+    def located(path):
+        return path if root is None else os.path.join(root, path)
+
+    datasets = {name: located(path) for name, path in DATASETS.items()}
+    sources = sources or {}
+    quarantine_path = located(config.BRONZE_QUARANTINE)
+
+    def bronze(func, source):
+        return partial(func, bronze_path=datasets[func.__name__], source_path=sources.get(source),
+                       quarantine_path=quarantine_path)
+
+    return Pipeline(
+        [
+            _stage(bronze(bronze_vaccination, "vaccination"), write_outputs=False),
+            _stage(silver_vaccination, "bronze_vaccination"),
+            _stage(gold_fact, "silver_vaccination", "gold_dimension_country"),
+            _stage(gold_fact_enriched, "silver_vaccination"),
+            _stage(partial(gold_dimension_country, dimension_path=datasets["gold_dimension_country"]),
+                   "silver_vaccination"),
+            _stage(gold_dimension_date),
+            _stage(gold_enriched_dimension_date, "gold_dimension_date"),
+            _stage(gold_vaccination_cube, "silver_vaccination"),
+            _stage(gold_region_aggregation, "gold_vaccination_cube"),
+            _stage(gold_daily_avg, "gold_vaccination_cube"),
+            _stage(bronze(bronze_who_daily, "who_daily"), write_outputs=False),
+            _stage(silver_who_deaths, "bronze_who_daily"),
+            _stage(gold_vaccination_deaths, "silver_vaccination", "silver_who_deaths"),
+        ],
+        datasets,
+        layouts={name: LAYOUTS[path] for name, path in DATASETS.items() if path in LAYOUTS},
+    )
@@ -0,0 +1,139 @@
+"""Modèle en étoile à clés de substitution entières.
+
+La table Fait ne stocke que des clés entières (``country_id`` et
+``date_id`` au format ``yyyymmdd``) et les mesures ; le nom du pays,
+l'ISO3 et la région sont portés par la dimension géographique.
+
+Les identifiants de pays sont attribués sur l'ISO3 et ne changent
+jamais : un rechargement, complet ou incrémental, relit la dimension
+existante, conserve les identifiants connus et numérote les nouveaux
+pays à la suite. ``date_id`` se calcule à partir de la date.
+
+``star_join`` rattache les dimensions à la table Fait et diffuse
+(broadcast) celles dont la taille estimée est sous le seuil : la
+jointure est un *broadcast hash join* sur des entiers, sans shuffle de
+la table Fait.
+"""
+
+from delta.tables import DeltaTable
+from pyspark.sql.functions import broadcast, col, expr, lit, max as _max, row_number, to_date
+from pyspark.sql.window import Window
+
+from lakehouse import config, transforms
+from lakehouse.cache import estimated_size
+from lakehouse.transforms import DATE_KEY, FACT_MEASURES, date_key
+
+COUNTRY_KEY = "country_id"
+COUNTRY_NATURAL_KEY = "ISO3"
+COUNTRY_ATTRIBUTES = ("COUNTRY", "WHO_REGION")
+DIMENSION_COUNTRY_COLUMNS = (COUNTRY_KEY, "COUNTRY", COUNTRY_NATURAL_KEY, "WHO_REGION")
+
+FACT_KEYS = (COUNTRY_KEY, DATE_KEY)
+FACT_COLUMNS = FACT_KEYS + FACT_MEASURES
+
+# Dimensions plus petites que ce volume estimé : diffusées aux exécuteurs
+DEFAULT_BROADCAST_THRESHOLD = 64 * 1024 * 1024
+
+
+def date_from_key(column=DATE_KEY):
+    """Inverse de ``date_key`` : ``20231231`` → ``2023-12-31``."""
+    return to_date(col(column).cast("string"), "yyyyMMdd")
+
+
+def _existing_dimension(spark, path):
+    if path is None or not DeltaTable.isDeltaTable(spark, path):
+        return None
+    df = spark.read.format("delta").load(path)
+    # Dimension écrite avant l'introduction des clés : renumérotée entièrement
+    return df if COUNTRY_KEY in df.columns else None
+
+
+def build_dimension_country(spark, df_clean, path=config.GOLD_DIM_COUNTRY):
+    """Dimension géographique complète, identifiants existants conservés.
+
+    Les attributs d'un pays sont ceux de son relevé le plus récent dans
+    ``df_clean`` ; un pays absent de ``df_clean`` garde sa ligne. Comme le
+    résultat dépend de la table ``path`` qu'il va remplacer, il est
+    matérialisé (``localCheckpoint``) avant d'être retourné.
+    """
+    latest = df_clean.filter(col(COUNTRY_NATURAL_KEY).isNotNull()) \
+        .groupBy(COUNTRY_NATURAL_KEY) \
+        .agg(expr(f"max_by(struct({', '.join(COUNTRY_ATTRIBUTES)}), DATE_UPDATED)").alias("_latest")) \
+        .select(COUNTRY_NATURAL_KEY, *(col(f"_latest.{a}").alias(a) for a in COUNTRY_ATTRIBUTES))
+
+    existing = _existing_dimension(spark, path)
+    if existing is None:
+        return latest.withColumn(COUNTRY_KEY, row_number().over(Window.orderBy(COUNTRY_NATURAL_KEY))) \
+            .select(*DIMENSION_COUNTRY_COLUMNS)
+
+    known = existing.select(COUNTRY_KEY, COUNTRY_NATURAL_KEY)
+    offset = existing.agg(_max(COUNTRY_KEY)).first()[0] or 0
+    updated = latest.join(known, COUNTRY_NATURAL_KEY)
+    added = latest.join(known, COUNTRY_NATURAL_KEY, "left_anti") \
+        .withColumn(COUNTRY_KEY, row_number().over(Window.orderBy(COUNTRY_NATURAL_KEY)) + lit(offset))
+    unchanged = existing.join(latest.select(COUNTRY_NATURAL_KEY), COUNTRY_NATURAL_KEY, "left_anti")
+
+    columns = list(DIMENSION_COUNTRY_COLUMNS)
+    return updated.select(*columns) \
+        .unionByName(added.select(*columns)) \
+        .unionByName(unchanged.select(*columns)) \
+        .localCheckpoint()
+
+
+def build_fact(df_clean, dimension_country):
+    """Table Fait réduite aux clés entières et aux mesures."""
+    keys = dimension_country.select(COUNTRY_KEY, COUNTRY_NATURAL_KEY)
+    return df_clean.join(broadcast(keys), COUNTRY_NATURAL_KEY, "left") \
+        .select(col(COUNTRY_KEY), date_key().alias(DATE_KEY), *FACT_MEASURES)
+
+
+def _maybe_broadcast(df, threshold):
+    try:
+        small = estimated_size(df) <= threshold
+    except Exception:
+        small = True  # statistiques indisponibles : une dimension reste petite
+    return broadcast(df) if small else df
+
+
+def star_join(fact, dimensions, threshold=DEFAULT_BROADCAST_THRESHOLD):
+    """Joint ``fact`` à chaque dimension de ``dimensions`` ({clé: DataFrame}).
+
+    Les dimensions sous ``threshold`` octets (estimation Catalyst) sont
+    diffusées ; les lignes de fait sans correspondance sont conservées.
+    """
+    for key, dimension in dimensions.items():
+        fact = fact.join(_maybe_broadcast(dimension, threshold), key, "left")
+    return fact
+
+
+def denormalize(fact, dimension_country, threshold=DEFAULT_BROADCAST_THRESHOLD):
+    """Table Fait aux clés naturelles (``transforms.FACT_COLUMNS``)."""
+    countries = dimension_country.select(COUNTRY_KEY, *COUNTRY_ATTRIBUTES)
+    return star_join(fact, {COUNTRY_KEY: countries}, threshold) \
+        .withColumn("DATE_UPDATED", date_from_key()) \
+        .select(*transforms.FACT_COLUMNS)
+
+
+def read_fact(spark, fact_path=config.GOLD_FACT, dimension_path=config.GOLD_DIM_COUNTRY):
+    """Table Fait Gold relue et dénormalisée, pour les traitements par pays."""
+    return denormalize(
+        spark.read.format("delta").load(fact_path),
+        spark.read.format("delta").load(dimension_path),
+    )
+
+
+def query(spark, dimensions=("country", "date"), threshold=DEFAULT_BROADCAST_THRESHOLD):
+    """Table Fait jointe aux dimensions demandées (``"country"``, ``"date"``).
+
+    La dimension temporelle utilisée est la version enrichie (jour de la
+    semaine, saison, week-end).
+    """
+    tables = {
+        "country": (COUNTRY_KEY, config.GOLD_DIM_COUNTRY),
+        "date": (DATE_KEY, config.GOLD_DIM_DATE_ENRICHED),
+    }
+    unknown = set(dimensions) - set(tables)
+    if unknown:
+        raise ValueError(f"Dimensions inconnues : {sorted(unknown)} (disponibles : {sorted(tables)})")
+    selected = {tables[name][0]: spark.read.format("delta").load(tables[name][1]) for name in dimensions}
+    return star_join(spark.read.format("delta").load(config.GOLD_FACT), selected, threshold)
@@ -0,0 +1,110 @@
+"""Ingestion en continu des données journalières de l'OMS (Structured Streaming).
+
+Les nouveaux fichiers CSV déposés dans le répertoire d'atterrissage sont
+lus avec le schéma déclaré. Chaque micro-batch (``foreachBatch``) :
+
+- met en quarantaine les lignes mal formées et ajoute les lignes
+  valides à la table Bronze (écritures idempotentes : un micro-batch
+  rejoué après une panne n'est pas ajouté deux fois) ;
+- applique le nettoyage Silver du notebook (renommage, ``to_date``,
+  filtre des dates nulles) et fusionne le résultat par MERGE.
+
+Le checkpoint mémorise les fichiers déjà traités : l'historique n'est
+jamais relu. En local, ``process_available`` traite les fichiers présents
+puis s'arrête, et ``stage_file`` simule l'arrivée d'un fichier.
+"""
+
+import os
+import shutil
+import uuid
+from functools import partial
+
+from pyspark.sql.types import StringType, StructField, StructType
+
+from lakehouse import config, transforms
+from lakehouse.incremental import WHO_DEATHS_KEYS, merge_upsert
+from lakehouse.schemas import CORRUPT_RECORD_COLUMN, get_schema, quarantine_rejected, valid_rows
+
+APP_ID = "who_daily_stream"
+
+
+def read_landing(spark, landing_dir=config.LANDING_WHO_DAILY, max_files_per_trigger=None):
+    """Flux des fichiers CSV déposés dans ``landing_dir``."""
+    source = get_schema("who_daily")
+    schema = StructType(source.schema.fields + [StructField(CORRUPT_RECORD_COLUMN, StringType())])
+    reader = spark.readStream.format("csv") \
+        .option("header", "true") \
+        .option("dateFormat", source.date_format) \
+        .option("mode", "PERMISSIVE") \
+        .option("columnNameOfCorruptRecord", CORRUPT_RECORD_COLUMN) \
+        .schema(schema)
+    if max_files_per_trigger:
+        reader = reader.option("maxFilesPerTrigger", max_files_per_trigger)
+    return reader.load(landing_dir)
+
+
+def process_batch(batch_df, batch_id, bronze_path=config.BRONZE_WHO_DAILY,
+                  silver_path=config.SILVER_WHO_DEATHS,
+                  quarantine_path=config.BRONZE_QUARANTINE):
+    """Traitement d'un micro-batch : quarantaine, ajout Bronze, MERGE Silver."""
+    spark = batch_df.sparkSession
+    batch_df = batch_df.persist()
+    try:
+        quarantine_rejected(batch_df, "who_daily", quarantine_path,
+                            write_options={"txnAppId": APP_ID, "txnVersion": batch_id})
+
+        bronze = valid_rows(batch_df)
+        bronze.write.format("delta").mode("append") \
+            .option("txnAppId", APP_ID) \
+            .option("txnVersion", batch_id) \
+            .save(bronze_path)
+
+        silver = transforms.clean_who_daily(bronze).dropDuplicates(list(WHO_DEATHS_KEYS))
+        merge_upsert(spark, silver, silver_path, WHO_DEATHS_KEYS).unpersist()
+    finally:
+        batch_df.unpersist()
+
+
+def start_who_daily_stream(spark, landing_dir=config.LANDING_WHO_DAILY,
+                           checkpoint_dir=config.CHECKPOINT_WHO_DAILY,
+                           trigger_seconds=5, available_now=False,
+                           max_files_per_trigger=None, **table_paths):
+    """Démarre le flux et retourne la ``StreamingQuery``.
+
+    Par défaut un micro-batch est déclenché toutes les ``trigger_seconds``
+    secondes ; avec ``available_now`` les fichiers présents sont traités
+    puis le flux s'arrête. ``table_paths`` (``bronze_path``,
+    ``silver_path``, ``quarantine_path``) remplace les tables de
+    ``process_batch``.
+    """
+    writer = read_landing(spark, landing_dir, max_files_per_trigger).writeStream \
+        .queryName(APP_ID) \
+        .foreachBatch(partial(process_batch, **table_paths)) \
+        .option("checkpointLocation", checkpoint_dir)
+    if available_now:
+        writer = writer.trigger(availableNow=True)
+    else:
+        writer = writer.trigger(processingTime=f"{trigger_seconds} seconds")
+    return writer.start()
+
+
+def process_available(spark, landing_dir=config.LANDING_WHO_DAILY,
+                      checkpoint_dir=config.CHECKPOINT_WHO_DAILY, **table_paths):
+    """Traite les fichiers en attente puis rend la main (tests, exécution planifiée)."""
+    query = start_who_daily_stream(spark, landing_dir, checkpoint_dir, available_now=True, **table_paths)
+    query.awaitTermination()
+    return query.lastProgress
+
+
+def stage_file(path, landing_dir=config.LANDING_WHO_DAILY):
+    """Dépose ``path`` dans le répertoire d'atterrissage de façon atomique.
+
+    La source fichier de Spark peut lire un fichier en cours de copie :
+    il est d'abord copié sous un nom caché, puis renommé.
+    """
+    os.makedirs(landing_dir, exist_ok=True)
+    target = os.path.join(landing_dir, f"{uuid.uuid4().hex}-{os.path.basename(path)}")
+    tmp = os.path.join(landing_dir, "." + os.path.basename(target))
+    shutil.copyfile(path, tmp)
+    os.replace(tmp, target)
+    return target
@@ -0,0 +1,167 @@
+"""Normalisation des séries temporelles par pays sur une grille de dates commune.
+
+Le notebook réindexait chaque pays sur toutes les dates puis
+interpolait dans une boucle Python (limitée à 5 pays). Ici la grille
+pays × dates est construite en une fois et l'interpolation linéaire est
+calculée pour tous les pays avec des ``groupby().ffill()/bfill()``
+vectorisés. Le résultat est identique à ``Series.interpolate()`` appliqué
+pays par pays : valeurs de tête laissées vides, valeurs de queue
+prolongées avec la dernière valeur connue.
+
+Les pays sont traités par blocs (``chunk_countries``) pour borner la
+mémoire ; ``normalize_country_series_spark`` fait le même calcul côté
+Spark (``sequence``/``explode`` et fenêtres) pour les volumes qui ne
+tiennent pas sur le driver.
+
+``country_progression`` exécute l'interpolation et le cumul par pays sur
+les exécuteurs (``applyInPandas``, un groupe pandas par pays, échangé en
+Arrow) ; le driver ne collecte ensuite que les pays affichés. Sans
+``pyarrow``, le calcul repasse par la version Spark.
+"""
+
+import numpy as np
+import pandas as pd
+from pyspark.sql.functions import col, datediff, explode, first, last, max as _max, min as _min
+from pyspark.sql.functions import sequence, sum as _sum, when
+from pyspark.sql.window import Window
+
+from lakehouse.collect import arrow_available, driver_budget
+
+DEFAULT_CHUNK_COUNTRIES = 50
+
+# Octets par ligne de la grille : code de catégorie du pays, date, valeur, index
+_GRID_ROW_BYTES = 4 + 8 + 8 + 8
+
+
+def _interpolate_grid(grid, key, value_column):
+    """Interpolation linéaire par ``key`` sur une grille triée (clé, date)."""
+    values = grid[value_column]
+    position = pd.Series(np.arange(len(grid), dtype="float64"), index=grid.index)
+    known_position = position.where(values.notna())
+    groups = grid[key]
+
+    previous_value = values.groupby(groups).ffill()
+    next_value = values.groupby(groups).bfill()
+    previous_position = known_position.groupby(groups).ffill()
+    next_position = known_position.groupby(groups).bfill()
+
+    span = next_position - previous_position
+    fraction = ((position - previous_position) / span.where(span > 0)).fillna(0.0)
+    interpolated = previous_value + (next_value - previous_value) * fraction
+    # Après la dernière valeur connue : prolongement (comportement de interpolate())
+    return interpolated.where(next_value.notna(), previous_value)
+
+
+def iter_normalized(pdf, value_column, date_column="DATE_UPDATED", key="COUNTRY",
+                    all_dates=None, chunk_countries=DEFAULT_CHUNK_COUNTRIES):
+    """Produit la grille interpolée bloc de pays par bloc de pays."""
+    if all_dates is None:
+        all_dates = pd.date_range(start=pdf[date_column].min(), end=pdf[date_column].max())
+    # Doublons (pays, date) agrégés comme le groupBy Spark en amont
+    series = pdf.groupby([key, date_column], sort=False)[value_column].sum(min_count=1)
+    countries = series.index.get_level_values(0).unique()
+
+    for start in range(0, len(countries), chunk_countries):
+        chunk = countries[start:start + chunk_countries]
+        index = pd.MultiIndex.from_product([chunk, all_dates], names=[key, date_column])
+        grid = series.reindex(index).reset_index()
+        grid[value_column] = _interpolate_grid(grid, key, value_column)
+        # Catégories communes à tous les blocs : la concaténation reste catégorielle
+        grid[key] = pd.Categorical(grid[key], categories=countries)
+        yield grid
+
+
+def grid_bytes(n_countries, n_dates):
+    """Mémoire estimée de la grille pays × dates complète."""
+    return n_countries * n_dates * _GRID_ROW_BYTES
+
+
+def normalize_country_series(pdf, value_column, date_column="DATE_UPDATED", key="COUNTRY",
+                             all_dates=None, chunk_countries=DEFAULT_CHUNK_COUNTRIES):
+    """Grille complète pays × dates, interpolée, pour tous les pays.
+
+    Lève ``MemoryError`` si la grille dépasse le budget mémoire du driver :
+    ``iter_normalized`` (par blocs) ou ``country_progression`` (sur les
+    exécuteurs) restent alors utilisables.
+    """
+    if all_dates is None:
+        all_dates = pd.date_range(start=pdf[date_column].min(), end=pdf[date_column].max())
+    needed, budget = grid_bytes(pdf[key].nunique(), len(all_dates)), driver_budget()
+    if needed > budget:
+        raise MemoryError(f"Grille pays × dates de {needed / 2**20:.0f} Mo au-delà du budget driver "
+                          f"({budget / 2**20:.0f} Mo) : utiliser iter_normalized ou country_progression")
+    chunks = list(iter_normalized(pdf, value_column, date_column, key, all_dates, chunk_countries))
+    if not chunks:
+        return pd.DataFrame(columns=[key, date_column, value_column])
+    return pd.concat(chunks, ignore_index=True)
+
+
+def normalize_country_series_spark(df, value_column, date_column="DATE_UPDATED", key="COUNTRY"):
+    """Même normalisation dans Spark : grille par ``sequence``/``explode`` puis fenêtres."""
+    bounds = df.agg(_min(date_column).alias("start"), _max(date_column).alias("end"))
+    dates = bounds.select(explode(sequence(col("start"), col("end"))).alias(date_column))
+    values = df.groupBy(key, date_column).sum(value_column) \
+        .withColumnRenamed(f"sum({value_column})", value_column)
+    grid = df.select(key).distinct().crossJoin(dates) \
+        .join(values, [key, date_column], "left")
+
+    by_country = Window.partitionBy(key).orderBy(date_column)
+    before = by_country.rowsBetween(Window.unboundedPreceding, Window.currentRow)
+    after = by_country.rowsBetween(Window.currentRow, Window.unboundedFollowing)
+    known_date = when(col(value_column).isNotNull(), col(date_column))
+
+    grid = grid \
+        .withColumn("_prev_value", last(value_column, ignorenulls=True).over(before)) \
+        .withColumn("_prev_date", last(known_date, ignorenulls=True).over(before)) \
+        .withColumn("_next_value", first(value_column, ignorenulls=True).over(after)) \
+        .withColumn("_next_date", first(known_date, ignorenulls=True).over(after))
+
+    span = datediff("_next_date", "_prev_date")
+    interpolated = when(col("_next_value").isNull(), col("_prev_value")) \
+        .when(span == 0, col("_prev_value")) \
+        .otherwise(
+            col("_prev_value")
+            + (col("_next_value") - col("_prev_value"))
+            * datediff(col(date_column), col("_prev_date")) / span
+        )
+    return grid.withColumn(value_column, interpolated) \
+        .drop("_prev_value", "_prev_date", "_next_value", "_next_date")
+
+
+def _progression_udf(all_dates, value_column, date_column, key, cumulative_column):
+    """Fonction par pays pour ``applyInPandas`` (autonome : sérialisée vers les exécuteurs)."""
+    def progression(pdf):
+        series = pdf.groupby(date_column)[value_column].sum(min_count=1)
+        series.index = pd.to_datetime(series.index)
+        values = series.reindex(all_dates).interpolate().replace([np.inf, -np.inf], np.nan)
+        out = pd.DataFrame({
+            key: pdf[key].iloc[0],
+            date_column: all_dates.date,
+            value_column: values.to_numpy(dtype="float64"),
+        })
+        out[cumulative_column] = out[value_column].cumsum()
+        return out
+    return progression
+
+
+def country_progression(df, value_column, date_column="DATE_UPDATED", key="COUNTRY",
+                        cumulative_column="cumulative_vaccinations"):
+    """Grille pays × dates interpolée et cumul par pays, calculés sur les exécuteurs.
+
+    Même résultat que ``normalize_country_series`` suivi d'un
+    ``groupby(key).cumsum()`` ; retourne un DataFrame Spark.
+    """
+    df = df.filter(col(date_column).isNotNull() & col(value_column).isNotNull())
+    if not arrow_available():
+        by_country = Window.partitionBy(key).orderBy(date_column) \
+            .rowsBetween(Window.unboundedPreceding, Window.currentRow)
+        return normalize_country_series_spark(df, value_column, date_column, key) \
+            .withColumn(value_column, col(value_column).cast("double")) \
+            .withColumn(cumulative_column, _sum(value_column).over(by_country))
+
+    start, end = df.agg(_min(date_column), _max(date_column)).first()
+    all_dates = pd.date_range(start=start, end=end) if start is not None else pd.DatetimeIndex([])
+    schema = f"{key} string, {date_column} date, {value_column} double, {cumulative_column} double"
+    return df.select(key, date_column, value_column).groupBy(key).applyInPandas(
+        _progression_udf(all_dates, value_column, date_column, key, cumulative_column), schema
+    )
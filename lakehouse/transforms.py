@@ -0,0 +1,147 @@
+"""Transformations Silver et Gold du notebook, sous forme de fonctions pures.
+
+Chaque fonction prend et retourne un DataFrame sans rien écrire : le
+notebook (rechargement complet) et le mode incrémental appliquent ainsi
+exactement la même logique.
+"""
+
+from pyspark.sql.functions import broadcast, col, datediff, dayofmonth, dayofweek, lag, last, lit, max as _max
+from pyspark.sql.functions import month, to_date, when, year
+from pyspark.sql.window import Window
+
+# Colonnes supprimées en zone Silver
+VACCINATION_DROPPED_COLUMNS = ("VACCINES_USED", "NUMBER_VACCINES_TYPES_USED", "DATA_SOURCE")
+
+FACT_MEASURES = (
+    "TOTAL_VACCINATIONS",
+    "PERSONS_VACCINATED_1PLUS_DOSE",
+    "PERSONS_LAST_DOSE",
+    "PERSONS_BOOSTER_ADD_DOSE",
+)
+
+FACT_COLUMNS = ("COUNTRY", "WHO_REGION", "DATE_UPDATED") + FACT_MEASURES
+
+# Clé de substitution de la dimension temporelle : entier yyyymmdd
+DATE_KEY = "date_id"
+
+# Fenêtres glissantes (en jours) des variations de la table Fait enrichie
+ROLLING_WINDOWS = (7, 28)
+
+_DAY = "_day"
+_SINCE = "_since"
+_ANCHOR = "_anchor"
+
+
+# --- Zone Silver ---
+
+def normalize_vaccination(df_bronze):
+    """Nettoyage colonne par colonne, sans filtrer de lignes."""
+    return df_bronze.drop(*VACCINATION_DROPPED_COLUMNS) \
+        .fillna({"WHO_REGION": "Unknown"}) \
+        .withColumn("DATE_UPDATED", to_date("DATE_UPDATED", "yyyy-MM-dd"))
+
+
+def clean_vaccination(df_bronze):
+    return normalize_vaccination(df_bronze).filter(col("TOTAL_VACCINATIONS").isNotNull())
+
+
+def clean_who_daily(df_bronze_cases):
+    return df_bronze_cases.select(
+        col("Country").alias("COUNTRY"),
+        col("WHO_region").alias("WHO_REGION"),
+        col("New_deaths").alias("NEW_DEATHS"),
+        to_date(col("Date_reported"), "yyyy-MM-dd").alias("DATE_UPDATED")
+    ).filter(col("DATE_UPDATED").isNotNull())
+
+
+# --- Zone Gold ---
+
+def date_key(column="DATE_UPDATED"):
+    """``date_id`` (``20231231``) calculé à partir de la date, sans table de correspondance."""
+    return (year(column) * 10000 + month(column) * 100 + dayofmonth(column)).cast("int")
+
+
+def build_fact(df_clean):
+    """Mesures aux clés naturelles ; la table Fait stockée est celle de ``lakehouse.star``."""
+    return df_clean.select(*FACT_COLUMNS)
+
+
+def enrichment_columns(windows=ROLLING_WINDOWS):
+    """Colonnes ajoutées par ``enrich_fact``."""
+    names = ["progression_vaccinations"]
+    for w in windows:
+        names += [f"delta_{w}d", f"growth_{w}d"]
+    return names + ["vaccination_ratio"]
+
+
+def enrich_fact(fact_table, windows=ROLLING_WINDOWS):
+    """Ajoute la progression (``lag`` par pays), les variations glissantes et le ratio de vaccination.
+
+    ``delta_{w}d`` est l'écart avec le dernier relevé daté d'au moins ``w``
+    jours plus tôt (cadre ``RANGE`` sur le numéro de jour : les relevés
+    espacés sont pris en compte), ``growth_{w}d`` le même écart relatif.
+    """
+    by_country = Window.partitionBy("COUNTRY").orderBy(_DAY)
+    enriched = fact_table.withColumn(_DAY, datediff(col("DATE_UPDATED"), lit("1970-01-01"))) \
+        .withColumn(
+            "progression_vaccinations",
+            col("TOTAL_VACCINATIONS") - lag("TOTAL_VACCINATIONS").over(by_country)
+        )
+    for w in windows:
+        before = last("TOTAL_VACCINATIONS", ignorenulls=True) \
+            .over(by_country.rangeBetween(Window.unboundedPreceding, -w))
+        enriched = enriched \
+            .withColumn(f"delta_{w}d", col("TOTAL_VACCINATIONS") - before) \
+            .withColumn(f"growth_{w}d", when(before > 0, (col("TOTAL_VACCINATIONS") - before) / before))
+    return enriched.withColumn(
+        "vaccination_ratio",
+        when(col("PERSONS_VACCINATED_1PLUS_DOSE") > 0,
+             col("TOTAL_VACCINATIONS") / col("PERSONS_VACCINATED_1PLUS_DOSE"))
+        .otherwise(None)
+    ).drop(_DAY)
+
+
+def enrich_fact_since(fact_table, starts, windows=ROLLING_WINDOWS):
+    """Lignes enrichies des seules dates ``>= _since`` de chaque pays de ``starts``.
+
+    ``starts`` : (``COUNTRY``, ``_since``). L'historique lu en plus est
+    limité à l'état nécessaire aux fenêtres : à partir du dernier relevé
+    daté d'au moins ``max(windows)`` jours avant ``_since`` (le relevé
+    précédent pour ``lag`` en fait partie). Le résultat est identique aux
+    mêmes lignes de ``enrich_fact(fact_table)``.
+    """
+    reach = max(windows, default=1)
+    affected = fact_table.join(broadcast(starts.select("COUNTRY", _SINCE)), "COUNTRY")
+    anchors = affected.filter(datediff(col(_SINCE), col("DATE_UPDATED")) >= reach) \
+        .groupBy("COUNTRY").agg(_max("DATE_UPDATED").alias(_ANCHOR))
+    context = affected.join(anchors, "COUNTRY", "left") \
+        .filter(col(_ANCHOR).isNull() | (col("DATE_UPDATED") >= col(_ANCHOR)))
+    return enrich_fact(context, windows) \
+        .filter(col("DATE_UPDATED") >= col(_SINCE)) \
+        .drop(_SINCE, _ANCHOR)
+
+
+def build_region_aggregation(fact_table):
+    return fact_table.groupBy("WHO_REGION").agg({"total_vaccinations": "sum"}) \
+        .withColumnRenamed("sum(total_vaccinations)", "total_vaccinations_sum")
+
+
+def build_daily_avg(fact_table):
+    return fact_table.groupBy("COUNTRY").agg({"total_vaccinations": "avg"}) \
+        .withColumnRenamed("avg(total_vaccinations)", "avg_total_vaccinations")
+
+
+def enrich_dimension_date(dimension_date):
+    """Ajoute ``day_of_week``, ``season`` et ``is_weekend``."""
+    return dimension_date.withColumn("day_of_week", dayofweek(col("DATE_UPDATED"))) \
+        .withColumn(
+            "season",
+            when((col("month") >= 3) & (col("month") <= 5), "Spring")
+            .when((col("month") >= 6) & (col("month") <= 8), "Summer")
+            .when((col("month") >= 9) & (col("month") <= 11), "Fall")
+            .otherwise("Winter")
+        ) \
+        .withColumn(
+            "is_weekend",
+            when((col("day_of_week") == 7) | (col("day_of_week") == 1), True).otherwise(False)
+        )
@@ -0,0 +1,35 @@
+"""Session Spark locale partagée par les tests (ignorés si PySpark est absent).
+
+Avec ``delta-spark`` installé, la session est créée par
+``lakehouse.session.get_spark`` (extensions Delta) pour les tests qui
+écrivent des tables Delta.
+"""
+
+import importlib.util
+
+import pytest
+
+TEST_CONF = {
+    "spark.sql.shuffle.partitions": "1",
+    "spark.default.parallelism": "1",
+    "spark.ui.enabled": "false",
+    "spark.sql.session.timeZone": "UTC",
+}
+
+
+@pytest.fixture(scope="session")
+def spark():
+    pytest.importorskip("pyspark")
+    from pyspark.sql import SparkSession
+
+    if importlib.util.find_spec("delta") is not None:
+        from lakehouse.session import get_spark
+
+        session = get_spark(profile="local-small", app_name="lakehouse-tests", master="local[1]", conf=TEST_CONF)
+    else:
+        builder = SparkSession.builder.master("local[1]").appName("lakehouse-tests")
+        for key, value in TEST_CONF.items():
+            builder = builder.config(key, value)
+        session = builder.getOrCreate()
+    yield session
+    session.stop()
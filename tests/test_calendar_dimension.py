@@ -0,0 +1,52 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("pyspark")
+pytest.importorskip("delta")
+
+from lakehouse.calendar_dimension import CALENDAR_COLUMNS, build_calendar  # noqa: E402
+
+
+def _mmwr(day):
+    """Semaine épidémiologique de référence : semaine du dimanche, année de son mercredi."""
+    wednesday = day + datetime.timedelta(days=3 - (day.weekday() + 1) % 7)
+    return wednesday.year, (wednesday.timetuple().tm_yday - 1) // 7 + 1
+
+
+def _by_date(spark, start, end):
+    return {row["DATE_UPDATED"]: row for row in build_calendar(spark, start, end).collect()}
+
+
+@pytest.mark.parametrize("day, iso, epi", [
+    (datetime.date(2020, 12, 31), (2020, 53), (2020, 53)),
+    (datetime.date(2021, 1, 1), (2020, 53), (2020, 53)),
+    (datetime.date(2021, 1, 3), (2020, 53), (2021, 1)),
+    (datetime.date(2021, 1, 4), (2021, 1), (2021, 1)),
+    (datetime.date(2019, 12, 29), (2019, 52), (2020, 1)),
+    (datetime.date(2019, 12, 30), (2020, 1), (2020, 1)),
+    (datetime.date(2022, 1, 1), (2021, 52), (2021, 52)),
+])
+def test_known_iso_and_epi_weeks(spark, day, iso, epi):
+    row = _by_date(spark, day, day)[day]
+
+    assert (row["iso_year"], row["iso_week"]) == iso
+    assert (row["epi_year"], row["epi_week"]) == epi
+
+
+def test_calendar_is_contiguous_and_matches_reference_weeks(spark):
+    start, end = datetime.date(2019, 12, 1), datetime.date(2024, 1, 31)
+    rows = _by_date(spark, start, end)
+
+    assert len(rows) == (end - start).days + 1
+    for day, row in rows.items():
+        assert tuple(row.asDict()) == CALENDAR_COLUMNS
+        assert row["date_id"] == day.year * 10000 + day.month * 100 + day.day
+        assert (row["iso_year"], row["iso_week"]) == tuple(day.isocalendar())[:2]
+        assert (row["epi_year"], row["epi_week"]) == _mmwr(day)
+        assert row["quarter"] == (day.month - 1) // 3 + 1
+
+
+def test_empty_range_is_rejected(spark):
+    with pytest.raises(ValueError):
+        build_calendar(spark, "2021-01-02", "2021-01-01")
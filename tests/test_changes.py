@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("pyspark")
+pytest.importorskip("delta")
+
+from lakehouse.changes import Changeset, _net_change_feed  # noqa: E402
+
+FEED_SCHEMA = "COUNTRY string, DATE_UPDATED string, TOTAL double, _change_type string, _commit_version long"
+KEYS = ("COUNTRY", "DATE_UPDATED")
+
+
+def _changeset(spark, events):
+    rows = _net_change_feed(spark.createDataFrame(events, FEED_SCHEMA), KEYS)
+    return Changeset("table", 0, 3, KEYS, rows, "cdf")
+
+
+def _rows(changes):
+    return sorted(tuple(r) for r in changes.rows.collect())
+
+
+def test_insert_update_delete_nets_to_nothing(spark):
+    changes = _changeset(spark, [
+        ("France", "2021-01-01", 1.0, "insert", 1),
+        ("France", "2021-01-01", 1.0, "update_preimage", 2),
+        ("France", "2021-01-01", 2.0, "update_postimage", 2),
+        ("France", "2021-01-01", 2.0, "delete", 3),
+    ])
+
+    assert changes.is_empty()
+    assert _rows(changes) == []
+
+
+def test_overwrite_with_identical_rows_is_not_a_change(spark):
+    # Un overwrite supprime et réinsère toutes les lignes dans la même version
+    changes = _changeset(spark, [
+        ("France", "2021-01-01", 5.0, "delete", 1),
+        ("France", "2021-01-01", 5.0, "insert", 1),
+    ])
+
+    assert changes.counts() == {"inserted": 0, "updated": 0, "deleted": 0}
+
+
+def test_net_insert_update_and_delete(spark):
+    changes = _changeset(spark, [
+        # Nouvelle clé, modifiée ensuite : une insertion dans son dernier état
+        ("Peru", "2021-01-01", 1.0, "insert", 1),
+        ("Peru", "2021-01-01", 1.0, "update_preimage", 2),
+        ("Peru", "2021-01-01", 3.0, "update_postimage", 2),
+        # Overwrite avec une autre valeur, puis MERGE : image avant initiale, image après finale
+        ("France", "2021-01-01", 5.0, "delete", 1),
+        ("France", "2021-01-01", 6.0, "insert", 1),
+        ("France", "2021-01-01", 6.0, "update_preimage", 3),
+        ("France", "2021-01-01", 7.0, "update_postimage", 3),
+        # Clé supprimée : sa dernière valeur connue
+        ("Chile", "2021-01-01", 9.0, "delete", 2),
+        # Supprimée puis réinsérée à l'identique : aucun changement
+        ("Chile", "2021-01-02", 4.0, "delete", 1),
+        ("Chile", "2021-01-02", 4.0, "insert", 3),
+    ])
+
+    assert changes.counts() == {"inserted": 1, "updated": 1, "deleted": 1}
+    assert _rows(changes) == [
+        ("Chile", "2021-01-01", 9.0, "delete"),
+        ("France", "2021-01-01", 5.0, "update_preimage"),
+        ("France", "2021-01-01", 7.0, "update_postimage"),
+        ("Peru", "2021-01-01", 3.0, "insert"),
+    ]
+    assert sorted(tuple(r) for r in changes.changed_keys().collect()) == [
+        ("Chile", "2021-01-01", "delete"),
+        ("France", "2021-01-01", "update"),
+        ("Peru", "2021-01-01", "insert"),
+    ]
+    assert changes.affected("COUNTRY") == ["Chile", "France", "Peru"]
@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyspark")
+
+from lakehouse.collect import compact  # noqa: E402
+
+
+def test_large_whole_totals_stay_exact():
+    totals = [3_412_845_123.0, 2_200_000_001.0, 17.0]
+    pdf = compact(pd.DataFrame({"TOTAL_VACCINATIONS": totals}))
+
+    assert pdf["TOTAL_VACCINATIONS"].dtype == np.float64
+    assert pdf["TOTAL_VACCINATIONS"].tolist() == totals
+
+
+def test_whole_floats_keep_their_kind():
+    whole = compact(pd.DataFrame({"ratio": [1.0, 6.0, 12.0]}))
+    fractional = compact(pd.DataFrame({"ratio": [1.0, 6.5, 12.0]}))
+
+    assert whole["ratio"].dtype == fractional["ratio"].dtype == np.float32
+
+
+def test_declared_integral_columns_with_nulls_become_integers():
+    pdf = compact(pd.DataFrame({"year": [2021.0, np.nan, 2023.0]}), integral=["year"])
+
+    assert pdf["year"].dtype == "Int64"
+    assert pdf["year"].tolist() == [2021, pd.NA, 2023]
+
+
+def test_integer_columns_downcast():
+    pdf = compact(pd.DataFrame({"month": np.array([1, 6, 12], dtype=np.int64)}))
+
+    assert pdf["month"].dtype == np.int8
+
+
+def test_large_whole_totals_with_missing_values_stay_float64():
+    pdf = compact(pd.DataFrame({"TOTAL_VACCINATIONS": [3_412_845_123.0, np.nan]}))
+
+    assert pdf["TOTAL_VACCINATIONS"].dtype == np.float64
+    assert pdf["TOTAL_VACCINATIONS"].iloc[0] == 3_412_845_123.0
+
+
+def test_fractional_values_narrowed_to_float32():
+    pdf = compact(pd.DataFrame({"ratio": [0.5, 1.25, 2.75]}))
+
+    assert pdf["ratio"].dtype == np.float32
+
+
+def test_over_budget_result_is_not_collected(spark):
+    pytest.importorskip("delta")
+    from lakehouse.collect import iter_pandas, to_pandas
+
+    df = spark.range(1000)
+    with pytest.raises(MemoryError, match="iter_pandas"):
+        to_pandas(df, budget=1)
+    assert sum(len(chunk) for chunk in iter_pandas(df)) == 1000
@@ -0,0 +1,52 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+from pyspark.sql.functions import col  # noqa: E402
+
+from lakehouse import transforms  # noqa: E402
+
+FACT_SCHEMA = ("COUNTRY string, WHO_REGION string, DATE_UPDATED date, TOTAL_VACCINATIONS double, "
+               "PERSONS_VACCINATED_1PLUS_DOSE double, PERSONS_LAST_DOSE double, PERSONS_BOOSTER_ADD_DOSE double")
+
+
+def _fact(spark):
+    start = datetime.date(2021, 1, 1)
+    rows = []
+    # Relevés irréguliers : les fenêtres RANGE et l'ancre doivent en tenir compte
+    for country, region, offsets in (("France", "EURO", (0, 3, 5, 12, 20, 33, 40, 41, 60, 75)),
+                                     ("Peru", "AMRO", (0, 30, 31, 45, 70))):
+        for i, offset in enumerate(offsets):
+            total = 1000.0 * (i + 1) ** 2
+            rows.append((country, region, start + datetime.timedelta(days=offset),
+                         total, total / 2, total / 3, None))
+    return spark.createDataFrame(rows, FACT_SCHEMA)
+
+
+def _rows(df):
+    return sorted(tuple(r) for r in df.select(*transforms.FACT_COLUMNS, *transforms.enrichment_columns()).collect())
+
+
+def test_enrich_fact_since_matches_full_enrichment(spark):
+    fact = _fact(spark)
+    starts = spark.createDataFrame(
+        [("France", datetime.date(2021, 2, 10)), ("Peru", datetime.date(2021, 2, 1))],
+        "COUNTRY string, _since date",
+    )
+
+    incremental = transforms.enrich_fact_since(fact, starts)
+    full = transforms.enrich_fact(fact).join(starts, "COUNTRY") \
+        .filter(col("DATE_UPDATED") >= col("_since"))
+
+    assert _rows(incremental) == _rows(full)
+    assert incremental.count() == 7
+
+
+def test_enrich_fact_since_before_first_row_is_full_history(spark):
+    fact = _fact(spark)
+    starts = spark.createDataFrame([("Peru", datetime.date(2020, 1, 1))], "COUNTRY string, _since date")
+
+    assert _rows(transforms.enrich_fact_since(fact, starts)) \
+        == _rows(transforms.enrich_fact(fact).filter(col("COUNTRY") == "Peru"))
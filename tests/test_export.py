@@ -0,0 +1,44 @@
+import datetime
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("pyspark")
+pytest.importorskip("delta")
+
+from lakehouse.export import Exporter, arrow_batches  # noqa: E402
+
+BATCH_CONF = "spark.sql.execution.arrow.maxRecordsPerBatch"
+UTC = datetime.timezone.utc
+
+
+def _frame(spark, rows=10, partitions=3):
+    data = [(i, f"pays-{i % 4}", datetime.datetime(2021, 1, 1, 12, tzinfo=UTC) + datetime.timedelta(days=i))
+            for i in range(rows)]
+    return spark.createDataFrame(data, "id long, COUNTRY string, updated_at timestamp").repartition(partitions)
+
+
+def test_batches_cover_every_row_once_and_respect_batch_rows(spark):
+    before = spark.conf.get(BATCH_CONF, None)
+    batches = list(arrow_batches(_frame(spark), batch_rows=2))
+
+    assert all(batch.num_rows <= 2 for batch in batches)
+    ids = sorted(i for batch in batches for i in batch.column("id").to_pylist())
+    assert ids == list(range(10))
+    assert spark.conf.get(BATCH_CONF, None) == before
+
+
+def test_timestamps_exported_as_utc_instants(spark):
+    batch = next(arrow_batches(_frame(spark, rows=1, partitions=1)))
+
+    assert batch.schema.field("updated_at").type == pa.timestamp("us", tz="UTC")
+    assert batch.column("updated_at")[0].as_py() == datetime.datetime(2021, 1, 1, 12, tzinfo=UTC)
+
+
+def test_single_file_export(spark, tmp_path):
+    target = Exporter(str(tmp_path)).export(_frame(spark), "facts", fmt="parquet", fingerprint="v1")
+
+    table = pq.read_table(target)
+    assert sorted(table.column("id").to_pylist()) == list(range(10))
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from lakehouse.delta_log import data_version  # noqa: E402
+from lakehouse.result_cache import ResultCache  # noqa: E402
+
+
+def _commit(table, version, operation, data_change=True):
+    """Commit minimal du journal Delta : un fichier retiré et un fichier ajouté."""
+    log = table / "_delta_log"
+    log.mkdir(exist_ok=True)
+    actions = [{"commitInfo": {"operation": operation}}]
+    if version > 0:
+        actions.append({"remove": {"path": f"part-{version - 1}.parquet", "dataChange": data_change}})
+    actions.append({"add": {"path": f"part-{version}.parquet", "partitionValues": {}, "dataChange": data_change}})
+    (log / f"{version:020d}.json").write_text("\n".join(json.dumps(a) for a in actions) + "\n")
+
+
+@pytest.fixture
+def table(tmp_path):
+    table = tmp_path / "fact"
+    _commit(table, 0, "WRITE")
+    return table
+
+
+def test_second_run_hits_after_optimize(table, tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path / "cache"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return pd.DataFrame({"COUNTRY": ["France"], "total": [len(calls)]})
+
+    first = cache.get_or_compute("progress", [str(table)], compute)
+    _commit(table, 1, "OPTIMIZE", data_change=False)
+    second = cache.get_or_compute("progress", [str(table)], compute)
+
+    assert len(calls) == 1
+    assert second.equals(first)
+    assert cache.report()["hits"] == 1
+
+
+def test_new_data_invalidates(table, tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path / "cache"))
+    cache.get_or_compute("progress", [str(table)], lambda: pd.DataFrame({"total": [1]}))
+    _commit(table, 1, "MERGE")
+
+    result = cache.get_or_compute("progress", [str(table)], lambda: pd.DataFrame({"total": [2]}))
+
+    assert result["total"].tolist() == [2]
+    assert cache.report() == {"hits": 0, "misses": 2, "entries": 1, "bytes": cache.size()}
+
+
+def test_data_version_skips_maintenance_commits(table):
+    _commit(table, 1, "MERGE")
+    _commit(table, 2, "OPTIMIZE", data_change=False)
+    _commit(table, 3, "WRITE", data_change=False)
+
+    assert data_version(None, str(table)) == 1
@@ -0,0 +1,74 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("pyspark")
+pytest.importorskip("delta")
+
+from lakehouse.schemas import read_source  # noqa: E402
+from lakehouse.streaming import process_available, process_batch, stage_file  # noqa: E402
+
+HEADER = "Date_reported,Country_code,Country,WHO_region,New_cases,Cumulative_cases,New_deaths,Cumulative_deaths\n"
+
+FIRST_BATCH = HEADER + (
+    "2021-01-01,FR,France,EURO,100,100,5,5\n"
+    "2021-01-02,FR,France,EURO,120,220,7,12\n"
+    "2021-01-02,DE,Germany,EURO,not-a-number,0,1,1\n"
+)
+
+# Correction du 2 janvier et nouveau jour
+SECOND_BATCH = HEADER + (
+    "2021-01-02,FR,France,EURO,120,220,9,14\n"
+    "2021-01-03,FR,France,EURO,90,310,4,18\n"
+)
+
+
+@pytest.fixture
+def lake(tmp_path):
+    return {
+        "landing_dir": str(tmp_path / "landing"),
+        "checkpoint_dir": str(tmp_path / "checkpoint"),
+        "bronze_path": str(tmp_path / "bronze"),
+        "silver_path": str(tmp_path / "silver"),
+        "quarantine_path": str(tmp_path / "quarantine"),
+    }
+
+
+def _stage(tmp_path, name, content, landing_dir):
+    source = tmp_path / name
+    source.write_text(content)
+    return stage_file(str(source), landing_dir)
+
+
+def _count(spark, path):
+    return spark.read.format("delta").load(path).count()
+
+
+def test_micro_batches_quarantine_merge_and_replay(spark, tmp_path, lake):
+    tables = {k: v for k, v in lake.items() if k.endswith("_path")}
+
+    first = _stage(tmp_path, "first.csv", FIRST_BATCH, lake["landing_dir"])
+    process_available(spark, lake["landing_dir"], lake["checkpoint_dir"], **tables)
+
+    quarantined = spark.read.format("delta").load(lake["quarantine_path"]).collect()
+    assert len(quarantined) == 1
+    assert "Germany" in quarantined[0]["raw_record"]
+    assert _count(spark, lake["bronze_path"]) == 2
+
+    # Micro-batch 0 rejoué (reprise après panne) : ni Bronze ni la quarantaine ne sont ajoutés deux fois
+    process_batch(read_source(spark, "who_daily", path=first), 0, **tables)
+    assert _count(spark, lake["bronze_path"]) == 2
+    assert _count(spark, lake["quarantine_path"]) == 1
+
+    _stage(tmp_path, "second.csv", SECOND_BATCH, lake["landing_dir"])
+    process_available(spark, lake["landing_dir"], lake["checkpoint_dir"], **tables)
+
+    silver = {(row["COUNTRY"], row["DATE_UPDATED"]): row["NEW_DEATHS"]
+              for row in spark.read.format("delta").load(lake["silver_path"]).collect()}
+    assert silver == {
+        ("France", datetime.date(2021, 1, 1)): 5,
+        ("France", datetime.date(2021, 1, 2)): 9,
+        ("France", datetime.date(2021, 1, 3)): 4,
+    }
+    assert _count(spark, lake["bronze_path"]) == 4
+    assert _count(spark, lake["quarantine_path"]) == 1
@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyspark")
+
+from lakehouse.timeseries import _interpolate_grid, iter_normalized  # noqa: E402
+
+
+def _grid(values):
+    rows = [(key, i, value) for key, series in values.items() for i, value in enumerate(series)]
+    return pd.DataFrame(rows, columns=["COUNTRY", "day", "value"])
+
+
+def test_interpolate_grid_known_values():
+    grid = _grid({
+        "A": [np.nan, 10.0, np.nan, np.nan, 40.0, np.nan],
+        "B": [5.0, np.nan, 7.0],
+        "C": [np.nan, np.nan],
+    })
+
+    result = _interpolate_grid(grid, "COUNTRY", "value").tolist()
+
+    # Avant la première valeur : manquant ; après la dernière : prolongée ; pays vide : manquant
+    expected = [np.nan, 10.0, 20.0, 30.0, 40.0, 40.0, 5.0, 6.0, 7.0, np.nan, np.nan]
+    np.testing.assert_allclose(result, expected, equal_nan=True)
+
+
+def test_interpolate_grid_matches_pandas_interpolate_per_country():
+    rng = np.random.default_rng(7)
+    values = {}
+    for country in ("A", "B", "C", "D"):
+        series = rng.uniform(0, 1000, 50).cumsum()
+        series[rng.random(50) < 0.6] = np.nan
+        values[country] = series
+    grid = _grid(values)
+
+    expected = grid.groupby("COUNTRY", group_keys=False)["value"].apply(lambda s: s.interpolate())
+    np.testing.assert_allclose(_interpolate_grid(grid, "COUNTRY", "value"), expected.sort_index(), equal_nan=True)
+
+
+def test_iter_normalized_reindexes_on_common_dates():
+    pdf = pd.DataFrame({
+        "COUNTRY": ["A", "A", "B"],
+        "DATE_UPDATED": pd.to_datetime(["2021-01-01", "2021-01-05", "2021-01-03"]),
+        "value": [0.0, 40.0, 3.0],
+    })
+
+    grid = pd.concat(iter_normalized(pdf, "value"), ignore_index=True)
+
+    assert len(grid) == 2 * 5
+    a = grid[grid["COUNTRY"] == "A"]["value"].tolist()
+    assert a == [0.0, 10.0, 20.0, 30.0, 40.0]
+    b = grid[grid["COUNTRY"] == "B"]["value"].tolist()
+    np.testing.assert_allclose(b, [np.nan, np.nan, 3.0, 3.0, 3.0], equal_nan=True)